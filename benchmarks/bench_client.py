@@ -0,0 +1,72 @@
+"""
+
+Benchmark of analyze, fill and adjust against the local rejustify.testing.MockServer. For each frame size
+the calls are repeated and the throughput (rows per second), the latency percentiles and the peak memory
+(tracemalloc, separate run) of the client are reported. The mock server runs in a separate process, so that
+it does not share the interpreter and the memory with the client. Its latency is added to every call, set it
+to zero to measure the client alone.
+
+Usage:
+    python benchmarks/bench_client.py [--rows 1000,10000,100000] [--repeat 10] [--latency 0]
+"""
+
+import time
+import argparse
+import tracemalloc
+import numpy as np
+
+import rejustify
+from common import frame, spawn
+
+
+def cases(client, df):
+    # the arguments of adjust are prepared once, only the calls are measured
+    st = client.analyze(df)
+    rdf = client.fill(df, st)
+    column = int(st.loc[st['empty'].astype(bool), 'column'].iloc[0])
+
+    return([('analyze', lambda: client.analyze(df)),
+            ('fill', lambda: client.fill(df, st)),
+            ('adjust', lambda: (rejustify.adjust(st, id=1, items={'feature': 'month'}),
+                                rejustify.adjust(rdf['default'], column=column, items={'Units': 'USD'}),
+                                rejustify.adjust(rdf['keys'], column=column, items={'id.x': 1, 'id.y': None})))])
+
+
+def measure(fun, repeat):
+    # time and memory are measured in separate runs, tracing slows down the allocations
+    fun()
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fun()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fun()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return(np.array(times), peak)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', default='1000,10000,100000')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    print('%-8s %8s %12s %10s %10s %10s %10s' % ('call', 'rows', 'rows / s', 'p50 ms', 'p95 ms', 'p99 ms',
+                                                 'peak MB'))
+    server, url = spawn(latency=args.latency)
+    try:
+        with rejustify.Client(main_url=url, token='TOKEN', email='EMAIL', cache=False) as client:
+            for rows in [int(x) for x in args.rows.split(',')]:
+                df = frame(rows)
+                for name, fun in cases(client, df):
+                    times, peak = measure(fun, args.repeat)
+                    p50, p95, p99 = np.percentile(times, [50, 95, 99]) * 1000
+                    print('%-8s %8d %12.0f %10.2f %10.2f %10.2f %10.1f' % (name, rows, rows / times.mean(),
+                                                                           p50, p95, p99, peak / 1e6))
+    finally:
+        server.terminate()
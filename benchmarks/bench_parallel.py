@@ -0,0 +1,48 @@
+"""
+
+Benchmark of fill() against fill_parallel() for a large frame. The mock server runs in a separate process,
+and the time of each call and the size of the results sent back by the workers are reported.
+
+Usage:
+    python benchmarks/bench_parallel.py [--rows 1000000] [--workers 4] [--partitions 16]
+"""
+
+import time
+import pickle
+import argparse
+
+import rejustify
+from common import frame, spawn
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--partitions', type=int, default=16)
+    args = parser.parse_args()
+
+    server, url = spawn()
+    try:
+        with rejustify.Client(main_url=url, token='TOKEN', email='EMAIL', cache=False) as client:
+            df = frame(args.rows)
+            st = client.analyze(df.head(1000))
+
+            start = time.perf_counter()
+            client.fill(df, st)
+            print('%-14s %10.2f s' % ('fill', time.perf_counter() - start))
+
+            start = time.perf_counter()
+            client.fill_parallel(df, st, partitions=args.partitions, max_workers=args.workers)
+            print('%-14s %10.2f s' % ('fill_parallel', time.perf_counter() - start))
+
+            # size of a partition sent back by a worker, against the pickled filled frame
+            part = rejustify._fill_partition(
+                {'main_url': client.main_url, 'token': 'TOKEN', 'email': 'EMAIL'}, df.head(100000),
+                {'structure': st, 'keys': None, 'default': None, 'shape': 'vertical', 'inits': 1, 'sep': ',',
+                 'learn': None, 'accu': 0.75, 'form': 'full', 'token': None, 'email': None, 'url': None})
+            filled = client.fill(df.head(100000), st)['data']
+            print('%-14s %10.1f MB' % ('partition', len(pickle.dumps(part, protocol=5)) / 1e6))
+            print('%-14s %10.1f MB' % ('pickled frame', len(pickle.dumps(filled, protocol=5)) / 1e6))
+    finally:
+        server.terminate()
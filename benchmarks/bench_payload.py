@@ -0,0 +1,100 @@
+"""
+
+Benchmark of the peak memory of the fill payload: the previous path (copy of the frame, header row inserted
+with loc[-1], copy of the structure, deep copies of keys and default, values.tolist() and json.dumps) against
+the current one, which reads the frame in place and references the other inputs. Each path runs in a fresh
+process, and the peak RSS above the memory held before the call is reported, together with the time.
+
+The peak RSS is read from /proc/self/status, so the benchmark runs on Linux only.
+
+Usage:
+    python benchmarks/bench_payload.py [rows] [empty columns]
+"""
+
+import sys
+import copy
+import json
+import time
+import multiprocessing
+import pandas as pd
+
+import rejustify
+from rejustify import serialize
+from rejustify.testing import MockServer
+from common import frame
+
+
+def blocks(df):
+    # structure, keys and default as returned by the API for the header and a few rows
+    server = MockServer()
+    try:
+        data = [df.columns.tolist()] + df.head(10).values.tolist()
+        structure = server.analyze({'data': data})['structure']
+        out = server.fill({'data': data, 'structure': structure})['structure']['out']
+    finally:
+        server.stop()
+
+    return(pd.DataFrame(structure), rejustify._fill_keys(out), rejustify._fill_default(out))
+
+
+def previous(df, structure, keys, default):
+    _df = df.copy()
+    _structure = structure.copy()
+    _keys = copy.deepcopy(keys)
+    _default = copy.deepcopy(default)
+
+    _df.loc[-1] = _df.columns
+    _df.index = _df.index + 1
+    _df = _df.sort_index()
+
+    payload = {}
+    payload['structure'] = _structure.where(pd.notnull(_structure), None).to_dict('records')
+    payload['data'] = _df.values.tolist()
+    payload['keys'] = _keys
+    payload['meta'] = {'column.id.x': _default['column.id.x'],
+                       'default': [elem.where(pd.notnull(elem), None).to_dict('records')
+                                   for elem in _default['default']]}
+
+    return(json.dumps(payload).encode('utf-8'))
+
+
+def current(df, structure, keys, default):
+    payload = rejustify._fill_payload(df, structure, keys=keys, default=default)
+
+    return(serialize.dumps(payload))
+
+
+def status(field):
+    with open('/proc/self/status') as fp:
+        for line in fp:
+            if line.startswith(field + ':'):
+                return(int(line.split()[1]) * 1024)
+
+
+def measure(name, rows, empty, results):
+    df = frame(rows, empty)
+    structure, keys, default = blocks(df)
+
+    # the peak is reset, so that only the payload is measured
+    with open('/proc/self/clear_refs', 'w') as fp:
+        fp.write('5')
+    before = status('VmRSS')
+    start = time.perf_counter()
+    out = {'previous': previous, 'current': current}[name](df, structure, keys, default)
+    elapsed = time.perf_counter() - start
+
+    results.put((name, elapsed, status('VmHWM') - before, df.memory_usage(deep=True).sum(), len(out)))
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    empty = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print('%-10s %10s %16s %10s %12s' % ('path', 'time s', 'peak RSS MB', 'frame MB', 'payload MB'))
+    results = multiprocessing.Queue()
+    for name in ['previous', 'current']:
+        process = multiprocessing.Process(target=measure, args=(name, rows, empty, results))
+        process.start()
+        name, elapsed, peak, size, length = results.get()
+        process.join()
+        print('%-10s %10.2f %16.1f %10.1f %12.1f' % (name, elapsed, peak / 1e6, size / 1e6, length / 1e6))
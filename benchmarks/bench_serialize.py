@@ -0,0 +1,67 @@
+"""
+
+Benchmark of the payload serialization: the previous path (copy of the frame, header row inserted with
+loc[-1], index shifted and re-sorted, values.tolist() and json.dumps) against rejustify.serialize with orjson
+and with the numpy fallback. Time and peak memory (tracemalloc, separate run) are reported per million rows.
+
+Usage:
+    python benchmarks/bench_serialize.py [rows]
+"""
+
+import sys
+import json
+import time
+import tracemalloc
+
+from rejustify import serialize
+from common import frame
+
+
+def previous(df):
+    _df = df.copy()
+    _df.loc[-1] = _df.columns
+    _df.index = _df.index + 1
+    _df = _df.sort_index()
+
+    return(json.dumps({'data': _df.values.tolist()}).encode('utf-8'))
+
+
+def current(df):
+    return(serialize.dumps({'data': df}))
+
+
+def fallback(df):
+    orjson = serialize.orjson
+    serialize.orjson = None
+    try:
+        return(serialize.dumps({'data': df}))
+    finally:
+        serialize.orjson = orjson
+
+
+def measure(fun, df):
+    # time and memory are measured in separate runs, tracing slows down the allocations
+    start = time.perf_counter()
+    out = fun(df)
+    elapsed = time.perf_counter() - start
+    del out
+
+    tracemalloc.start()
+    out = fun(df)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return(elapsed, peak, len(out))
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    df = frame(rows)
+    scale = 1e6 / rows
+
+    print('%-10s %14s %18s %12s' % ('path', 's / 1M rows', 'peak MB / 1M rows', 'payload MB'))
+    for name, fun in [('previous', previous), ('orjson', current), ('numpy', fallback)]:
+        if name == 'orjson' and serialize.orjson is None:
+            continue
+        elapsed, peak, size = measure(fun, df)
+        print('%-10s %14.2f %18.1f %12.1f' % (name, elapsed * scale, peak / 1e6 * scale, size / 1e6))
@@ -0,0 +1,40 @@
+"""
+
+Helpers shared by the benchmarks: the synthetic data set, and the local mock server started in a separate
+process, so that it does not share the interpreter and the memory with the client.
+"""
+
+import multiprocessing
+import numpy as np
+import pandas as pd
+
+from rejustify.testing import MockServer
+
+
+def frame(rows, empty=1):
+    # reproducible data set of matching columns, followed by the empty columns to be filled
+    random = np.random.RandomState(0)
+    df = pd.DataFrame()
+    df['country'] = np.array(['Italy', 'France', 'Germany', 'Spain', 'Poland'])[random.randint(0, 5, rows)]
+    df['date'] = pd.date_range('2000-01-01', periods=rows, freq='h').strftime('%Y-%m-%d')
+    df['value'] = random.normal(size=rows)
+    df['count'] = random.randint(0, 1000, rows)
+    for i in range(empty):
+        df['empty %d' % i] = ''
+
+    return(df)
+
+
+def serve(urls, latency=0.0):
+    server = MockServer(latency=latency).start()
+    urls.put(server.url)
+    server._thread.join()
+
+
+def spawn(latency=0.0):
+    # the server process and the address of the server
+    urls = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(urls, latency), daemon=True)
+    process.start()
+
+    return(process, urls.get())
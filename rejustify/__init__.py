@@ -1,8 +1,23 @@
 import os
+import math
+import time
 import copy
+import threading
+import collections
+import multiprocessing
+import concurrent.futures
+from collections.abc import Iterable, Mapping
 import requests
+import numpy as np
 import pandas as pd
 import json
+import hashlib
+from rejustify import serialize
+from rejustify import retry
+from rejustify import metrics
+from rejustify.cache import Cache, fingerprint
+from rejustify.cassette import Cassette
+from rejustify.metrics import Metrics
 
 # global variables
 rejustify_main_url = os.environ.get('rejustify_main_url') or 'https://api.rejustify.com'
@@ -11,9 +26,17 @@ rejustify_proxy_port = os.environ.get('rejustify_proxy_port') or None
 rejustify_learn = os.environ.get('rejustify_learn') or True
 rejustify_token = os.environ.get('rejustify_token') or None
 rejustify_email = os.environ.get('rejustify_email') or None
+rejustify_compress = os.environ.get('rejustify_compress') or None
+rejustify_cache = None
+rejustify_retries = 3
+rejustify_backoff = 0.5
+rejustify_rate = None
+rejustify_burst = None
+rejustify_metrics = None
+rejustify_cassette = None
 
 
-def setCurl(main_url=None, proxy_url=None, proxy_port=None, learn=None):
+def setCurl(main_url=None, proxy_url=None, proxy_port=None, learn=None, compress=None):
     """
 
     This command stores the connection details into memory to be easier accessed by rejustify Python module.
@@ -24,6 +47,7 @@ def setCurl(main_url=None, proxy_url=None, proxy_port=None, learn=None):
         rejustify.setCurl()
         rejustify.setCurl(learn = False)
         rejustify.setCurl(proxy_url = "PROXY_ADDRESS", proxy_port = 8080)
+        rejustify.setCurl(compress = "gzip")
 
     Attributes:
         main_url(str): Main address for rejustify API calls. Default is set to
@@ -33,9 +57,12 @@ def setCurl(main_url=None, proxy_url=None, proxy_port=None, learn=None):
         proxy_port(str): Port for communication with the proxy server.
         learn(bool): Enable AI learning in all API calls by setting learn=True. You can also
             specify the learn option in the relevant functions directly.
+        compress(str): Compress the request bodies with gzip or zstd (requires the zstandard package). The
+            bodies are compressed on the fly and sent in chunks. Set compress=False to send uncompressed
+            requests, which is the default.
     """
 
-    global rejustify_main_url, rejustify_proxy_url, rejustify_proxy_port, rejustify_learn
+    global rejustify_main_url, rejustify_proxy_url, rejustify_proxy_port, rejustify_learn, rejustify_compress
 
     # error handling
     if main_url is not None and not isinstance(main_url, str):
@@ -46,6 +73,7 @@ def setCurl(main_url=None, proxy_url=None, proxy_port=None, learn=None):
         raise ValueError("`proxy_port` parameter must be an integer")
     if learn is not None and not isinstance(learn, bool):
         raise ValueError("`learn` parameter must be True/False")
+    _check_compress(compress)
 
     # assign values
     if main_url is not None:
@@ -56,6 +84,8 @@ def setCurl(main_url=None, proxy_url=None, proxy_port=None, learn=None):
         rejustify_proxy_port = proxy_port
     if learn is not None:
         rejustify_learn = learn
+    if compress is not None:
+        rejustify_compress = compress or None
 
     # consistency checks
     if(rejustify_proxy_url is ''):
@@ -65,6 +95,8 @@ def setCurl(main_url=None, proxy_url=None, proxy_port=None, learn=None):
     if(type(rejustify_learn) is not bool):
         rejustify_learn = True
 
+    _sync_default_client()
+
 
 def getCurl():
     """
@@ -79,6 +111,7 @@ def getCurl():
     print('Proxy address: ' + (rejustify_proxy_url if rejustify_proxy_url is not None else 'No proxy address'))
     print('Proxy port: ' + (rejustify_proxy_port if rejustify_proxy_port is not None else 'No proxy port'))
     print('Enable learning: ' + 'Yes' if rejustify_learn is True else 'No')
+    print('Compression: ' + (rejustify_compress if rejustify_compress is not None else 'No compression'))
 
 
 def register(token=None, email=None):
@@ -117,10 +150,162 @@ def register(token=None, email=None):
     if(rejustify_email is ''):
         rejustify_email = None
 
+    _sync_default_client()
+
+
+def setCache(path=None, ttl=None, max_size=None, enable=True):
+    """
+
+    This command enables the persistent cache of API responses for all analyze and fill calls. The responses
+    are stored on local disk and keyed by the fingerprint of the request (without token and email), such that
+    identical requests are not sent to the API again.
+
+    Examples:
+        rejustify.setCache()
+        rejustify.setCache(ttl = 7 * 24 * 3600, max_size = 10 ** 9)
+        rejustify.setCache(enable = False)
+
+    Attributes:
+        path(str): Location of the cache database. The default is ~/.rejustify/cache.sqlite.
+        ttl(int or float): Time to live of the cached responses in seconds. By default responses do not expire.
+        max_size(int): Maximum size of the cache in bytes. The least recently used responses are evicted
+            first. By default unlimited.
+        enable(bool): Set enable=False to disable the cache.
+    """
+
+    global rejustify_cache
+
+    # error handling
+    if enable is not None and not isinstance(enable, bool):
+        raise ValueError("`enable` parameter must be True/False")
+
+    # assign values
+    if enable:
+        rejustify_cache = Cache(path=path, ttl=ttl, max_size=max_size)
+    else:
+        rejustify_cache = None
+
+    _sync_default_client()
+
+
+def setCassette(path=None, mode="record", enable=True):
+    """
+
+    This command records all analyze and fill calls to a cassette file, or replays them from it. In record mode
+    the requests are sent to the API and saved together with their responses. In replay mode the recorded
+    responses are returned without any network access, which makes the re-runs of historical batches
+    deterministic and as fast as reading the local disk.
+
+    Examples:
+        rejustify.setCassette("batch.jsonl.gz", mode = "record")
+        rejustify.setCassette("batch.jsonl.gz", mode = "replay")
+        rejustify.setCassette(enable = False)
+
+    Attributes:
+        path(str): Location of the cassette file.
+        mode(str): Either record or replay. The default is mode='record'.
+        enable(bool): Set enable=False to stop recording or replaying the calls.
+    """
+
+    global rejustify_cassette
+
+    # error handling
+    if enable is not None and not isinstance(enable, bool):
+        raise ValueError("`enable` parameter must be True/False")
+
+    # assign values
+    if rejustify_cassette is not None:
+        rejustify_cassette.close()
+    if enable:
+        rejustify_cassette = Cassette(path=path, mode=mode)
+    else:
+        rejustify_cassette = None
+
+    _sync_default_client()
+
+
+def setRetry(retries=None, backoff=None, rate=None, burst=None):
+    """
+
+    This command sets how the API calls are scheduled. Transient failures, i.e. connection errors and
+    responses with status 429, 502, 503 or 504, are retried with exponential backoff and jitter, or after
+    the delay requested by the Retry-After header. The calls can also be limited to a given rate for each
+    account token, such that large concurrent runs stay within the quota.
+
+    Examples:
+        rejustify.setRetry(retries = 5)
+        rejustify.setRetry(rate = 10, burst = 20)
+
+    Attributes:
+        retries(int): Maximum number of retries of each call. The default is retries=3.
+        backoff(float): Base delay of the exponential backoff in seconds. The default is backoff=0.5.
+        rate(float): Maximum number of calls per second for each account token. Set rate=0 to remove the limit,
+            which is the default.
+        burst(int): Maximum number of calls sent at once under the rate limit. The default is burst=max(1, rate).
+    """
+
+    global rejustify_retries, rejustify_backoff, rejustify_rate, rejustify_burst
+
+    _check_retry(retries=retries, backoff=backoff, rate=rate, burst=burst)
+
+    # assign values
+    if retries is not None:
+        rejustify_retries = retries
+    if backoff is not None:
+        rejustify_backoff = backoff
+    if rate is not None:
+        rejustify_rate = rate or None
+    if burst is not None:
+        rejustify_burst = burst
+
+    _sync_default_client()
+
+
+def setMetrics(metrics=None, enable=True):
+    """
+
+    This command enables the collection of metrics for all analyze and fill calls: the durations of the
+    phases of each call (validate, payload, serialize, network, parse and output), the sizes of the payloads
+    and the responses in bytes, the number of rows and columns sent, the cache hits and the retries. The
+    collected metrics are returned.
+
+    Examples:
+        metrics = rejustify.setMetrics()
+        rdf = rejustify.fill(df, st)
+        metrics.summary()
+
+        # pass every observation to a callback
+        rejustify.setMetrics(rejustify.Metrics(callbacks=[lambda name, value, labels: print(name, value, labels)]))
+        rejustify.setMetrics(enable = False)
+
+    Attributes:
+        metrics(Metrics): The object collecting the metrics, see rejustify.Metrics. By default a new one is created.
+        enable(bool): Set enable=False to stop collecting the metrics.
+    """
+
+    global rejustify_metrics
+
+    # error handling
+    if metrics is not None and not isinstance(metrics, Metrics):
+        raise ValueError("`metrics` parameter must be a Metrics object")
+    if enable is not None and not isinstance(enable, bool):
+        raise ValueError("`enable` parameter must be True/False")
+
+    # assign values
+    if enable:
+        rejustify_metrics = metrics if metrics is not None else Metrics()
+    else:
+        rejustify_metrics = None
+
+    _sync_default_client()
+
+    return(rejustify_metrics)
+
 
 def analyze(df=None, shape="vertical", inits=1, fast=True,
             sep=",", learn=None, token=None,
-            email=None, url=None):
+            email=None, url=None, memoize=False,
+            sample=None, sampling="random"):
     """
 
     The function submits the data set to the analyze API endpoint and
@@ -180,6 +365,14 @@ def analyze(df=None, shape="vertical", inits=1, fast=True,
         # rejustify
         analyze(df)
 
+        # reuse the structure for data sets with the same header signature
+        st = analyze(df, memoize = True)
+        st = adjust(st, id = 3, items={'provider': 'REJUSTIFY', 'table': 'COVID-19-ECDC'})
+        saveStructure(df, st)
+
+        # upload only a sample of 10000 rows covering distinct values
+        st = analyze(df, sample = 10000, sampling = "distinct")
+
     Attributes:
         df(DataFrame): The data set to be analyzed. Must be a DataFrame.
         shape(str): It informs the API whether the data set should be read by
@@ -198,89 +391,46 @@ def analyze(df=None, shape="vertical", inits=1, fast=True,
         token(str): API token. By default read from global variables.
         email(str): E-mail address for the account. By default read from global variables.
         url(url): API url. By default read from global variables.
+        memoize(bool): If True, the structure is reused for data sets with the same header signature, i.e. the same
+            column names, data types and patterns of a small sample of values. The API is called only if the
+            signature has not been seen before. The structures are kept in memory and, if enabled, in the persistent
+            cache (see setCache()). Use saveStructure() to store the adjusted structure. The default is memoize=False.
+        sample(int or float): If given, only a sample of rows is uploaded to the API, either a number of rows (int)
+            or a fraction of rows (float). The header row is always kept and the columns which are not empty in df
+            keep at least one value. By default all rows are uploaded.
+        sampling(str): Sampling method: random (rows drawn at random), stratified (one row drawn from each of evenly
+            spaced blocks of rows) or distinct (rows covering the distinct values of each column). The samples are
+            reproducible, and each column which is not empty keeps at least one value, which may add a few rows to
+            small samples. The default is sampling='random'.
     """
 
-    # error handling
-    if df is not None and not isinstance(df, pd.DataFrame):
-        raise ValueError("`df` parameter must be a DataFrame object")
-    if df is None:
-        raise ValueError("`df` parameter must be a DataFrame object")
-    if shape is not "vertical":
-        raise ValueError(
-            "`shape` parameter must be vertical (horizontal tables are not yet supported in Python)")
-    if inits is not None and not isinstance(inits, int):
-        raise ValueError("`inits` parameter must be an integer")
-    if inits is not None and inits > 1:
-        raise ValueError("Currently `inits` can be max 1")
-    if fast is not None and not isinstance(fast, bool):
-        raise ValueError("`fast` parameter must be True/False")
-    if sep is not None and not isinstance(sep, str):
-        raise ValueError("`sep` parameter must be a string")
-    if len(sep) > 3:
-        raise ValueError("`sep` has a maximum of 3 characters")
-    if learn is not None and not isinstance(learn, bool):
-        raise ValueError("`learn` parameter must be True/False")
-    if token is not None and not isinstance(token, str):
-        raise ValueError("`token` parameter must be a string")
-    if email is not None and not isinstance(email, str):
-        raise ValueError("`email` parameter must be a string")
-    if url is not None and not isinstance(url, str):
-        raise ValueError("`url` parameter must be a string")
+    return(_default_client().analyze(df=df, shape=shape, inits=inits, fast=fast,
+                                     sep=sep, learn=learn, token=token,
+                                     email=email, url=url, memoize=memoize,
+                                     sample=sample, sampling=sampling))
 
-    # set global variables
-    if learn is None:
-        learn = rejustify_learn
-    if token is None:
-        token = rejustify_token
-    if email is None:
-        email = rejustify_email
-    if url is None:
-        url = rejustify_main_url
-
-    # reassign mutable objects
-    _df = df.copy()
-
-    # convert DataFrame to array with correct naming
-    _df.loc[-1] = _df.columns
-    _df.index = _df.index + 1
-    _df = _df.sort_index()
-
-    # prepare the payload query
-    payload = {}
-    payload['data'] = _df.values.tolist()
-    payload['userToken'] = token
-    payload['email'] = email
-    payload['dataShape'] = shape
-    payload['inits'] = inits
-    payload['fast'] = fast
-    payload['sep'] = sep
-    payload['dbAllowed'] = learn
 
-    # send request
-    if rejustify_proxy_url is not None and rejustify_proxy_port is not None:
-        response = requests.post(rejustify_main_url + "/analyze",  data=json.dumps(payload),
-                                 headers={'Content-Type': 'application/json'},
-                                 proxies={'http': rejustify_proxy_url + ':' + rejustify_proxy_port,
-                                          'https': rejustify_proxy_url + ':' + rejustify_proxy_port})
-    else:
-        response = requests.post(rejustify_main_url + "/analyze",  data=json.dumps(payload),
-                                 headers={'Content-Type': 'application/json'})
+def saveStructure(df=None, structure=None, shape="vertical", inits=1, sep=","):
+    """
 
-    try:
-        response_json = response.json()
-    except ValueError:
-        raise ValueError("Invalid response from rejustify (JSON expected)")
+    This command stores the structure, typically after changes made with adjust(), against the header
+    signature of df. The subsequent calls of analyze(memoize=True) for data sets with the same signature
+    will return the stored structure instead of calling the API.
 
-    if not response.ok:
-        raise ValueError(response_json)
+    Examples:
+        st = analyze(df, memoize = True)
+        st = adjust(st, id = 1, items={'feature': 'month'})
+        saveStructure(df, st)
 
-    # output
-    try:
-        out = pd.DataFrame(response_json['structure'])
-    except:
-        out = "Consistency error. Check your input parameters."
+    Attributes:
+        df(DataFrame): The data set which the structure describes.
+        structure(DataFrame): The structure to be stored.
+        shape(str): See analyze() for details.
+        inits(int): See analyze() for details.
+        sep(str): See analyze() for details.
+    """
 
-    return(out)
+    _default_client().saveStructure(df=df, structure=structure, shape=shape, inits=inits, sep=sep)
 
 
 def adjust(block=None, column=None, id=None, items=None):
@@ -331,9 +481,12 @@ def adjust(block=None, column=None, id=None, items=None):
          adjust(rdf['keys'], column = 3, items={'id.x': 2, 'id.y': 3}) # change link
          adjust(rdf['keys'], column = 3, items={'id.x': 3, 'id.y': 4}) # add link
 
+         # compact keys and default values, see fill(compact = True)
+         adjust(rdf['keys'], column = 3, items={'id.x': 2, 'id.y': 3})
+
      Attributes:
         block(DataFrame, list or dict): A data structure to be changed. Currently supported structures include structure (DataFrame),
-            default (dict) and keys (list).
+            default (dict or DataFrame) and keys (list or DataFrame).
         column(int or list): The data column (or raw in case of horizontal datasets) to be adjusted. Vector values are supported.
         id(int or list): The identifier of the specific element to be changed. Currently it should be only used in structure
             with multi-dimension headers (see analyze() for details).
@@ -345,6 +498,12 @@ def adjust(block=None, column=None, id=None, items=None):
     if block is not None and not isinstance(block, pd.DataFrame) and not isinstance(block, dict) and not isinstance(block, list):
         raise ValueError("`block` parameter must be a DataFrame, a dict or a list object")
 
+    # compact blocks are adjusted in one pass
+    if isinstance(block, pd.DataFrame) and _block_type(block) in {"keys", "default"}:
+        if items is None:
+            return(block.copy(deep=False))
+        return(adjust_many(block, [dict(items, column=x) for x in _as_list(column if column is not None else id)]))
+
     # reassign mutable objects
     index = None
     type = "undefined"
@@ -384,7 +543,7 @@ def adjust(block=None, column=None, id=None, items=None):
         if any(elem in items.keys() for elem in {'class', 'feature', 'cleaner', 'format'}):
             _block.loc[index, 'p_class'] = -1
 
-        _block.loc[index, items.keys()] = items.values()
+        _block.loc[index, list(items.keys())] = list(items.values())
 
     # adjust default
     if type is "default":
@@ -407,8 +566,8 @@ def adjust(block=None, column=None, id=None, items=None):
         try:
             for i in index:
                 for elem in items.keys():
-                    _block['default'][i]['code_default'][elem] = items[elem]
-                    _block['default'][i]['label_default'][elem] = None
+                    _block['default'][i].loc[elem, 'code_default'] = items[elem]
+                    _block['default'][i].loc[elem, 'label_default'] = None
         except ValueError:
             raise ValueError("Couldn't change the values")
 
@@ -516,10 +675,61 @@ def adjust(block=None, column=None, id=None, items=None):
     return(_block)
 
 
+def adjust_many(block=None, edits=None):
+    """
+
+    Applies a table of edits to a block (structure, default or keys) in one pass. Each edit corresponds to a single
+    call of adjust(): it identifies the column (or id) to be changed and gives the items with the new values. The
+    columns are located through an index built once for the whole table, and only the elements which are
+    actually changed are copied, while the others are shared with the original block, which stays unchanged.
+
+    For structure and default, each edit contains column (or id) and the items to be changed, such as
+    {'column': 3, 'provider': 'REJUSTIFY'} or {'column': 3, 'Time Dimension': 'latest'}. For keys, each edit
+    contains column, id.x, id.y and optionally method and class, and id.y=None removes the link.
+
+    Examples:
+        st = adjust_many(st, [{'id': 3, 'provider': 'REJUSTIFY', 'table': 'COVID-19-ECDC'},
+                              {'id': 1, 'feature': 'country'}])
+
+        # adjust default values of many columns
+        default = adjust_many(rdf['default'], pd.DataFrame({'column': [3, 4, 5], 'Units': ['USD', 'EUR', 'PLN']}))
+
+        # remove, change and add links in keys
+        keys = adjust_many(rdf['keys'], [{'column': 3, 'id.x': 2, 'id.y': None},
+                                         {'column': 4, 'id.x': 2, 'id.y': 3},
+                                         {'column': 5, 'id.x': 3, 'id.y': 4, 'method': 'exact-matching'}])
+
+    Attributes:
+        block(DataFrame, list or dict): A data structure to be changed, see adjust() for details. The compact keys
+            and default values returned by fill(compact=True) are also supported.
+        edits(DataFrame or list): The edits, either as a list of dicts or as a DataFrame with one edit in each row.
+            Missing values in a DataFrame mean that the item is not changed.
+    """
+
+    # error handling
+    if block is not None and not isinstance(block, pd.DataFrame) and not isinstance(block, dict) and not isinstance(block, list):
+        raise ValueError("`block` parameter must be a DataFrame, a dict or a list object")
+    if not isinstance(edits, (pd.DataFrame, list)):
+        raise ValueError("`edits` parameter must be a DataFrame or a list object")
+
+    edits = _edit_records(edits)
+    type = _block_type(block)
+
+    if type == "structure":
+        return(_adjust_structure(block, edits))
+    if type == "default":
+        return(_adjust_default(block, edits))
+    if type == "keys":
+        return(_adjust_keys(block, edits))
+
+    raise ValueError("`block` parameter must be a structure, default or keys block")
+
+
 def fill(df=None, structure=None, keys=None, default=None,
          shape='vertical', inits=1, sep=',', learn=None,
          accu=0.75, form='full', token=None, email=None,
-         url=None):
+         url=None, chunk_rows=None, max_workers=None, dedupe=False,
+         stream=False, lazy=False, compact=False, typed=False, prune=False):
     """
 
     This command submits the request to the API fill endpoint
@@ -552,6 +762,29 @@ def fill(df=None, structure=None, keys=None, default=None,
         st = analyze(df)
         rdf = fill(df, st)
 
+        # large data sets can be sent in chunks of rows
+        rdf = fill(df, st, chunk_rows = 50000, max_workers = 8)
+
+        # send only the unique combinations of the matching dimensions
+        rdf = fill(df, st, dedupe = True)
+
+        # parse large responses incrementally
+        rdf = fill(df, st, stream = True)
+
+        # build the blocks of the output only when accessed
+        rdf = fill(df, st, lazy = True)
+        rdf['data']
+
+        # keys and default values as single DataFrames, which can be passed to the next fill
+        rdf = fill(df, st, compact = True)
+        rdf = fill(df, st, keys = rdf['keys'], default = rdf['default'])
+
+        # typed columns, with the header as column names
+        rdf = fill(df, st, typed = True)
+
+        # send only the matching and the empty columns of a wide data set
+        rdf = fill(df, st, keys = rdf['keys'], prune = True)
+
     Attributes:
         df(DataFrame): The data set to be analyzed. Must be a DataFrame.
         structure(DataFrame): Structure of the x data set, characterizing classes, features, cleaners and formats
@@ -597,8 +830,1050 @@ def fill(df=None, structure=None, keys=None, default=None,
         token(str): API token. By default read from global variables.
         email(str): E-mail address for the account. By default read from global variables.
         url(url): API url. By default read from global variables.
+        chunk_rows(int): If given, df is split into chunks of at most chunk_rows rows, which share the same structure,
+            keys and default. The chunks are sent concurrently and the returned data are stitched back together
+            in the original order. By default df is sent in a single request.
+        max_workers(int): Maximum number of chunks sent at the same time. By default it is the pool size of the client.
+        dedupe(bool): If True, only the unique combinations of the columns driving the matching are sent to the API,
+            and the filled values are broadcast back to all rows of df. The matching columns are the id.x dimensions
+            in keys or, if keys are missing, all columns which are not empty in structure. The default is dedupe=False.
+        stream(bool): If True, the response is parsed incrementally as it arrives, and the returned data are collected
+            column by column, without holding the whole response body and its parsed copy in memory. The other
+            sections of the response are parsed separately. Streamed responses are not stored in the cache. Requires
+            the ijson package. The default is stream=False.
+        lazy(bool): If True, a FillResult object is returned instead of a dict. It keeps the response and builds
+            each block (data, structure.x, structure.y, keys, default, message) the first time it is accessed. The
+            blocks are accessed with the same keys as in the dict. Outputs merged from chunks (chunk_rows, dedupe)
+            are always returned as a dict. The default is lazy=False.
+        compact(bool): If True, keys and default values are returned as single DataFrames instead of lists of dicts
+            and lists of DataFrames. The keys have one row for each link, with columns column.id.x, column.name.x,
+            id.x, name.x, id.y, name.y, class and method, and a column without links keeps one row with missing
+            link items. The default values have one row for each dimension, with
+            columns column.id.x, dimension, code_default and label_default. Both can be changed with adjust() and
+            passed to fill() as they are. The default is compact=False.
+        typed(bool): If True, the header row becomes the column names of data and the columns are converted
+            according to the classes and formats in structure.x: number to numeric arrays, time to datetime
+            (with the given format), and geography, general, unit and sector to categoricals. The filled columns
+            are numeric if all their values are numbers, and categoricals otherwise. Columns which cannot be
+            converted are left as they are. The default is typed=False.
+        prune(bool): If True and keys are given, only the columns used for matching (id.x in keys) and the
+            empty columns are sent to the API. The columns are renumbered in the payload, and the returned data,
+            structure and keys are mapped back to all columns of df. The default is prune=False.
+    """
+
+    return(_default_client().fill(df=df, structure=structure, keys=keys, default=default,
+                                  shape=shape, inits=inits, sep=sep, learn=learn,
+                                  accu=accu, form=form, token=token, email=email,
+                                  url=url, chunk_rows=chunk_rows, max_workers=max_workers,
+                                  dedupe=dedupe, stream=stream, lazy=lazy, compact=compact,
+                                  typed=typed, prune=prune))
+
+
+def fill_iter(chunks=None, structure=None, keys=None, default=None,
+              shape='vertical', inits=1, sep=',', learn=None,
+              accu=0.75, form='full', token=None, email=None,
+              url=None, prefetch=4, stream=False, compact=False, typed=False):
+    """
+
+    This command fills a data set given in chunks, for instance read from a large file with
+    pd.read_csv(..., chunksize=...), and yields the result of fill() for each chunk in the original order.
+    The chunks share the same structure, keys and default values, which are converted to the payload
+    only once. At most prefetch chunks are read and sent ahead of the one being consumed, so that the
+    memory stays flat regardless of the size of the data set.
+
+    Examples:
+        chunks = pd.read_csv("large.csv", chunksize = 100000)
+        for rdf in fill_iter(chunks, st, prefetch = 8):
+            rdf['data'].iloc[1:].to_csv("filled.csv", mode = "a", header = False, index = False)
+
+    Attributes:
+        chunks(iterable): DataFrames with the same columns as the data set described by structure.
+        structure(DataFrame): See fill() for details.
+        keys(list or DataFrame): See fill() for details.
+        default(dict or DataFrame): See fill() for details.
+        shape(str): See fill() for details.
+        inits(int): See fill() for details.
+        sep(str): See fill() for details.
+        learn(bool): See fill() for details.
+        accu(float): See fill() for details.
+        form(str): See fill() for details.
+        token(str): API token. By default read from global variables.
+        email(str): E-mail address for the account. By default read from global variables.
+        url(url): API url. By default read from global variables.
+        prefetch(int): Maximum number of chunks in flight. The default is prefetch=4.
+        stream(bool): See fill() for details.
+        compact(bool): See fill() for details.
+        typed(bool): See fill() for details.
+    """
+
+    return(_default_client().fill_iter(chunks=chunks, structure=structure, keys=keys, default=default,
+                                       shape=shape, inits=inits, sep=sep, learn=learn,
+                                       accu=accu, form=form, token=token, email=email,
+                                       url=url, prefetch=prefetch, stream=stream, compact=compact,
+                                       typed=typed))
+
+
+def fill_parallel(df=None, structure=None, keys=None, default=None,
+                  shape='vertical', inits=1, sep=',', learn=None,
+                  accu=0.75, form='full', token=None, email=None,
+                  url=None, partitions=None, max_workers=None, backend='process',
+                  compact=False, typed=False):
+    """
+
+    This command fills a large data set in worker processes. The rows of df are split into partitions,
+    and each worker builds and serializes the payload of its partition, sends the request and parses the
+    response, so that the CPU-bound parts of fill() run on all cores instead of one thread holding the GIL.
+    The workers send back only the filled columns as numpy arrays (the other columns are already in df),
+    and the partitions are reassembled in the original order. The output is the same as that of fill().
+
+    The workers use the connection details and the account of the client, but not its cache, cassette or
+    metrics. The rate limit, if set, is shared equally between the workers.
+
+    Examples:
+        # 32 partitions filled in 32 processes
+        rdf = fill_parallel(df, st, partitions = 32)
+
+        # on a dask cluster
+        rdf = fill_parallel(df, st, partitions = 256, backend = "dask")
+
+    Attributes:
+        df(DataFrame): The data set to be filled.
+        structure(DataFrame): See fill() for details.
+        keys(list or DataFrame): See fill() for details.
+        default(dict or DataFrame): See fill() for details.
+        shape(str): See fill() for details.
+        inits(int): See fill() for details.
+        sep(str): See fill() for details.
+        learn(bool): See fill() for details.
+        accu(float): See fill() for details.
+        form(str): See fill() for details.
+        token(str): API token. By default read from global variables.
+        email(str): E-mail address for the account. By default read from global variables.
+        url(url): API url. By default read from global variables.
+        partitions(int): Number of partitions of the rows. The default is the number of workers.
+        max_workers(int): Maximum number of worker processes. The default is the number of CPUs.
+        backend(str): Either process (a local pool of processes) or dask (the tasks are computed by the
+            scheduler set in the dask configuration, such as a distributed client, or else by the dask pool
+            of max_workers processes; it requires the dask package). The default is backend='process'.
+        compact(bool): See fill() for details.
+        typed(bool): See fill() for details.
     """
 
+    return(_default_client().fill_parallel(df=df, structure=structure, keys=keys, default=default,
+                                           shape=shape, inits=inits, sep=sep, learn=learn,
+                                           accu=accu, form=form, token=token, email=email,
+                                           url=url, partitions=partitions, max_workers=max_workers,
+                                           backend=backend, compact=compact, typed=typed))
+
+
+def refresh(result=None, df=None, shape='vertical', inits=1, sep=',', learn=None,
+            accu=0.75, form='full', token=None, email=None, url=None, typed=False):
+    """
+
+    This command updates a previously filled data set with new rows. Only the rows with time periods
+    newer than the ones already in result are sent to the API fill endpoint, and the filled rows are
+    appended to the previous data. The structure, keys and default values are taken from the earlier
+    run, so that the new rows are filled consistently with the previous ones.
+
+    New periods are determined by the first column of class time in structure.x. If the time values cannot
+    be parsed with the format given in structure.x, all periods which do not appear in the previous data
+    are considered new.
+
+    Examples:
+        # the first run
+        rdf = fill(df, st)
+
+        # on the next day, only the new periods are requested
+        rdf = refresh(rdf, df_updated)
+
+    Attributes:
+        result(dict): The previous result returned by fill().
+        df(DataFrame): The new rows, or the whole updated data set, with the same columns as the data set filled
+            in result.
+        shape(str): See fill() for details.
+        inits(int): See fill() for details.
+        sep(str): See fill() for details.
+        learn(bool): See fill() for details.
+        accu(float): See fill() for details.
+        form(str): See fill() for details.
+        token(str): API token. By default read from global variables.
+        email(str): E-mail address for the account. By default read from global variables.
+        url(url): API url. By default read from global variables.
+        typed(bool): Set typed=True if result was returned by fill(typed=True). See fill() for details.
+    """
+
+    return(_default_client().refresh(result=result, df=df, shape=shape, inits=inits, sep=sep,
+                                     learn=learn, accu=accu, form=form, token=token,
+                                     email=email, url=url, typed=typed))
+
+
+class Client(object):
+    """
+
+    The client keeps its own connection details and account information, and sends all API calls through a
+    pooled HTTP session. Connections to the API are kept alive and reused between the calls, which saves the
+    TCP and TLS handshakes when many analyze or fill requests are submitted in a row.
+
+    Module-level functions analyze() and fill() use a default client, which follows the settings
+    from setCurl() and register().
+
+    Examples:
+        client = rejustify.Client(token = "YOUR_TOKEN", email = "YOUR_EMAIL", pool_size = 20)
+        st = client.analyze(df)
+        rdf = client.fill(df, st)
+        client.close()
+
+        # or as a context manager
+        with rejustify.Client(token = "YOUR_TOKEN", email = "YOUR_EMAIL") as client:
+            rdf = client.fill(df, client.analyze(df))
+
+    Attributes:
+        main_url(str): Main address for rejustify API calls. By default read from global variables.
+        proxy_url(str): Address of the proxy server. By default read from global variables.
+        proxy_port(int): Port for communication with the proxy server. By default read from global variables.
+        learn(bool): Enable AI learning in all API calls of the client. By default read from global variables.
+        token(str): API token. By default read from global variables.
+        email(str): E-mail address for the account. By default read from global variables.
+        pool_size(int): Maximum number of connections kept alive in the pool. The default is pool_size=10.
+        cache(Cache): Persistent cache of API responses, see rejustify.Cache. By default read from global
+            variables (see setCache()). Set cache=False to disable caching.
+        compress(str): Compress the request bodies with gzip or zstd. By default read from global variables.
+        retries(int): Maximum number of retries of transient failures. By default read from global variables
+            (see setRetry()).
+        backoff(float): Base delay of the exponential backoff in seconds. By default read from global variables.
+        rate(float): Maximum number of calls per second for each account token. By default read from global
+            variables.
+        burst(int): Maximum number of calls sent at once under the rate limit. By default read from global variables.
+        metrics(Metrics): Collects the timings and sizes of the API calls, see rejustify.Metrics. By default read
+            from global variables (see setMetrics()). Set metrics=False to disable the metrics.
+        cassette(Cassette): Records the API calls or replays them, see rejustify.Cassette. By default read from
+            global variables (see setCassette()). Set cassette=False to disable it.
+        coalesce(bool): Send identical requests which are in flight at the same time only once. The first call
+            sends the request and the others wait for its response and receive copies of it. The default is
+            coalesce=True.
+    """
+
+    def __init__(self, main_url=None, proxy_url=None, proxy_port=None, learn=None,
+                 token=None, email=None, pool_size=10, cache=None, compress=None,
+                 retries=None, backoff=None, rate=None, burst=None, metrics=None,
+                 cassette=None, coalesce=True):
+
+        # error handling
+        if pool_size is not None and not isinstance(pool_size, int):
+            raise ValueError("`pool_size` parameter must be an integer")
+        if pool_size is not None and pool_size < 1:
+            raise ValueError("`pool_size` parameter must be positive")
+        if cache is not None and cache is not False and not isinstance(cache, Cache):
+            raise ValueError("`cache` parameter must be a Cache object")
+        if metrics is not None and metrics is not False and not isinstance(metrics, Metrics):
+            raise ValueError("`metrics` parameter must be a Metrics object")
+        if cassette is not None and cassette is not False and not isinstance(cassette, Cassette):
+            raise ValueError("`cassette` parameter must be a Cassette object")
+        if not isinstance(coalesce, bool):
+            raise ValueError("`coalesce` parameter must be True/False")
+        _check_compress(rejustify_compress if compress is None else compress)
+
+        self.main_url = rejustify_main_url
+        self.proxy_url = rejustify_proxy_url
+        self.proxy_port = rejustify_proxy_port
+        self.learn = rejustify_learn
+        self.compress = rejustify_compress
+        self.token = rejustify_token
+        self.email = rejustify_email
+        self.pool_size = pool_size
+        self.cache = rejustify_cache if cache is None else (cache or None)
+        self.structures = {}
+        self.retries = rejustify_retries
+        self.backoff = rejustify_backoff
+        self.rate = rejustify_rate
+        self.burst = rejustify_burst
+        self.metrics = rejustify_metrics if metrics is None else (metrics or None)
+        self.cassette = rejustify_cassette if cassette is None else (cassette or None)
+        self.coalesce = coalesce
+        self._limiters = {}
+        self._limits = None
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+        self.session = self._session()
+        self.setCurl(main_url=main_url, proxy_url=proxy_url, proxy_port=proxy_port, learn=learn,
+                     compress=compress)
+        self.register(token=token, email=email)
+        self.setRetry(retries=retries, backoff=backoff, rate=rate, burst=burst)
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+
+        Closes all pooled connections of the client.
+        """
+
+        self.session.close()
+
+    def setCurl(self, main_url=None, proxy_url=None, proxy_port=None, learn=None, compress=None):
+        """
+
+        Changes the connection details of the client. See rejustify.setCurl() for details.
+        """
+
+        # error handling
+        if main_url is not None and not isinstance(main_url, str):
+            raise ValueError("`main_url` parameter must be a string")
+        if proxy_url is not None and not isinstance(proxy_url, str):
+            raise ValueError("`proxy_url` parameter must be a string")
+        if proxy_port is not None and not isinstance(proxy_port, (int, str)):
+            raise ValueError("`proxy_port` parameter must be an integer")
+        if learn is not None and not isinstance(learn, bool):
+            raise ValueError("`learn` parameter must be True/False")
+        _check_compress(compress)
+
+        # assign values
+        if main_url is not None:
+            self.main_url = main_url
+        if proxy_url is not None:
+            self.proxy_url = proxy_url
+        if proxy_port is not None:
+            self.proxy_port = proxy_port
+        if learn is not None:
+            self.learn = learn
+        if compress is not None:
+            self.compress = compress or None
+
+        # consistency checks
+        if self.proxy_url == '':
+            self.proxy_url = None
+        if self.proxy_port == '':
+            self.proxy_port = None
+        if not isinstance(self.learn, bool):
+            self.learn = True
+
+        self._set_proxies()
+
+    def register(self, token=None, email=None):
+        """
+
+        Changes the account details of the client. See rejustify.register() for details.
+        """
+
+        # error handling
+        if token is not None and not isinstance(token, str):
+            raise ValueError("`token` parameter must be a string")
+        if email is not None and not isinstance(email, str):
+            raise ValueError("`email` parameter must be a string")
+
+        # assign values
+        if token is not None:
+            self.token = token
+        if email is not None:
+            self.email = email
+
+        # consistency checks
+        if self.token == '':
+            self.token = None
+        if self.email == '':
+            self.email = None
+
+    def setRetry(self, retries=None, backoff=None, rate=None, burst=None):
+        """
+
+        Changes the retry and rate limit settings of the client. See rejustify.setRetry() for details.
+        """
+
+        _check_retry(retries=retries, backoff=backoff, rate=rate, burst=burst)
+
+        # assign values
+        if retries is not None:
+            self.retries = retries
+        if backoff is not None:
+            self.backoff = backoff
+        if rate is not None:
+            self.rate = rate or None
+        if burst is not None:
+            self.burst = burst
+
+        # rate limits apply to the next calls, the token buckets are kept while the limits do not change
+        if self._limits != (self.rate, self.burst):
+            self._limiters = {}
+            self._limits = (self.rate, self.burst)
+
+    def analyze(self, df=None, shape="vertical", inits=1, fast=True,
+                sep=",", learn=None, token=None,
+                email=None, url=None, memoize=False,
+                sample=None, sampling="random"):
+        """
+
+        Submits the data set to the analyze API endpoint using the pooled session of the client.
+        See rejustify.analyze() for details.
+        """
+
+        # error handling
+        if memoize is not None and not isinstance(memoize, bool):
+            raise ValueError("`memoize` parameter must be True/False")
+
+        if memoize and isinstance(df, pd.DataFrame):
+            out = self._structure_get(_header_signature(df, shape=shape, inits=inits, sep=sep))
+            self._observe('structure_hit' if out is not None else 'structure_miss', 1, 'analyze')
+            if out is not None:
+                return(out)
+
+        url, payload = self._analyze_request(df=df, shape=shape, inits=inits, fast=fast, sep=sep,
+                                             learn=learn, token=token, email=email, url=url,
+                                             sample=sample, sampling=sampling)
+        response_json = self._post(url, payload)
+        with self._phase('output', 'analyze'):
+            out = _analyze_output(response_json)
+
+        if memoize and isinstance(out, pd.DataFrame):
+            self._structure_set(_header_signature(df, shape=shape, inits=inits, sep=sep), out)
+
+        return(out)
+
+    def saveStructure(self, df=None, structure=None, shape="vertical", inits=1, sep=","):
+        """
+
+        Stores the structure against the header signature of df. See rejustify.saveStructure() for details.
+        """
+
+        # error handling
+        if not isinstance(df, pd.DataFrame):
+            raise ValueError("`df` parameter must be a DataFrame object")
+        if not isinstance(structure, pd.DataFrame):
+            raise ValueError("`structure` parameter must be a DataFrame object")
+
+        self._structure_set(_header_signature(df, shape=shape, inits=inits, sep=sep), structure)
+
+    def fill(self, df=None, structure=None, keys=None, default=None,
+             shape='vertical', inits=1, sep=',', learn=None,
+             accu=0.75, form='full', token=None, email=None,
+             url=None, chunk_rows=None, max_workers=None, dedupe=False,
+             stream=False, lazy=False, compact=False, typed=False, prune=False):
+        """
+
+        Submits the request to the API fill endpoint using the pooled session of the client.
+        See rejustify.fill() for details.
+        """
+
+        # error handling
+        if chunk_rows is not None and not isinstance(chunk_rows, int):
+            raise ValueError("`chunk_rows` parameter must be an integer")
+        if chunk_rows is not None and chunk_rows < 1:
+            raise ValueError("`chunk_rows` parameter must be positive")
+        if max_workers is not None and not isinstance(max_workers, int):
+            raise ValueError("`max_workers` parameter must be an integer")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("`max_workers` parameter must be positive")
+        if dedupe is not None and not isinstance(dedupe, bool):
+            raise ValueError("`dedupe` parameter must be True/False")
+        if stream is not None and not isinstance(stream, bool):
+            raise ValueError("`stream` parameter must be True/False")
+        if stream and serialize.ijson is None:
+            raise ImportError("`stream` parameter requires the ijson package")
+        if lazy is not None and not isinstance(lazy, bool):
+            raise ValueError("`lazy` parameter must be True/False")
+        if compact is not None and not isinstance(compact, bool):
+            raise ValueError("`compact` parameter must be True/False")
+        if typed is not None and not isinstance(typed, bool):
+            raise ValueError("`typed` parameter must be True/False")
+        if prune is not None and not isinstance(prune, bool):
+            raise ValueError("`prune` parameter must be True/False")
+
+        # send only the unique combinations of the matching columns
+        if dedupe and isinstance(df, pd.DataFrame) and isinstance(structure, pd.DataFrame):
+            columns = _match_columns(structure, keys)
+            if len(columns) > 0:
+                # exact group codes in the order of the first occurrence
+                _df = df.iloc[:, columns]
+                codes = _df.groupby([_df.iloc[:, i] for i in range(len(columns))], sort=False,
+                                    dropna=False).ngroup().to_numpy()
+                unique = ~pd.Series(codes).duplicated().values
+                if not unique.all():
+                    out = self.fill(df=df[unique], structure=structure, keys=keys, default=default,
+                                    shape=shape, inits=inits, sep=sep, learn=learn, accu=accu, form=form,
+                                    token=token, email=email, url=url, chunk_rows=chunk_rows,
+                                    max_workers=max_workers, stream=stream, compact=compact, prune=prune)
+
+                    out = _broadcast_fill_output(out, df, structure, codes, inits=inits)
+
+                    return(_typed_output(out, inits=inits) if typed else out)
+
+        # split large data sets into chunks of rows
+        if chunk_rows is not None and isinstance(df, pd.DataFrame) and len(df) > chunk_rows:
+            chunks = [df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows)]
+            if max_workers is None:
+                max_workers = self.pool_size
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                outs = list(executor.map(lambda elem: self.fill(df=elem, structure=structure, keys=keys,
+                                                                default=default, shape=shape, inits=inits,
+                                                                sep=sep, learn=learn, accu=accu, form=form,
+                                                                token=token, email=email, url=url,
+                                                                stream=stream, compact=compact,
+                                                                prune=prune),
+                                         chunks))
+
+            out = _merge_fill_outputs(outs, inits=inits)
+
+            return(_typed_output(out, inits=inits) if typed else out)
+
+        # send only the matching and the empty columns
+        if prune and keys is not None and isinstance(df, pd.DataFrame) and isinstance(structure, pd.DataFrame):
+            columns = _prune_columns(structure, keys)
+            if len(columns) < df.shape[1]:
+                parts = _prune_parts(_fill_parts(structure, keys=keys, default=default), columns)
+                url, payload = self._fill_request(df=df.iloc[:, columns], structure=structure, keys=keys,
+                                                  default=default, shape=shape, inits=inits, sep=sep,
+                                                  learn=learn, accu=accu, form=form, token=token,
+                                                  email=email, url=url, parts=parts)
+                response_json = _unprune_response(self._post(url, payload, stream=stream), df,
+                                                  parts['structure'], structure, columns, inits=inits)
+                with self._phase('output', 'fill'):
+                    out = _fill_output(response_json, lazy=lazy, compact=compact, typed=typed, inits=inits)
+
+                return(out)
+
+        url, payload = self._fill_request(df=df, structure=structure, keys=keys, default=default,
+                                          shape=shape, inits=inits, sep=sep, learn=learn, accu=accu,
+                                          form=form, token=token, email=email, url=url)
+        response_json = self._post(url, payload, stream=stream)
+        with self._phase('output', 'fill'):
+            out = _fill_output(response_json, lazy=lazy, compact=compact, typed=typed, inits=inits)
+
+        return(out)
+
+    def fill_iter(self, chunks=None, structure=None, keys=None, default=None,
+                  shape='vertical', inits=1, sep=',', learn=None,
+                  accu=0.75, form='full', token=None, email=None,
+                  url=None, prefetch=4, stream=False, compact=False, typed=False):
+        """
+
+        Fills each chunk of an iterable of DataFrames and yields the results in order, keeping at most
+        prefetch requests in flight. See rejustify.fill_iter() for details.
+        """
+
+        # error handling
+        if isinstance(chunks, pd.DataFrame) or not isinstance(chunks, Iterable):
+            raise ValueError("`chunks` parameter must be an iterable of DataFrame objects")
+        if not isinstance(prefetch, int) or isinstance(prefetch, bool):
+            raise ValueError("`prefetch` parameter must be an integer")
+        if prefetch < 1:
+            raise ValueError("`prefetch` parameter must be positive")
+        if stream and serialize.ijson is None:
+            raise ImportError("`stream` parameter requires the ijson package")
+        _check_fill_args(df=pd.DataFrame(), structure=structure, keys=keys, default=default, shape=shape,
+                         inits=inits, sep=sep, learn=learn, accu=accu, form=form,
+                         token=token, email=email, url=url)
+
+        # structure, keys and default are converted once for all chunks
+        parts = _fill_parts(structure, keys=keys, default=default)
+
+        def _fill(df):
+            _url, payload = self._fill_request(df=df, structure=structure, keys=keys, default=default,
+                                               shape=shape, inits=inits, sep=sep, learn=learn, accu=accu,
+                                               form=form, token=token, email=email, url=url, parts=parts)
+            response_json = self._post(_url, payload, stream=stream)
+            with self._phase('output', 'fill'):
+                out = _fill_output(response_json, compact=compact, typed=typed, inits=inits)
+
+            return(out)
+
+        return(_prefetch(_fill, chunks, prefetch))
+
+    def fill_parallel(self, df=None, structure=None, keys=None, default=None,
+                      shape='vertical', inits=1, sep=',', learn=None,
+                      accu=0.75, form='full', token=None, email=None,
+                      url=None, partitions=None, max_workers=None, backend='process',
+                      compact=False, typed=False):
+        """
+
+        Fills the partitions of the rows of df in worker processes. See rejustify.fill_parallel() for details.
+        """
+
+        # error handling
+        _check_fill_args(df=df, structure=structure, keys=keys, default=default, shape=shape, inits=inits,
+                         sep=sep, learn=learn, accu=accu, form=form, token=token, email=email, url=url)
+        if not isinstance(df, pd.DataFrame):
+            raise ValueError("`df` parameter must be a DataFrame object")
+        if partitions is not None and (not isinstance(partitions, int) or partitions < 1):
+            raise ValueError("`partitions` parameter must be a positive integer")
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError("`max_workers` parameter must be a positive integer")
+        if backend not in {'process', 'dask'}:
+            raise ValueError("`backend` parameter must be process/dask")
+        if not isinstance(compact, bool):
+            raise ValueError("`compact` parameter must be True/False")
+        if not isinstance(typed, bool):
+            raise ValueError("`typed` parameter must be True/False")
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if partitions is None:
+            partitions = max_workers
+        bounds = sorted(set(np.linspace(0, len(df), min(partitions, max(len(df), 1)) + 1).astype(int)))
+        chunks = [df.iloc[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)] or [df]
+
+        # the workers create their own clients with the same connection details and account
+        settings = {'main_url': self.main_url, 'proxy_url': self.proxy_url, 'proxy_port': self.proxy_port,
+                    'learn': self.learn, 'token': self.token, 'email': self.email, 'compress': self.compress,
+                    'retries': self.retries, 'backoff': self.backoff,
+                    'rate': self.rate / min(max_workers, len(chunks)) if self.rate is not None else None,
+                    'burst': self.burst}
+        args = {'structure': structure, 'keys': keys, 'default': default, 'shape': shape, 'inits': inits,
+                'sep': sep, 'learn': learn, 'accu': accu, 'form': form, 'token': token, 'email': email,
+                'url': url}
+
+        if backend == 'dask':
+            try:
+                import dask
+            except ImportError:
+                raise ImportError("`backend` dask requires the dask package")
+
+            # the default scheduler of dask runs the tasks in threads, processes are used unless a scheduler
+            # (for instance a distributed client) is set
+            scheduler = dask.config.get('scheduler', None)
+            options = {} if scheduler is not None else {'scheduler': 'processes', 'num_workers': max_workers}
+            parts = dask.compute(*[dask.delayed(_fill_partition)(settings, elem, args) for elem in chunks],
+                                 **options)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                parts = list(executor.map(_fill_partition, [settings] * len(chunks), chunks,
+                                          [args] * len(chunks)))
+
+        with self._phase('output', 'fill'):
+            response_json = _merge_partitions(parts, df, structure, inits=inits)
+            out = _fill_output(response_json, compact=compact, typed=typed, inits=inits)
+
+        return(out)
+
+    def refresh(self, result=None, df=None, shape='vertical', inits=1, sep=',', learn=None,
+                accu=0.75, form='full', token=None, email=None, url=None, typed=False):
+        """
+
+        Fills only the new periods of df and appends them to result. See rejustify.refresh() for details.
+        """
+
+        # error handling
+        if not isinstance(result, Mapping) or \
+                not all(elem in result.keys() for elem in {'data', 'structure.x', 'keys', 'default'}):
+            raise ValueError("`result` parameter must be a dict returned by fill()")
+        if not isinstance(df, pd.DataFrame):
+            raise ValueError("`df` parameter must be a DataFrame object")
+
+        # typed data have no header rows
+        new = _new_periods(result['data'].iloc[0 if typed else inits:], df, result['structure.x'])
+        if not new.any():
+            return(dict(result))
+
+        out = self.fill(df=df[new], structure=result['structure.x'], keys=result['keys'],
+                        default=result['default'], shape=shape, inits=inits, sep=sep, learn=learn,
+                        accu=accu, form=form, token=token, email=email, url=url, typed=typed)
+
+        if typed:
+            return(_typed_output(_merge_fill_outputs([result, out], inits=0), inits=0))
+
+        return(_merge_fill_outputs([result, out], inits=inits))
+
+    def _analyze_request(self, df=None, shape="vertical", inits=1, fast=True, sep=",",
+                         learn=None, token=None, email=None, url=None,
+                         sample=None, sampling="random"):
+        with self._phase('validate', 'analyze'):
+            _check_analyze_args(df=df, shape=shape, inits=inits, fast=fast, sep=sep,
+                                learn=learn, token=token, email=email, url=url,
+                                sample=sample, sampling=sampling)
+
+        # set client variables
+        if learn is None:
+            learn = self.learn
+        if token is None:
+            token = self.token
+        if email is None:
+            email = self.email
+        if url is None:
+            url = self.main_url
+
+        with self._phase('payload', 'analyze'):
+            # draw the sample before serialization
+            if sample is not None:
+                df = _sample_rows(df, sample, sampling=sampling)
+
+            payload = _analyze_payload(df, shape=shape, inits=inits, fast=fast, sep=sep,
+                                       learn=learn, token=token, email=email)
+        self._observe('rows', df.shape[0], 'analyze')
+        self._observe('columns', df.shape[1], 'analyze')
+
+        return(url + "/analyze", payload)
+
+    def _fill_request(self, df=None, structure=None, keys=None, default=None, shape='vertical',
+                      inits=1, sep=',', learn=None, accu=0.75, form='full', token=None,
+                      email=None, url=None, parts=None):
+        with self._phase('validate', 'fill'):
+            _check_fill_args(df=df, structure=structure, keys=keys, default=default, shape=shape,
+                             inits=inits, sep=sep, learn=learn, accu=accu, form=form,
+                             token=token, email=email, url=url)
+
+        # set client variables
+        if learn is None:
+            learn = self.learn
+        if token is None:
+            token = self.token
+        if email is None:
+            email = self.email
+        if url is None:
+            url = self.main_url
+
+        with self._phase('payload', 'fill'):
+            payload = _fill_payload(df, structure, keys=keys, default=default, shape=shape,
+                                    inits=inits, sep=sep, learn=learn, accu=accu, form=form,
+                                    token=token, email=email, parts=parts)
+        self._observe('rows', df.shape[0], 'fill')
+        self._observe('columns', df.shape[1], 'fill')
+
+        return(url + "/fill", payload)
+
+    def _session(self):
+        # pooled session with keep-alive connections
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=self.pool_size,
+                                                pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({'Content-Type': 'application/json',
+                                'Accept-Encoding': serialize.ACCEPT_ENCODING})
+
+        return(session)
+
+    def _set_proxies(self):
+        # proxies are passed with every request, so that they take priority over the environment variables
+        if self._proxy() is not None:
+            self._proxies = {'http': self._proxy(), 'https': self._proxy()}
+        else:
+            self._proxies = None
+
+    def _proxy(self):
+        if self.proxy_url is not None and self.proxy_port is not None:
+            return(self.proxy_url + ':' + str(self.proxy_port))
+
+        return(None)
+
+    def _post(self, url, payload, stream=False):
+        endpoint = _endpoint(url)
+        if self._replay():
+            return(self.cassette.get(self.cassette.key(url, payload)))
+
+        # the payload is serialized once: without the account details for the cache key, which are then
+        # added to the body
+        with self._phase('serialize', endpoint):
+            body = serialize.dumps(_anonymous(payload) if self.cache is not None else payload)
+
+        # cached responses are recorded as well, so that the cassette covers every call
+        key, response_json = self._cache_get(url, body)
+        if response_json is not None:
+            self._record(url, payload, response_json)
+            return(response_json)
+
+        if self.cache is not None:
+            body = _with_account(body, payload)
+        self._observe('payload_bytes', len(body), endpoint)
+        if not self.coalesce:
+            return(self._send(url, payload, body, key, stream=stream))
+
+        # identical requests in flight are sent once, the other callers wait for the response
+        flight = _flight_key(url, body, stream=stream)
+        with self._flights_lock:
+            future = self._flights.get(flight)
+            leader = future is None
+            if leader:
+                future = self._flights[flight] = concurrent.futures.Future()
+        if not leader:
+            self._observe('coalesced', 1, endpoint)
+            return(copy.deepcopy(future.result()))
+
+        try:
+            response_json = self._send(url, payload, body, key, stream=stream)
+            future.set_result(response_json)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[flight]
+
+        return(response_json)
+
+    def _send(self, url, payload, body, key, stream=False):
+        endpoint = _endpoint(url)
+        limiter = self._limiter(payload.get('userToken'))
+
+        with self._phase('network', endpoint):
+            for attempt in range(self.retries + 1):
+                if limiter is not None:
+                    limiter.acquire()
+                if attempt > 0:
+                    self._observe('retry', 1, endpoint)
+
+                # send request, compressed bodies are streamed in chunks
+                try:
+                    if self.compress is not None:
+                        response = self.session.post(url, data=serialize.compress(body, self.compress),
+                                                     headers={'Content-Encoding': self.compress},
+                                                     proxies=self._proxies, stream=stream)
+                    else:
+                        response = self.session.post(url, data=body, proxies=self._proxies, stream=stream)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError):
+                    if attempt == self.retries:
+                        raise
+                    time.sleep(retry.backoff(attempt, base=self.backoff))
+                    continue
+
+                # transient failures are retried
+                if response.status_code not in retry.RETRY_STATUS or attempt == self.retries:
+                    break
+                delay = retry.retry_after(response.headers)
+                response.close()
+                time.sleep(delay if delay is not None else retry.backoff(attempt, base=self.backoff))
+
+        # streamed responses are parsed incrementally and not cached
+        if stream:
+            with self._phase('parse', endpoint):
+                response_json = _response_stream(response)
+            self._record(url, payload, response_json)
+            return(response_json)
+
+        self._observe('response_bytes', len(response.content), endpoint)
+        with self._phase('parse', endpoint):
+            response_json = _response_json(response)
+        self._cache_set(key, response_json)
+        self._record(url, payload, response_json)
+
+        return(response_json)
+
+    def _limiter(self, token):
+        # one token bucket for each account token
+        if self.rate is None:
+            return(None)
+        if token not in self._limiters:
+            self._limiters.setdefault(token, retry.TokenBucket(self.rate, burst=self.burst))
+
+        return(self._limiters[token])
+
+    def _cache_get(self, url, body):
+        if self.cache is None:
+            return(None, None)
+
+        key = fingerprint(url, body=body)
+        response_json = self.cache.get(key)
+        self._observe('cache_hit' if response_json is not None else 'cache_miss', 1, _endpoint(url))
+
+        return(key, response_json)
+
+    def _cache_set(self, key, response_json):
+        if self.cache is not None and key is not None:
+            self.cache.set(key, response_json)
+
+    def _structure_get(self, key):
+        records = self.structures.get(key)
+        if records is None and self.cache is not None:
+            records = self.cache.get('structure:' + key)
+            if records is not None:
+                self.structures[key] = records
+        if records is None:
+            return(None)
+
+        return(pd.DataFrame(records))
+
+    def _structure_set(self, key, structure):
+        records = structure.astype(object).where(pd.notnull(structure), None).to_dict('records')
+        self.structures[key] = records
+        if self.cache is not None:
+            self.cache.set('structure:' + key, records)
+
+    def _replay(self):
+        return(self.cassette is not None and self.cassette.mode == "replay")
+
+    def _record(self, url, payload, response_json):
+        if self.cassette is not None and self.cassette.mode == "record":
+            self.cassette.record(self.cassette.key(url, payload), url, payload, response_json)
+
+    def _phase(self, name, endpoint):
+        # phases are timed only if the metrics are collected
+        return(metrics.phase(self.metrics, name, endpoint=endpoint))
+
+    def _observe(self, name, value, endpoint):
+        metrics.observe(self.metrics, name, value, endpoint=endpoint)
+
+
+class FillResult(Mapping):
+    """
+
+    The output of fill(lazy=True). It keeps the response of the API fill endpoint and builds each block of
+    the output the first time it is accessed, which saves building dozens of small DataFrames when only
+    the data are used. The blocks are accessed as in the dict returned by fill(), and FillResult can be
+    converted to that dict with dict(result).
+
+    Examples:
+        rdf = fill(df, st, lazy = True)
+        rdf['data']
+
+    Attributes:
+        response(dict): The response of the API fill endpoint.
+        compact(bool): Build keys and default values as single DataFrames, see fill() for details.
+        typed(bool): Build data with typed columns, see fill() for details.
+        inits(int): Number of header rows in data.
+    """
+
+    _blocks = ('data', 'structure.x', 'structure.y', 'keys', 'default', 'message')
+
+    def __init__(self, response_json, compact=False, typed=False, inits=1):
+        self.response = response_json
+        self.compact = compact
+        self.typed = typed
+        self.inits = inits
+        self._values = {}
+
+    def __getitem__(self, key):
+        if key not in self._blocks:
+            raise KeyError(key)
+
+        if key not in self._values:
+            out = self.response['structure']['out']
+            if key == 'data' and self.typed:
+                self._values[key] = _typed_data(_data_frame(out['data']), self['structure.x'],
+                                                inits=self.inits)
+            elif key == 'data':
+                self._values[key] = _data_frame(out['data'])
+            elif key == 'structure.x':
+                self._values[key] = pd.DataFrame(out['structure'])
+            elif key == 'structure.y':
+                self._values[key] = _fill_structure_y(out)
+            elif key == 'keys':
+                self._values[key] = _fill_keys_frame(out) if self.compact else _fill_keys(out)
+            elif key == 'default':
+                self._values[key] = _fill_default_frame(out) if self.compact else _fill_default(out)
+            else:
+                self._values[key] = pd.DataFrame(self.response['structure']['message'])
+
+        return(self._values[key])
+
+    def __iter__(self):
+        return(iter(self._blocks))
+
+    def __len__(self):
+        return(len(self._blocks))
+
+    def __repr__(self):
+        return('FillResult(' + ', '.join(self._blocks) + ')')
+
+
+_client = None
+_partition_clients = {}
+
+
+def _default_client():
+    # the default client is created on first use and follows the global variables
+    global _client
+
+    if _client is None:
+        _client = Client()
+
+    return(_client)
+
+
+def _sync_default_client():
+    # propagate the global variables to the default client
+    if _client is not None:
+        _sync_client(_client)
+
+
+def _sync_client(client):
+    client.main_url = rejustify_main_url
+    client.proxy_url = rejustify_proxy_url
+    client.proxy_port = rejustify_proxy_port
+    client.learn = rejustify_learn
+    client.compress = rejustify_compress
+    client.token = rejustify_token
+    client.email = rejustify_email
+    client.cache = rejustify_cache
+    client.retries = rejustify_retries
+    client.backoff = rejustify_backoff
+    client.rate = rejustify_rate
+    client.burst = rejustify_burst
+    client.metrics = rejustify_metrics
+    client.cassette = rejustify_cassette
+    client.setRetry()
+    client.setCurl()
+
+
+def _check_compress(compress=None):
+    if compress is not None and compress is not False and compress not in {'gzip', 'zstd'}:
+        raise ValueError("`compress` parameter must be gzip/zstd or False")
+    if compress == 'zstd' and serialize.zstandard is None:
+        raise ValueError("zstd compression requires the zstandard package")
+
+
+def _check_retry(retries=None, backoff=None, rate=None, burst=None):
+    if retries is not None and (isinstance(retries, bool) or not isinstance(retries, int)):
+        raise ValueError("`retries` parameter must be an integer")
+    if retries is not None and retries < 0:
+        raise ValueError("`retries` parameter must be non-negative")
+    if backoff is not None and not isinstance(backoff, (int, float)):
+        raise ValueError("`backoff` parameter must be a number")
+    if backoff is not None and backoff < 0:
+        raise ValueError("`backoff` parameter must be non-negative")
+    if rate is not None and not isinstance(rate, (int, float)):
+        raise ValueError("`rate` parameter must be a number")
+    if rate is not None and rate < 0:
+        raise ValueError("`rate` parameter must be non-negative")
+    if burst is not None and (isinstance(burst, bool) or not isinstance(burst, int)):
+        raise ValueError("`burst` parameter must be an integer")
+    if burst is not None and burst < 1:
+        raise ValueError("`burst` parameter must be positive")
+
+
+def _check_analyze_args(df=None, shape="vertical", inits=1, fast=True, sep=",",
+                        learn=None, token=None, email=None, url=None,
+                        sample=None, sampling="random"):
+    # error handling
+    if df is not None and not isinstance(df, pd.DataFrame):
+        raise ValueError("`df` parameter must be a DataFrame object")
+    if df is None:
+        raise ValueError("`df` parameter must be a DataFrame object")
+    if shape != "vertical":
+        raise ValueError(
+            "`shape` parameter must be vertical (horizontal tables are not yet supported in Python)")
+    if inits is not None and not isinstance(inits, int):
+        raise ValueError("`inits` parameter must be an integer")
+    if inits is not None and inits > 1:
+        raise ValueError("Currently `inits` can be max 1")
+    if fast is not None and not isinstance(fast, bool):
+        raise ValueError("`fast` parameter must be True/False")
+    if sep is not None and not isinstance(sep, str):
+        raise ValueError("`sep` parameter must be a string")
+    if len(sep) > 3:
+        raise ValueError("`sep` has a maximum of 3 characters")
+    if learn is not None and not isinstance(learn, bool):
+        raise ValueError("`learn` parameter must be True/False")
+    if token is not None and not isinstance(token, str):
+        raise ValueError("`token` parameter must be a string")
+    if email is not None and not isinstance(email, str):
+        raise ValueError("`email` parameter must be a string")
+    if url is not None and not isinstance(url, str):
+        raise ValueError("`url` parameter must be a string")
+    if sample is not None and (isinstance(sample, bool) or not isinstance(sample, (int, float))):
+        raise ValueError("`sample` parameter must be an integer or a float")
+    if sample is not None and (sample <= 0 or (isinstance(sample, float) and sample > 1)):
+        raise ValueError("`sample` parameter must be a positive integer or a float between 0 and 1")
+    if sampling not in {"random", "stratified", "distinct"}:
+        raise ValueError("`sampling` parameter must be random/stratified/distinct")
+
+
+def _check_fill_args(df=None, structure=None, keys=None, default=None, shape='vertical',
+                     inits=1, sep=',', learn=None, accu=0.75, form='full', token=None,
+                     email=None, url=None):
     # error handling
     if df is not None and not isinstance(df, pd.DataFrame):
         raise ValueError("`df` parameter must be a DataFrame object")
@@ -608,11 +1883,15 @@ def fill(df=None, structure=None, keys=None, default=None,
         raise ValueError("`structure` parameter must be a DataFrame object")
     if structure is None:
         raise ValueError("`structure` parameter must be a DataFrame object")
-    if keys is not None and not isinstance(keys, list):
-        raise ValueError("`keys` parameter must be a list object")
-    if default is not None and not isinstance(default, dict):
-        raise ValueError("`default` parameter must be a dict object")
-    if shape is not "vertical":
+    if keys is not None and not isinstance(keys, (list, pd.DataFrame)):
+        raise ValueError("`keys` parameter must be a list or a DataFrame object")
+    if isinstance(keys, pd.DataFrame) and _block_type(keys) != "keys":
+        raise ValueError("`keys` parameter must be a list or keys returned by fill(compact=True)")
+    if default is not None and not isinstance(default, (dict, pd.DataFrame)):
+        raise ValueError("`default` parameter must be a dict or a DataFrame object")
+    if isinstance(default, pd.DataFrame) and _block_type(default) != "default":
+        raise ValueError("`default` parameter must be a dict or default returned by fill(compact=True)")
+    if shape != "vertical":
         raise ValueError(
             "`shape` parameter must be vertical (horizontal tables are not yet supported in Python)")
     if inits is not None and not isinstance(inits, int):
@@ -629,7 +1908,7 @@ def fill(df=None, structure=None, keys=None, default=None,
         raise ValueError("`accu` parameter must be a float")
     if accu is not None and (accu > 1 or accu < 0):
         raise ValueError("`accu` parameter must be between 0 and 1")
-    if form is not "full" and shape is not "reduced":
+    if form != "full" and shape != "reduced":
         raise ValueError("`form` parameter must be form/reduced")
     if token is not None and not isinstance(token, str):
         raise ValueError("`token` parameter must be a string")
@@ -638,40 +1917,33 @@ def fill(df=None, structure=None, keys=None, default=None,
     if url is not None and not isinstance(url, str):
         raise ValueError("`url` parameter must be a string")
 
-    # set global variables
-    if learn is None:
-        learn = rejustify_learn
-    if token is None:
-        token = rejustify_token
-    if email is None:
-        email = rejustify_email
-    if url is None:
-        url = rejustify_main_url
 
-    # reassign mutable objects
-    _df = df.copy()
-    _structure = structure.copy()
-    _keys = None if keys is None else copy.deepcopy(keys)
-    _default = None if default is None else copy.deepcopy(default)
+def _endpoint(url):
+    # the endpoint labels the metrics of the call
+    return(url.rstrip('/').rsplit('/', 1)[-1])
 
-    # convert DataFrame to array with correct naming
-    _df.loc[-1] = _df.columns
-    _df.index = _df.index + 1
-    _df = _df.sort_index()
 
-    # prepare the payload query
+def _analyze_payload(df, shape="vertical", inits=1, fast=True, sep=",",
+                     learn=True, token=None, email=None):
+    # prepare the payload query, data are serialized with the header row by serialize.dumps()
     payload = {}
-    payload['structure'] = _structure.where(pd.notnull(_structure), None).to_dict('records')
-    payload['data'] = _df.values.tolist()
-    payload['keys'] = None if _keys is None else _keys
-    if _default is not None:
-        _dd = []
-        for elem in _default['default']:
-            _dd.append(elem.where(pd.notnull(elem), None).to_dict('records'))
-        payload['meta'] = {'column.id.x': _default['column.id.x'],
-                           'default': _dd}
-    else:
-        payload['meta'] = None
+    payload['data'] = df
+    payload['userToken'] = token
+    payload['email'] = email
+    payload['dataShape'] = shape
+    payload['inits'] = inits
+    payload['fast'] = fast
+    payload['sep'] = sep
+    payload['dbAllowed'] = learn
+
+    return(payload)
+
+
+def _fill_payload(df, structure, keys=None, default=None, shape='vertical', inits=1,
+                  sep=',', learn=True, accu=0.75, form='full', token=None, email=None, parts=None):
+    # prepare the payload query, data are serialized with the header row by serialize.dumps()
+    payload = dict(parts if parts is not None else _fill_parts(structure, keys=keys, default=default))
+    payload['data'] = df
     payload['userToken'] = token
     payload['email'] = email
     payload['dataForm'] = form
@@ -681,16 +1953,34 @@ def fill(df=None, structure=None, keys=None, default=None,
     payload['direction'] = shape
     payload['inits'] = inits
 
-    # send request
-    if rejustify_proxy_url is not None and rejustify_proxy_port is not None:
-        response = requests.post(rejustify_main_url + "/fill",  data=json.dumps(payload),
-                                 headers={'Content-Type': 'application/json'},
-                                 proxies={'http': rejustify_proxy_url + ':' + rejustify_proxy_port,
-                                          'https': rejustify_proxy_url + ':' + rejustify_proxy_port})
+    return(payload)
+
+
+def _fill_parts(structure, keys=None, default=None):
+    # compact blocks are converted to the API format
+    if isinstance(keys, pd.DataFrame):
+        keys = _keys_records(keys)
+    if isinstance(default, pd.DataFrame):
+        default = _default_records(default)
+
+    # the parts of the payload which do not depend on the data; the inputs are only read, so they are
+    # referenced instead of copied
+    parts = {}
+    parts['structure'] = structure.where(pd.notnull(structure), None).to_dict('records')
+    parts['keys'] = keys
+    if default is not None:
+        _dd = []
+        for elem in default['default']:
+            _dd.append(elem if isinstance(elem, list) else elem.where(pd.notnull(elem), None).to_dict('records'))
+        parts['meta'] = {'column.id.x': default['column.id.x'],
+                         'default': _dd}
     else:
-        response = requests.post(rejustify_main_url + "/fill",  data=json.dumps(payload),
-                                 headers={'Content-Type': 'application/json'})
+        parts['meta'] = None
+
+    return(parts)
 
+
+def _response_json(response):
     try:
         response_json = response.json()
     except ValueError:
@@ -699,55 +1989,852 @@ def fill(df=None, structure=None, keys=None, default=None,
     if not response.ok:
         raise ValueError(response_json)
 
+    return(response_json)
+
+
+def _response_stream(response):
+    if not response.ok:
+        return(_response_json(response))
+
+    try:
+        response.raw.decode_content = True
+        return(serialize.parse_fill(response.raw))
+    finally:
+        response.close()
+
+
+def _analyze_output(response_json):
+    # output
+    try:
+        out = pd.DataFrame(response_json['structure'])
+    except:
+        out = "Consistency error. Check your input parameters."
+
+    return(out)
+
+
+def _fill_output(response_json, lazy=False, compact=False, typed=False, inits=1):
+    if lazy:
+        return(FillResult(response_json, compact=compact, typed=typed, inits=inits))
+
+    # output
+    try:
+        out = dict(FillResult(response_json, compact=compact, typed=typed, inits=inits))
+    except:
+        out = "Consistency error. Check your input parameters."
+
+    return(out)
+
+
+def _fill_columns(out):
     # adjust column ids
     out_column = []
-    for elem in response_json['structure']['out']['column']:
+    for elem in out['column']:
         out_column.append(elem[0])
 
+    return(out_column)
+
+
+def _fill_structure_y(out):
     # adjust structure.y
     out_structure_y = []
-    for elem in response_json['structure']['out']['meta']:
+    for elem in out['meta']:
         out_structure_y.append(pd.DataFrame(elem))
 
+    return({'column.id.x': _fill_columns(out), 'structure.y': out_structure_y})
+
+
+def _fill_keys(out):
     # adjust keys
-    if response_json['structure']['out']['keys'] is not None:
-        out_keys = []
-        for elem in response_json['structure']['out']['keys']:
-            if len(elem['id.x']) is 1:
-                elem['id.x'] = elem['id.x'][0]
-            if len(elem['name.x']) is 1:
-                elem['name.x'] = elem['name.x'][0]
-            if len(elem['id.y']) is 1:
-                elem['id.y'] = elem['id.y'][0]
-            if len(elem['name.y']) is 1:
-                elem['name.y'] = elem['name.y'][0]
-            if len(elem['class']) is 1:
-                elem['class'] = elem['class'][0]
-            if len(elem['method']) is 1:
-                elem['method'] = elem['method'][0]
-            if len(elem['column.id.x']) is 1:
-                elem['column.id.x'] = elem['column.id.x'][0]
-            if len(elem['column.name.x']) is 1:
-                elem['column.name.x'] = elem['column.name.x'][0]
-            out_keys.append(elem)
+    if out['keys'] is None:
+        raise ValueError("Consistency error. Check your input parameters.")
+
+    out_keys = []
+    for elem in out['keys']:
+        elem = dict(elem)
+        for item in ['id.x', 'name.x', 'id.y', 'name.y', 'class', 'method', 'column.id.x', 'column.name.x']:
+            if len(elem[item]) == 1:
+                elem[item] = elem[item][0]
+        out_keys.append(elem)
+
+    return(out_keys)
+
 
+def _fill_default(out):
     # adjust default
-    if response_json['structure']['out']['labels'] is not None:
-        out_default = []
-        for elem in response_json['structure']['out']['labels']:
-            out_default.append(pd.DataFrame(elem).transpose())
-            out_default[-1]['code_default'] = out_default[-1]['code_default'].str[0]
-            out_default[-1]['label_default'] = out_default[-1]['label_default'].str[0]
+    if out['labels'] is None:
+        raise ValueError("Consistency error. Check your input parameters.")
+
+    out_default = []
+    for elem in out['labels']:
+        out_default.append(pd.DataFrame(elem).transpose())
+        out_default[-1]['code_default'] = out_default[-1]['code_default'].str[0]
+        out_default[-1]['label_default'] = out_default[-1]['label_default'].str[0]
+
+    return({'column.id.x': _fill_columns(out), 'default': out_default})
+
+
+def _fill_keys_frame(out):
+    # one row for each link, built column by column
+    if out['keys'] is None:
+        raise ValueError("Consistency error. Check your input parameters.")
+
+    keys = {item: [] for item in _KEYS_COLUMNS}
+    for elem in out['keys']:
+        # a column without links keeps one row with empty link items, so that it is not lost
+        n = max(1, len(elem['id.x']))
+        keys['column.id.x'] += [_scalar(elem['column.id.x'])] * n
+        keys['column.name.x'] += [_scalar(elem['column.name.x'])] * n
+        for item in _KEYS_COLUMNS[2:]:
+            keys[item] += elem[item] if len(elem['id.x']) > 0 else [None]
+
+    keys = pd.DataFrame(keys, columns=_KEYS_COLUMNS)
+    if keys['id.x'].isnull().any():
+        keys[['id.x', 'id.y']] = keys[['id.x', 'id.y']].astype('Int64')
+
+    return(keys)
+
+
+def _fill_default_frame(out):
+    # one row for each dimension of the default values
+    if out['labels'] is None:
+        raise ValueError("Consistency error. Check your input parameters.")
+
+    default = {item: [] for item in _DEFAULT_COLUMNS}
+    for column, elem in zip(_fill_columns(out), out['labels']):
+        for dimension, value in elem.items():
+            default['column.id.x'].append(column)
+            default['dimension'].append(dimension)
+            default['code_default'].append(_scalar(value['code_default']))
+            default['label_default'].append(_scalar(value['label_default']))
+
+    return(pd.DataFrame(default, columns=_DEFAULT_COLUMNS))
+
+
+def _keys_records(keys):
+    # compact keys in the format of fill(), links grouped by column
+    records = []
+    names = dict(zip(keys['column.id.x'].tolist(), keys['column.name.x'].tolist()))
+    for column, elem in keys.groupby('column.id.x', sort=False):
+        elem = elem.astype(object).where(pd.notnull(elem), None)
+        # the placeholder row of a column without links gives empty lists
+        elem = elem.loc[elem['id.x'].notnull()]
+        record = {item: elem[item].tolist() for item in _KEYS_COLUMNS[2:]}
+        record['column.id.x'] = column
+        record['column.name.x'] = names[column]
+        records.append(record)
+
+    return(records)
+
+
+def _default_records(default):
+    # compact default values in the format of fill(), as sent to the API
+    columns = []
+    records = []
+    for column, elem in default.groupby('column.id.x', sort=False):
+        columns.append(column)
+        records.append(elem[['code_default', 'label_default']].astype(object)
+                       .where(pd.notnull(elem[['code_default', 'label_default']]), None).to_dict('records'))
+
+    return({'column.id.x': columns, 'default': records})
+
+
+def _prefetch(fun, chunks, prefetch):
+    # the chunks are read only when there is room in the queue
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=prefetch)
+    queue = collections.deque()
+    try:
+        for elem in chunks:
+            queue.append(executor.submit(fun, elem))
+            if len(queue) >= prefetch:
+                yield(queue.popleft().result())
+        while len(queue) > 0:
+            yield(queue.popleft().result())
+    finally:
+        for elem in queue:
+            elem.cancel()
+        executor.shutdown(wait=True)
 
-    # output
+
+def _typed_output(out, inits=1):
+    if not isinstance(out, Mapping):
+        return(out)
+
+    out = dict(out)
+    out['data'] = _typed_data(out['data'], out['structure.x'], inits=inits)
+
+    return(out)
+
+
+def _typed_data(data, structure, inits=1):
+    # the first header row gives the column names
+    if inits > 0:
+        _data = data.iloc[inits:].reset_index(drop=True)
+        _data.columns = [str(x) for x in data.iloc[0].tolist()]
+    else:
+        _data = data.copy(deep=False)
+
+    # columns are matched with structure.x through its column numbers, all columns in the full form and the
+    # filled columns in the reduced form; a column with many dimensions is described by its first row
+    first = {}
+    for i, x in enumerate(structure['column'].tolist()):
+        first.setdefault(int(x), i)
+    filled = sorted(set(int(x) for x in structure.loc[structure['empty'].astype(bool), 'column']))
+    if _data.shape[1] == len(first):
+        rows = [first.get(i + 1) for i in range(_data.shape[1])]
+    elif _data.shape[1] == len(filled):
+        rows = [first[x] for x in filled]
+    else:
+        names = {}
+        for i, x in enumerate(structure['name'].tolist()):
+            names.setdefault(str(x), i)
+        rows = [names.get(str(x)) for x in _data.columns]
+
+    columns = []
+    for i in range(_data.shape[1]):
+        if rows[i] is None:
+            columns.append(_data.iloc[:, i])
+            continue
+        elem = structure.iloc[rows[i]]
+        columns.append(_typed_column(_data.iloc[:, i], elem['class'], elem.get('format'),
+                                     filled=bool(elem['empty'])))
+
+    out = pd.concat(columns, axis=1, ignore_index=True)
+    out.columns = _data.columns
+
+    return(out)
+
+
+def _typed_column(values, klass, fmt=None, filled=False):
+    # missing values are given as None or empty strings
+    missing = values.isnull() | (values.astype(str) == '')
     try:
-        out = {'data': pd.DataFrame(response_json['structure']['out']['data']),
-               'structure.x': pd.DataFrame(response_json['structure']['out']['structure']),
-               'structure.y': {'column.id.x': out_column, 'structure.y': out_structure_y},
-               'keys': out_keys,
-               'default': {'column.id.x': out_column, 'default': out_default},
-               'message': pd.DataFrame(response_json['structure']['message'])}
-    except:
-        out = "Consistency error. Check your input parameters."
+        if klass == 'number' or filled:
+            return(pd.to_numeric(values.where(~missing, np.nan)))
+        if klass == 'time':
+            fmt = fmt if isinstance(fmt, str) and '%' in fmt else None
+            return(pd.to_datetime(values.where(~missing, None), format=fmt))
+    except (TypeError, ValueError, OverflowError):
+        if not filled:
+            return(values)
+
+    if klass in {'geography', 'general', 'unit', 'sector'} or filled:
+        return(values.where(~missing, None).astype('category'))
+
+    return(values)
+
+
+def _merge_fill_outputs(outs, inits=1):
+    # a chunk which failed the consistency checks invalidates the output
+    for elem in outs:
+        if not isinstance(elem, Mapping):
+            return(elem)
+
+    out = dict(outs[0])
+    for elem in outs[1:]:
+        if not elem['structure.x'].equals(out['structure.x']):
+            raise ValueError("Chunks returned inconsistent `structure.x`")
+        if len(elem['structure.y']['structure.y']) != len(out['structure.y']['structure.y']) or \
+                not all(x.equals(y) for x, y in zip(elem['structure.y']['structure.y'],
+                                                     out['structure.y']['structure.y'])):
+            raise ValueError("Chunks returned inconsistent `structure.y`")
+
+    # header rows are repeated in every chunk
+    header = out['data'].iloc[:inits].values.tolist()
+    data = [out['data']]
+    for elem in outs[1:]:
+        if elem['data'].iloc[:inits].values.tolist() == header:
+            data.append(elem['data'].iloc[inits:])
+        else:
+            data.append(elem['data'])
+    out['data'] = pd.concat(data, ignore_index=True)
+
+    # messages are merged without duplicates
+    message = pd.concat([elem['message'] for elem in outs], ignore_index=True)
+    out['message'] = message[~message.astype(str).duplicated()].reset_index(drop=True)
 
     return(out)
+
+
+def _fill_partition(settings, df, args):
+    # runs in a worker process, which keeps its client; a partition computed in the calling process (a threaded
+    # scheduler) closes its own client instead
+    if multiprocessing.parent_process() is None:
+        with Client(cache=False, metrics=False, cassette=False, **settings) as client:
+            return(_fill_partition_with(client, df, args))
+
+    client = _partition_clients.get(tuple(sorted(settings.items())))
+    if client is None:
+        client = Client(cache=False, metrics=False, cassette=False, **settings)
+        _partition_clients[tuple(sorted(settings.items()))] = client
+
+    return(_fill_partition_with(client, df, args))
+
+
+def _fill_partition_with(client, df, args):
+    # only the filled columns are sent back
+    url, payload = client._fill_request(df=df, **args)
+    response_json = client._post(url, payload)
+    try:
+        out = dict(response_json['structure']['out'])
+        data = out.pop('data')
+    except (KeyError, TypeError):
+        return({'response': response_json, 'header': None, 'columns': None})
+
+    # full data are returned with all columns, reduced data with the filled columns only
+    inits = args['inits']
+    structure = args['structure']
+    if len(data) > 0 and len(data[0]) == df.shape[1]:
+        columns = sorted(set(int(x) - 1 for x in structure.loc[structure['empty'].astype(bool), 'column']))
+    else:
+        columns = list(range(len(data[0]) if len(data) > 0 else 0))
+    values = {i: _partition_column([row[i] for row in data[inits:]]) for i in columns}
+
+    response_json = {**response_json, 'structure': {**response_json['structure'], 'out': out}}
+
+    return({'response': response_json, 'header': data[:inits], 'columns': values})
+
+
+def _partition_column(values):
+    # numeric columns are sent as numeric arrays, which are copied as a single buffer
+    try:
+        _values = np.array(values)
+    except (TypeError, ValueError, OverflowError):
+        _values = None
+    if _values is not None and _values.ndim == 1 and _values.dtype.kind in 'biuf':
+        return(_values)
+
+    _values = np.empty(len(values), dtype=object)
+    _values[:] = values
+
+    return(_values)
+
+
+def _merge_partitions(parts, df, structure, inits=1):
+    # a partition which failed invalidates the output
+    for elem in parts:
+        if elem['columns'] is None:
+            return(elem['response'])
+
+    response_json = parts[0]['response']
+    out = dict(response_json['structure']['out'])
+    columns = sorted(parts[0]['columns'].keys())
+    values = {i: np.concatenate([elem['columns'][i] for elem in parts]) for i in columns}
+
+    # filled columns are spliced into df, unless only the filled columns were returned
+    header = np.array(parts[0]['header'], dtype=object).reshape(inits, -1)
+    if header.shape[1] == df.shape[1]:
+        _data = pd.DataFrame(np.concatenate([header, df.to_numpy(dtype=object)]), dtype=object)
+    else:
+        _data = pd.DataFrame(np.concatenate([header, np.empty((len(df), header.shape[1]), dtype=object)]),
+                             dtype=object)
+    for i in columns:
+        _data.iloc[inits:, i] = values[i].astype(object)
+    out['data'] = _data
+
+    # messages are merged without duplicates
+    message = []
+    for elem in parts:
+        for msg in elem['response']['structure'].get('message') or []:
+            if msg not in message:
+                message.append(msg)
+
+    return({**response_json, 'structure': {**response_json['structure'], 'out': out, 'message': message}})
+
+
+def _match_columns(structure, keys=None):
+    # positions of the columns which drive the matching
+    if isinstance(keys, pd.DataFrame):
+        columns = structure.loc[structure['id'].isin(keys['id.x'].tolist()), 'column']
+    elif keys is not None:
+        ids = []
+        for elem in keys:
+            ids += elem['id.x'] if isinstance(elem['id.x'], list) else [elem['id.x']]
+        columns = structure.loc[structure['id'].isin(ids), 'column']
+    else:
+        columns = structure.loc[~structure['empty'].astype(bool), 'column']
+
+    return(sorted(set(int(x) - 1 for x in columns)))
+
+
+def _prune_columns(structure, keys):
+    # positions of the matching and the empty columns
+    empty = set(int(x) - 1 for x in structure.loc[structure['empty'].astype(bool), 'column'])
+
+    return(sorted(set(_match_columns(structure, keys)) | empty))
+
+
+def _prune_parts(parts, columns):
+    # columns and dimension ids are renumbered in the order of the kept columns
+    column = {x + 1: i + 1 for i, x in enumerate(columns)}
+    structure = [dict(elem) for elem in parts['structure'] if int(elem['column']) in column]
+    ids = {}
+    for elem in structure:
+        ids[elem['id']] = len(ids) + 1
+        elem['id'] = ids[elem['id']]
+        elem['column'] = column[int(elem['column'])]
+
+    keys = None
+    if parts['keys'] is not None:
+        keys = []
+        for elem in parts['keys']:
+            elem = dict(elem)
+            elem['id.x'] = _remap(elem['id.x'], ids)
+            elem['column.id.x'] = _remap(elem['column.id.x'], column)
+            keys.append(elem)
+
+    meta = None
+    if parts['meta'] is not None:
+        meta = dict(parts['meta'])
+        meta['column.id.x'] = _remap(meta['column.id.x'], column)
+
+    return({'structure': structure, 'keys': keys, 'meta': meta})
+
+
+def _unprune_response(response_json, df, pruned, structure, columns, inits=1):
+    try:
+        out = dict(response_json['structure']['out'])
+    except (KeyError, TypeError):
+        return(response_json)
+
+    # the renumbered columns and dimension ids are mapped back
+    column = {i + 1: x + 1 for i, x in enumerate(columns)}
+    ids = {elem['id']: old for elem, old in zip(pruned, structure.loc[structure['column'].astype(int)
+                                                                       .isin(column.values()), 'id'].tolist())}
+
+    out['column'] = [_remap(elem, column) for elem in out['column']]
+    if out.get('keys') is not None:
+        out['keys'] = [dict(elem, **{'id.x': _remap(elem['id.x'], ids),
+                                     'column.id.x': _remap(elem['column.id.x'], column)}) for elem in out['keys']]
+
+    # structure.x of the columns which were not sent is taken from the input
+    returned = []
+    for elem in out['structure']:
+        elem = dict(elem)
+        elem['id'] = ids.get(elem['id'], elem['id'])
+        elem['column'] = column.get(int(elem['column']), elem['column'])
+        returned.append(elem)
+    records = structure.loc[~structure['column'].astype(int).isin(column.values())]
+    records = records.astype(object).where(pd.notnull(records), None).to_dict('records')
+    out['structure'] = sorted(records + returned, key=lambda elem: (int(elem['column']), elem['id']))
+
+    # the filled columns are spliced into the data, unless only the filled columns were returned
+    data = _data_frame(out['data'])
+    if data.shape[1] == len(columns):
+        header = np.array([df.columns.tolist()] * inits, dtype=object)
+        _data = pd.DataFrame(np.concatenate([header, df.to_numpy(dtype=object)]), dtype=object)
+        for i in sorted(set(int(x) - 1 for x in structure.loc[structure['empty'].astype(bool), 'column'])):
+            _data.iloc[:, i] = data.iloc[:, columns.index(i)].values
+        out['data'] = _data
+
+    return({**response_json, 'structure': {**response_json['structure'], 'out': out}})
+
+
+def _remap(x, index):
+    # scalar or list of column numbers or dimension ids
+    return([index.get(elem, elem) for elem in x] if isinstance(x, list) else index.get(x, x))
+
+
+def _anonymous(payload):
+    # account details do not change the response
+    return({key: value for key, value in payload.items() if key not in {'userToken', 'email'}})
+
+
+def _with_account(body, payload):
+    # the account details are prepended to the serialized object, the order of the keys does not matter
+    account = {key: payload[key] for key in ['userToken', 'email'] if key in payload}
+    if len(account) == 0:
+        return(body)
+    head = serialize._dumps(account)
+
+    return(head[:-1] + b'}' if body == b'{}' else b''.join([head[:-1], b',', memoryview(body)[1:]]))
+
+
+def _flight_key(url, body, stream=False):
+    # streamed and parsed responses have different formats
+    return('%s %s %s' % (url, stream, hashlib.sha256(body).hexdigest()))
+
+
+def _broadcast_fill_output(out, df, structure, codes, inits=1):
+    if not isinstance(out, Mapping):
+        return(out)
+
+    data = out['data']
+    if data.shape[0] - inits != codes.max() + 1 or data.shape[1] != df.shape[1]:
+        raise ValueError("Couldn't broadcast the filled values")
+
+    # filled columns are taken from the unique rows, the others from df
+    body = data.iloc[inits:].values
+    _data = pd.DataFrame(df.to_numpy(dtype=object), columns=data.columns, dtype=object)
+    for i in sorted(set(int(x) - 1 for x in structure.loc[structure['empty'].astype(bool), 'column'])):
+        _data.iloc[:, i] = body[codes, i]
+
+    out = dict(out)
+    out['data'] = pd.concat([data.iloc[:inits], _data], ignore_index=True)
+
+    return(out)
+
+
+def _new_periods(data, df, structure):
+    # the first time column identifies the periods
+    time = structure.loc[structure['class'] == 'time']
+    if len(time) == 0:
+        raise ValueError("Couldn't identify the time dimension in `structure.x`")
+
+    i = int(time['column'].iloc[0]) - 1
+    fmt = time['format'].iloc[0] if 'format' in time.columns else None
+    if not isinstance(fmt, str) or '%' not in fmt:
+        fmt = None
+
+    # periods newer than the latest one, or periods not yet filled
+    old = pd.to_datetime(data.iloc[:, i], format=fmt, errors='coerce')
+    new = pd.to_datetime(df.iloc[:, i], format=fmt, errors='coerce')
+    if len(old) > 0 and not old.isnull().any() and not new.isnull().any():
+        return((new > old.max()).values)
+
+    return((~df.iloc[:, i].astype(str).isin(data.iloc[:, i].astype(str))).values)
+
+
+def _header_signature(df, shape="vertical", inits=1, sep=","):
+    # column names, data types and character patterns of a small sample of values
+    signature = [shape, inits, sep]
+    for i in range(df.shape[1]):
+        sample = df.iloc[:, i].dropna().astype(str)
+        sample = sample[sample != ''].head(5)
+        pattern = set()
+        for elem in sample:
+            pattern.update('9' if x.isdigit() else 'a' if x.isalpha() else x for x in elem)
+        signature.append([str(df.columns[i]), str(df.dtypes.iloc[i]), len(sample) == 0, sorted(pattern)])
+
+    return(hashlib.sha256(json.dumps(signature).encode('utf-8')).hexdigest())
+
+
+def _sample_rows(df, sample, sampling="random"):
+    n = sample if isinstance(sample, int) else int(math.ceil(sample * len(df)))
+    if n >= len(df):
+        return(df)
+
+    # samples are reproducible
+    random = np.random.RandomState(0)
+
+    if sampling == "random":
+        rows = random.choice(len(df), n, replace=False)
+    elif sampling == "stratified":
+        bounds = np.linspace(0, len(df), n + 1).astype(int)
+        rows = bounds[:-1] + (random.random_sample(n) * np.diff(bounds)).astype(int)
+    else:
+        k = max(1, n // max(1, df.shape[1]))
+        rows = []
+        for i in range(df.shape[1]):
+            rows.extend(np.flatnonzero(~df.iloc[:, i].astype(str).duplicated().values)[:k])
+
+        # at most n rows, even if there are more columns than rows in the sample
+        rows = list(dict.fromkeys(rows))[:n]
+
+        # the rest of the sample is drawn at random
+        rest = np.setdiff1d(np.arange(len(df)), rows)
+        rows.extend(random.choice(rest, max(0, n - len(set(rows))), replace=False))
+
+    # columns which are not empty keep at least one value
+    rows = set(rows)
+    for i in range(df.shape[1]):
+        values = np.flatnonzero((df.iloc[:, i].notnull() & (df.iloc[:, i].astype(str) != '')).values)
+        if len(values) > 0 and rows.isdisjoint(values):
+            rows.add(values[0])
+
+    return(df.iloc[sorted(rows)])
+
+
+def _data_frame(data):
+    # streamed responses are already parsed to a DataFrame
+    if isinstance(data, pd.DataFrame):
+        return(data)
+
+    return(pd.DataFrame(data))
+
+
+def _block_type(block):
+    # define block type
+    if isinstance(block, pd.DataFrame):
+        if all(elem in block.columns.values.tolist() for elem in {"id", "column", "name", "empty", "class", "feature", "cleaner", "format", "p_class", "provider", "table", "p_data"}):
+            return("structure")
+        if all(elem in block.columns.values.tolist() for elem in _KEYS_COLUMNS):
+            return("keys")
+        if all(elem in block.columns.values.tolist() for elem in _DEFAULT_COLUMNS):
+            return("default")
+    if isinstance(block, dict):
+        if all(elem in block.keys() for elem in {"column.id.x", "default"}):
+            return("default")
+    if isinstance(block, list) and len(block) > 0 and isinstance(block[0], dict):
+        if all(elem in block[0].keys() for elem in {"id.x", "name.x", "id.y", "name.y", "class", "method", "column.id.x", "column.name.x"}):
+            return("keys")
+
+    return("undefined")
+
+
+def _edit_records(edits):
+    # missing values in the table of edits are skipped
+    if isinstance(edits, pd.DataFrame):
+        return([{item: value for item, value in elem.items() if isinstance(value, list) or pd.notnull(value)}
+                for elem in edits.to_dict('records')])
+
+    if not all(isinstance(elem, dict) for elem in edits):
+        raise ValueError("`edits` parameter must be a list of dicts")
+
+    return(edits)
+
+
+def _as_list(x):
+    return(x if isinstance(x, list) else [x])
+
+
+def _scalar(x):
+    # single values are unwrapped as in fill()
+    return(x[0] if isinstance(x, list) and len(x) == 1 else x)
+
+
+def _integral(x):
+    # column numbers read from a table of edits may be numpy integers or floats
+    if isinstance(x, (np.integer, np.floating, float)) and not isinstance(x, bool) and float(x).is_integer():
+        return(int(x))
+
+    return(x)
+
+
+def _adjust_structure(block, edits):
+    # rows of the structure by id, column number and name
+    ids = {x: i for i, x in enumerate(block['id'].tolist())}
+    columns = {x: i for i, x in enumerate(block['column'].tolist())}
+    names = {x: i for i, x in enumerate(block['name'].tolist())}
+
+    # new values of each item, the last edit of the row wins
+    values = {}
+    for edit in edits:
+        if 'id' in edit:
+            rows = [ids.get(x) for x in _as_list(edit['id'])]
+        elif 'column' in edit:
+            rows = [columns.get(x) if isinstance(x, int) else names.get(x)
+                    for x in map(_integral, _as_list(edit['column']))]
+        else:
+            raise ValueError("Each edit must identify the dimension by 'id' or 'column'")
+        if None in rows:
+            raise ValueError("Couldn't identify the dimension 'column'")
+
+        items = {item: value for item, value in edit.items() if item not in {'id', 'column'}}
+        if any(elem in items.keys() for elem in {'provider', 'table'}):
+            items['p_data'] = -1
+        if any(elem in items.keys() for elem in {'class', 'feature', 'cleaner', 'format'}):
+            items['p_class'] = -1
+        for item, value in items.items():
+            if item not in block.columns:
+                raise ValueError("Couldn't identify the item '" + str(item) + "'")
+            for i in rows:
+                values.setdefault(item, {})[i] = value
+
+    # one assignment per item, the columns are copied only when changed
+    _block = block.copy(deep=False)
+    for item, changes in values.items():
+        column = _block[item].to_numpy(dtype=object, copy=True)
+        column[list(changes.keys())] = list(changes.values())
+        _block[item] = pd.Series(column, index=_block.index).infer_objects()
+
+    return(_block)
+
+
+def _adjust_default(block, edits):
+    if isinstance(block, pd.DataFrame):
+        return(_adjust_default_frame(block, edits))
+
+    # position of each column in the block
+    index = {x: i for i, x in enumerate(block['column.id.x'])}
+
+    changes = {}
+    for edit in edits:
+        column = edit['column'] if 'column' in edit else edit.get('id')
+        positions = [index.get(x) for x in _as_list(column)]
+        if None in positions:
+            raise ValueError("Couldn't identify the dimension 'column'")
+        items = {item: value for item, value in edit.items() if item not in {'id', 'column'}}
+        for i in positions:
+            changes.setdefault(i, {}).update(items)
+
+    # only the changed default values are copied
+    default = list(block['default'])
+    for i, items in changes.items():
+        default[i] = default[i].copy()
+        for elem, value in items.items():
+            default[i].loc[elem, 'code_default'] = value
+            default[i].loc[elem, 'label_default'] = None
+
+    _block = dict(block)
+    _block['default'] = default
+
+    return(_block)
+
+
+def _adjust_keys(block, edits):
+    if isinstance(block, pd.DataFrame):
+        return(_adjust_keys_frame(block, edits))
+
+    # positions of the keys of each column
+    index = {}
+    for i, elem in enumerate(block):
+        index.setdefault(_scalar(elem['column.id.x']), []).append(i)
+
+    _block = list(block)
+    links = {}
+    for edit in edits:
+        if 'column' not in edit:
+            raise ValueError("Each edit must identify the dimension by 'column'")
+        id_x = _as_list(edit.get('id.x'))
+        id_y = _as_list(edit.get('id.y')) if 'id.y' in edit else [None] * len(id_x)
+        method = _as_list(edit['method']) if edit.get('method') is not None else None
+        klass = _as_list(edit['class']) if edit.get('class') is not None else None
+        if len(id_x) != len(id_y):
+            raise ValueError("Item ids have different lengths")
+        if method is not None and len(method) != len(id_y):
+            raise ValueError("Methods have inconsistent lengths")
+        if klass is not None and len(klass) != len(id_y):
+            raise ValueError("Classes have inconsistent lengths")
+
+        rows = []
+        for x in _as_list(edit['column']):
+            if x not in index:
+                raise ValueError("Couldn't identify the dimension 'column'")
+            rows += index[x]
+
+        for i in rows:
+            # the element is copied on the first change, with the index of its dimensions
+            if i not in links:
+                elem = dict(_block[i])
+                for item in ['id.x', 'name.x', 'id.y', 'name.y', 'class', 'method']:
+                    elem[item] = list(_as_list(elem[item]))
+                _block[i] = elem
+                links[i] = ({x: j for j, x in enumerate(elem['id.x'])}, set())
+            elem = _block[i]
+            positions, removed = links[i]
+
+            for j in range(len(id_x)):
+                if id_x[j] in positions and id_y[j] is None:  # remove link
+                    removed.add(positions[id_x[j]])
+                elif id_x[j] in positions:  # change link
+                    k = positions[id_x[j]]
+                    removed.discard(k)
+                    elem['id.y'][k] = id_y[j]
+                    elem['name.y'][k] = None
+                    elem['method'][k] = method[j] if method is not None else 'synonym-proximity-matching'
+                    elem['class'][k] = klass[j] if klass is not None else 'general'
+                elif id_y[j] is not None:  # add link
+                    positions[id_x[j]] = len(elem['id.x'])
+                    elem['id.x'].append(id_x[j])
+                    elem['id.y'].append(id_y[j])
+                    elem['name.x'].append(None)
+                    elem['name.y'].append(None)
+                    elem['method'].append(method[j] if method is not None else 'synonym-proximity-matching')
+                    elem['class'].append(klass[j] if klass is not None else 'general')
+
+    # removed links are dropped at once
+    for i, (positions, removed) in links.items():
+        if len(removed) > 0:
+            elem = _block[i]
+            for item in ['id.x', 'name.x', 'id.y', 'name.y', 'class', 'method']:
+                elem[item] = [x for k, x in enumerate(elem[item]) if k not in removed]
+
+    return(_block)
+
+
+def _adjust_default_frame(block, edits):
+    # rows by column and dimension
+    index = {x: i for i, x in enumerate(zip(block['column.id.x'].tolist(), block['dimension'].tolist()))}
+    columns = set(block['column.id.x'].tolist())
+
+    changes = {}
+    for edit in edits:
+        column = edit['column'] if 'column' in edit else edit.get('id')
+        for x in _as_list(column):
+            if x not in columns:
+                raise ValueError("Couldn't identify the dimension 'column'")
+            for item, value in edit.items():
+                if item not in {'id', 'column'}:
+                    changes[(x, item)] = value
+
+    # changed rows are assigned at once, new dimensions are appended
+    code = block['code_default'].to_numpy(dtype=object, copy=True)
+    label = block['label_default'].to_numpy(dtype=object, copy=True)
+    new = []
+    for elem, value in changes.items():
+        if elem in index:
+            code[index[elem]] = value
+            label[index[elem]] = None
+        else:
+            new.append({'column.id.x': elem[0], 'dimension': elem[1], 'code_default': value, 'label_default': None})
+
+    _block = block.copy(deep=False)
+    _block['code_default'] = code
+    _block['label_default'] = label
+    if len(new) > 0:
+        _block = pd.concat([_block, pd.DataFrame(new, columns=block.columns)], ignore_index=True)
+
+    return(_block)
+
+
+def _adjust_keys_frame(block, edits):
+    # rows by column and id.x
+    index = {x: i for i, x in enumerate(zip(block['column.id.x'].tolist(), block['id.x'].tolist()))}
+    names = dict(zip(block['column.id.x'].tolist(), block['column.name.x'].tolist()))
+
+    links = {}
+    for edit in edits:
+        if 'column' not in edit:
+            raise ValueError("Each edit must identify the dimension by 'column'")
+        id_x = _as_list(edit.get('id.x'))
+        id_y = _as_list(edit.get('id.y')) if 'id.y' in edit else [None] * len(id_x)
+        method = _as_list(edit['method']) if edit.get('method') is not None else None
+        klass = _as_list(edit['class']) if edit.get('class') is not None else None
+        if len(id_x) != len(id_y):
+            raise ValueError("Item ids have different lengths")
+        if method is not None and len(method) != len(id_y):
+            raise ValueError("Methods have inconsistent lengths")
+        if klass is not None and len(klass) != len(id_y):
+            raise ValueError("Classes have inconsistent lengths")
+
+        for column in _as_list(edit['column']):
+            for j in range(len(id_x)):
+                links[(column, id_x[j])] = (id_y[j],
+                                            method[j] if method is not None else 'synonym-proximity-matching',
+                                            klass[j] if klass is not None else 'general')
+
+    # changed links are assigned at once, removed links are emptied and new links appended
+    values = {item: block[item].to_numpy(dtype=object, copy=True) for item in _KEYS_COLUMNS[2:]}
+    new = []
+    for (column, id_x), (id_y, method, klass) in links.items():
+        if (column, id_x) in index and id_y is None:
+            i = index[(column, id_x)]
+            for item in values:
+                values[item][i] = None
+        elif (column, id_x) in index:
+            i = index[(column, id_x)]
+            values['id.y'][i] = id_y
+            values['name.y'][i] = None
+            values['method'][i] = method
+            values['class'][i] = klass
+        elif id_y is not None:
+            new.append({'column.id.x': column, 'column.name.x': names.get(column), 'id.x': id_x, 'name.x': None,
+                        'id.y': id_y, 'name.y': None, 'class': klass, 'method': method})
+
+    _block = block.copy(deep=False)
+    for item, value in values.items():
+        _block[item] = value
+    if len(new) > 0:
+        _block = pd.concat([_block, pd.DataFrame(new, columns=block.columns)])
+
+    # the empty rows are dropped, except for one placeholder row of each column left without links
+    linked = _block['id.x'].notnull()
+    keep = linked | (~_block['column.id.x'].isin(_block.loc[linked, 'column.id.x']) &
+                     ~_block['column.id.x'].duplicated())
+
+    return(_block[keep.values].reset_index(drop=True))
+
+
+_KEYS_COLUMNS = ['column.id.x', 'column.name.x', 'id.x', 'name.x', 'id.y', 'name.y', 'class', 'method']
+_DEFAULT_COLUMNS = ['column.id.x', 'dimension', 'code_default', 'label_default']
@@ -0,0 +1,483 @@
+import copy
+import json
+import asyncio
+import functools
+import collections
+import pandas as pd
+from collections.abc import Iterable, Mapping
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import rejustify
+from rejustify import serialize
+from rejustify import retry
+from rejustify import Client, _analyze_output, _fill_output, _header_signature, _endpoint, _flight_key
+from rejustify import _anonymous, _with_account, _check_fill_args, _fill_parts, _merge_fill_outputs, _new_periods, _typed_output
+
+
+class AsyncClient(Client):
+    """
+
+    Asyncio counterpart of rejustify.Client. The client sends the API calls through a single aiohttp
+    session and limits the number of requests in flight with a semaphore, so that hundreds of analyze
+    or fill calls can be awaited at once from one event loop without blocking it.
+
+    The payload construction and the parsing of the responses are the same as in rejustify.analyze()
+    and rejustify.fill(). The aiohttp package is required (pip install rejustify[aio]).
+
+    Examples:
+        async with rejustify.aio.AsyncClient(token = "YOUR_TOKEN", email = "YOUR_EMAIL",
+                                             concurrency = 200) as client:
+            st = await client.analyze(df)
+            rdfs = await asyncio.gather(*[client.fill(elem, st) for elem in dfs])
+
+    Attributes:
+        main_url(str): Main address for rejustify API calls. By default read from global variables.
+        proxy_url(str): Address of the proxy server. By default read from global variables.
+        proxy_port(int): Port for communication with the proxy server. By default read from global variables.
+        learn(bool): Enable AI learning in all API calls of the client. By default read from global variables.
+        token(str): API token. By default read from global variables.
+        email(str): E-mail address for the account. By default read from global variables.
+        pool_size(int): Maximum number of open connections. The default is pool_size=100.
+        concurrency(int): Maximum number of requests in flight. The default is concurrency=100.
+        cache(Cache): Persistent cache of API responses, see rejustify.Cache. By default read from global
+            variables (see rejustify.setCache()). Set cache=False to disable caching.
+        compress(str): Compress the request bodies with gzip or zstd. By default read from global variables.
+        retries(int): Maximum number of retries of transient failures. By default read from global variables
+            (see rejustify.setRetry()).
+        backoff(float): Base delay of the exponential backoff in seconds. By default read from global variables.
+        rate(float): Maximum number of calls per second for each account token. By default read from global
+            variables.
+        burst(int): Maximum number of calls sent at once under the rate limit. By default read from global variables.
+        metrics(Metrics): Collects the timings and sizes of the API calls. By default read from global variables
+            (see rejustify.setMetrics()). Set metrics=False to disable the metrics.
+        cassette(Cassette): Records the API calls or replays them. By default read from global variables
+            (see rejustify.setCassette()). Set cassette=False to disable it.
+        coalesce(bool): Send identical requests which are awaited at the same time only once. The default is
+            coalesce=True.
+    """
+
+    def __init__(self, main_url=None, proxy_url=None, proxy_port=None, learn=None,
+                 token=None, email=None, pool_size=100, concurrency=100, cache=None,
+                 compress=None, retries=None, backoff=None, rate=None, burst=None, metrics=None,
+                 cassette=None, coalesce=True):
+
+        # error handling
+        if aiohttp is None:
+            raise ImportError("rejustify.aio requires the aiohttp package")
+        if concurrency is not None and not isinstance(concurrency, int):
+            raise ValueError("`concurrency` parameter must be an integer")
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("`concurrency` parameter must be positive")
+
+        self.concurrency = concurrency
+        self._semaphore = None
+        self._loop = None
+
+        super(AsyncClient, self).__init__(main_url=main_url, proxy_url=proxy_url, proxy_port=proxy_port,
+                                          learn=learn, token=token, email=email, pool_size=pool_size,
+                                          cache=cache, compress=compress, retries=retries,
+                                          backoff=backoff, rate=rate, burst=burst, metrics=metrics,
+                                          cassette=cassette, coalesce=coalesce)
+
+    async def __aenter__(self):
+        return(self)
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("Use `async with` with rejustify.aio.AsyncClient")
+
+    async def close(self):
+        """
+
+        Closes all open connections of the client.
+        """
+
+        if self.session is not None:
+            await self.session.close()
+        self.session = None
+        self._semaphore = None
+        self._loop = None
+
+    async def analyze(self, df=None, shape="vertical", inits=1, fast=True,
+                      sep=",", learn=None, token=None,
+                      email=None, url=None, memoize=False,
+                      sample=None, sampling="random"):
+        """
+
+        Submits the data set to the analyze API endpoint. See rejustify.analyze() for details.
+        """
+
+        # error handling
+        if memoize is not None and not isinstance(memoize, bool):
+            raise ValueError("`memoize` parameter must be True/False")
+
+        if memoize and isinstance(df, pd.DataFrame):
+            out = self._structure_get(_header_signature(df, shape=shape, inits=inits, sep=sep))
+            self._observe('structure_hit' if out is not None else 'structure_miss', 1, 'analyze')
+            if out is not None:
+                return(out)
+
+        url, payload = self._analyze_request(df=df, shape=shape, inits=inits, fast=fast, sep=sep,
+                                             learn=learn, token=token, email=email, url=url,
+                                             sample=sample, sampling=sampling)
+        response_json = await self._post(url, payload)
+        with self._phase('output', 'analyze'):
+            out = _analyze_output(response_json)
+
+        if memoize and isinstance(out, pd.DataFrame):
+            self._structure_set(_header_signature(df, shape=shape, inits=inits, sep=sep), out)
+
+        return(out)
+
+    async def fill(self, df=None, structure=None, keys=None, default=None,
+                   shape='vertical', inits=1, sep=',', learn=None,
+                   accu=0.75, form='full', token=None, email=None,
+                   url=None):
+        """
+
+        Submits the request to the API fill endpoint. See rejustify.fill() for details.
+        """
+
+        url, payload = self._fill_request(df=df, structure=structure, keys=keys, default=default,
+                                          shape=shape, inits=inits, sep=sep, learn=learn, accu=accu,
+                                          form=form, token=token, email=email, url=url)
+        response_json = await self._post(url, payload)
+        with self._phase('output', 'fill'):
+            out = _fill_output(response_json)
+
+        return(out)
+
+    def fill_iter(self, chunks=None, structure=None, keys=None, default=None,
+                  shape='vertical', inits=1, sep=',', learn=None,
+                  accu=0.75, form='full', token=None, email=None,
+                  url=None, prefetch=4, compact=False, typed=False):
+        """
+
+        Fills each chunk of an iterable of DataFrames and returns an asynchronous iterator of the results
+        in order, keeping at most prefetch requests in flight. See rejustify.fill_iter() for details.
+
+        Examples:
+            async for rdf in client.fill_iter(pd.read_csv("large.csv", chunksize = 100000), st):
+                rdf['data'].iloc[1:].to_csv("filled.csv", mode = "a", header = False, index = False)
+        """
+
+        # error handling
+        if isinstance(chunks, pd.DataFrame) or not isinstance(chunks, Iterable):
+            raise ValueError("`chunks` parameter must be an iterable of DataFrame objects")
+        if not isinstance(prefetch, int) or isinstance(prefetch, bool):
+            raise ValueError("`prefetch` parameter must be an integer")
+        if prefetch < 1:
+            raise ValueError("`prefetch` parameter must be positive")
+        _check_fill_args(df=pd.DataFrame(), structure=structure, keys=keys, default=default, shape=shape,
+                         inits=inits, sep=sep, learn=learn, accu=accu, form=form,
+                         token=token, email=email, url=url)
+
+        # structure, keys and default are converted once for all chunks
+        parts = _fill_parts(structure, keys=keys, default=default)
+
+        async def _fill(df):
+            _url, payload = self._fill_request(df=df, structure=structure, keys=keys, default=default,
+                                               shape=shape, inits=inits, sep=sep, learn=learn, accu=accu,
+                                               form=form, token=token, email=email, url=url, parts=parts)
+            response_json = await self._post(_url, payload)
+            with self._phase('output', 'fill'):
+                out = _fill_output(response_json, compact=compact, typed=typed, inits=inits)
+
+            return(out)
+
+        return(_prefetch(_fill, chunks, prefetch))
+
+    async def refresh(self, result=None, df=None, shape='vertical', inits=1, sep=',', learn=None,
+                      accu=0.75, form='full', token=None, email=None, url=None, typed=False):
+        """
+
+        Fills only the new periods of df and appends them to result. See rejustify.refresh() for details.
+        """
+
+        # error handling
+        if not isinstance(result, Mapping) or \
+                not all(elem in result.keys() for elem in {'data', 'structure.x', 'keys', 'default'}):
+            raise ValueError("`result` parameter must be a dict returned by fill()")
+        if not isinstance(df, pd.DataFrame):
+            raise ValueError("`df` parameter must be a DataFrame object")
+
+        # typed data have no header rows
+        new = _new_periods(result['data'].iloc[0 if typed else inits:], df, result['structure.x'])
+        if not new.any():
+            return(dict(result))
+
+        out = await self.fill(df=df[new], structure=result['structure.x'], keys=result['keys'],
+                              default=result['default'], shape=shape, inits=inits, sep=sep, learn=learn,
+                              accu=accu, form=form, token=token, email=email, url=url)
+
+        if typed:
+            out = _typed_output(out, inits=inits)
+            return(_typed_output(_merge_fill_outputs([result, out], inits=0), inits=0))
+
+        return(_merge_fill_outputs([result, out], inits=inits))
+
+    async def fill_parallel(self, df=None, structure=None, keys=None, default=None,
+                            shape='vertical', inits=1, sep=',', learn=None,
+                            accu=0.75, form='full', token=None, email=None,
+                            url=None, partitions=None, max_workers=None, backend='process',
+                            compact=False, typed=False):
+        """
+
+        Fills the partitions of the rows of df in worker processes, without blocking the event loop.
+        See rejustify.fill_parallel() for details.
+        """
+
+        fun = functools.partial(Client.fill_parallel, self, df=df, structure=structure, keys=keys,
+                                default=default, shape=shape, inits=inits, sep=sep, learn=learn,
+                                accu=accu, form=form, token=token, email=email, url=url,
+                                partitions=partitions, max_workers=max_workers, backend=backend,
+                                compact=compact, typed=typed)
+
+        return(await asyncio.get_running_loop().run_in_executor(None, fun))
+
+    def _session(self):
+        # aiohttp sessions are bound to the running event loop, see _open()
+        return(None)
+
+    def _set_proxies(self):
+        # aiohttp takes the proxy for every request
+        pass
+
+    def _open(self):
+        loop = asyncio.get_running_loop()
+
+        if self.session is None or self.session.closed or self._loop is not loop:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size),
+                                                 headers={'Content-Type': 'application/json'})
+            self._semaphore = None
+            self._loop = loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _post(self, url, payload):
+        endpoint = _endpoint(url)
+        if self._replay():
+            return(self.cassette.get(self.cassette.key(url, payload)))
+
+        # the payload is serialized once: without the account details for the cache key, which are then
+        # added to the body
+        with self._phase('serialize', endpoint):
+            body = serialize.dumps(_anonymous(payload) if self.cache is not None else payload)
+
+        # cached responses are recorded as well, so that the cassette covers every call
+        key, response_json = self._cache_get(url, body)
+        if response_json is not None:
+            self._record(url, payload, response_json)
+            return(response_json)
+
+        self._open()
+        if self.cache is not None:
+            body = _with_account(body, payload)
+        self._observe('payload_bytes', len(body), endpoint)
+        if not self.coalesce:
+            return(await self._send(url, payload, body, key))
+
+        # identical requests in flight are sent once by a task, which goes on if the coroutine that started it
+        # is cancelled, so that the other coroutines awaiting the response are not cancelled with it
+        flight = _flight_key(url, body)
+        task = self._flights.get(flight)
+        if task is not None:
+            self._observe('coalesced', 1, endpoint)
+            return(copy.deepcopy(await asyncio.shield(task)))
+
+        task = self._flights[flight] = asyncio.ensure_future(self._send(url, payload, body, key))
+        task.add_done_callback(lambda task: self._flight_done(flight, task))
+
+        return(await asyncio.shield(task))
+
+    def _flight_done(self, flight, task):
+        if self._flights.get(flight) is task:
+            del self._flights[flight]
+
+        # the error is raised to the awaiting coroutines, it is not reported again if none is left
+        if not task.cancelled():
+            task.exception()
+
+    async def _send(self, url, payload, body, key):
+        endpoint = _endpoint(url)
+        limiter = self._limiter(payload.get('userToken'))
+
+        with self._phase('network', endpoint):
+            for attempt in range(self.retries + 1):
+                if limiter is not None:
+                    await limiter.acquire_async()
+                if attempt > 0:
+                    self._observe('retry', 1, endpoint)
+
+                # send request, compressed bodies are streamed in chunks
+                if self.compress is not None:
+                    data = _chunks(serialize.compress(body, self.compress))
+                    headers = {'Content-Encoding': self.compress}
+                else:
+                    data = body
+                    headers = None
+
+                delay = None
+                try:
+                    async with self._semaphore:
+                        async with self.session.post(url, data=data, headers=headers,
+                                                     proxy=self._proxy()) as response:
+                            # transient failures are retried
+                            if response.status in retry.RETRY_STATUS and attempt < self.retries:
+                                delay = retry.retry_after(response.headers)
+                                if delay is None:
+                                    delay = retry.backoff(attempt, base=self.backoff)
+                            else:
+                                content = await response.read()
+                                ok = response.ok
+                except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+                    if attempt == self.retries:
+                        raise
+                    delay = retry.backoff(attempt, base=self.backoff)
+
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+
+        # the response is parsed outside of the semaphore
+        self._observe('response_bytes', len(content), endpoint)
+        with self._phase('parse', endpoint):
+            try:
+                response_json = json.loads(content)
+            except ValueError:
+                raise ValueError("Invalid response from rejustify (JSON expected)")
+
+        if not ok:
+            raise ValueError(response_json)
+
+        self._cache_set(key, response_json)
+        self._record(url, payload, response_json)
+
+        return(response_json)
+
+
+async def _prefetch(fun, chunks, prefetch):
+    # the chunks are read only when there is room in the queue
+    queue = collections.deque()
+    try:
+        for elem in chunks:
+            queue.append(asyncio.ensure_future(fun(elem)))
+            if len(queue) >= prefetch:
+                yield(await queue.popleft())
+        while len(queue) > 0:
+            yield(await queue.popleft())
+    finally:
+        for elem in queue:
+            elem.cancel()
+
+
+_client = None
+
+
+def setConcurrency(concurrency=None, pool_size=None):
+    """
+
+    This command sets the limits of the default asyncio client used by rejustify.aio.analyze()
+    and rejustify.aio.fill().
+
+    Examples:
+        rejustify.aio.setConcurrency(concurrency = 300, pool_size = 300)
+
+    Attributes:
+        concurrency(int): Maximum number of requests in flight. The default is concurrency=100.
+        pool_size(int): Maximum number of open connections. The default is pool_size=100.
+    """
+
+    # error handling
+    if concurrency is not None and not isinstance(concurrency, int):
+        raise ValueError("`concurrency` parameter must be an integer")
+    if concurrency is not None and concurrency < 1:
+        raise ValueError("`concurrency` parameter must be positive")
+    if pool_size is not None and not isinstance(pool_size, int):
+        raise ValueError("`pool_size` parameter must be an integer")
+    if pool_size is not None and pool_size < 1:
+        raise ValueError("`pool_size` parameter must be positive")
+
+    client = _default_client()
+
+    # the new concurrency limit applies to the next request and the new pool size
+    # to the next session, i.e. after rejustify.aio.close() or in a new event loop
+    if concurrency is not None:
+        client.concurrency = concurrency
+        client._semaphore = None
+    if pool_size is not None:
+        client.pool_size = pool_size
+
+
+async def close():
+    """
+
+    This command closes all open connections of the default asyncio client.
+
+    Examples:
+        await rejustify.aio.close()
+    """
+
+    if _client is not None:
+        await _client.close()
+
+
+async def analyze(df=None, shape="vertical", inits=1, fast=True,
+                  sep=",", learn=None, token=None,
+                  email=None, url=None, memoize=False,
+                  sample=None, sampling="random"):
+    """
+
+    Asyncio version of rejustify.analyze(). The connection and account details are read from
+    the global variables set by rejustify.setCurl() and rejustify.register().
+
+    Examples:
+        st = await rejustify.aio.analyze(df)
+    """
+
+    return(await _default_client().analyze(df=df, shape=shape, inits=inits, fast=fast,
+                                           sep=sep, learn=learn, token=token,
+                                           email=email, url=url, memoize=memoize,
+                                           sample=sample, sampling=sampling))
+
+
+async def fill(df=None, structure=None, keys=None, default=None,
+               shape='vertical', inits=1, sep=',', learn=None,
+               accu=0.75, form='full', token=None, email=None,
+               url=None):
+    """
+
+    Asyncio version of rejustify.fill(). The connection and account details are read from
+    the global variables set by rejustify.setCurl() and rejustify.register().
+
+    Examples:
+        rdfs = await asyncio.gather(*[rejustify.aio.fill(elem, st) for elem in dfs])
+    """
+
+    return(await _default_client().fill(df=df, structure=structure, keys=keys, default=default,
+                                        shape=shape, inits=inits, sep=sep, learn=learn,
+                                        accu=accu, form=form, token=token, email=email,
+                                        url=url))
+
+
+def _default_client():
+    # the default client is created on first use and follows the global variables
+    global _client
+
+    if _client is None:
+        _client = AsyncClient()
+    else:
+        rejustify._sync_client(_client)
+
+    return(_client)
+
+
+async def _chunks(chunks):
+    for chunk in chunks:
+        yield chunk
@@ -0,0 +1,246 @@
+import copy
+import time
+import inspect
+import threading
+import collections
+import concurrent.futures
+import pandas as pd
+from collections.abc import Mapping
+
+import rejustify
+from rejustify.cache import fingerprint
+from rejustify import _check_fill_args, _fill_parts, _default_client
+
+
+class Batcher(object):
+    """
+
+    Front-end merging many small fill calls into fewer API requests. The calls which share the structure,
+    keys, default values, column names and fill parameters are collected for a few milliseconds (or until
+    max_rows rows are waiting), sent as a single fill request, and the returned data is split back to the
+    callers in the order of their rows. Each caller receives its own copy of the other blocks (structure.x,
+    structure.y, keys, default values and messages).
+
+    This suits services which fill thousands of frames of a few rows each, where the request overhead
+    dominates. Each call waits at most delay seconds longer than it would alone.
+
+    Examples:
+        with rejustify.batch.Batcher(client, delay = 0.005, max_rows = 1000) as batcher:
+            # from many threads
+            future = batcher.submit(df, st, keys = keys)
+            rdf = future.result()
+
+            # or blocking
+            rdf = batcher.fill(df, st, keys = keys)
+
+    Attributes:
+        client(Client): Client sending the requests. By default the client of the module-level functions,
+            which follows setCurl() and register(). An AsyncClient is not supported, as the requests are
+            sent from a pool of threads.
+        delay(float): Maximum time in seconds a call waits for other calls to join its request.
+            The default is delay=0.005.
+        max_rows(int): Number of rows which sends the request without waiting. The default is max_rows=1000.
+        max_workers(int): Maximum number of merged requests in flight. The default is the pool_size of the client.
+    """
+
+    def __init__(self, client=None, delay=0.005, max_rows=1000, max_workers=None):
+
+        # error handling
+        if client is not None and not isinstance(client, rejustify.Client):
+            raise ValueError("`client` parameter must be a Client object")
+        if client is not None and inspect.iscoroutinefunction(client.fill):
+            raise ValueError("`client` parameter must be a Client object, AsyncClient is not supported")
+        if not isinstance(delay, (int, float)) or isinstance(delay, bool) or delay < 0:
+            raise ValueError("`delay` parameter must be a non-negative number")
+        if not isinstance(max_rows, int) or isinstance(max_rows, bool) or max_rows < 1:
+            raise ValueError("`max_rows` parameter must be a positive integer")
+        if max_workers is not None and (not isinstance(max_workers, int) or max_workers < 1):
+            raise ValueError("`max_workers` parameter must be a positive integer")
+
+        self.client = client
+        self.delay = delay
+        self.max_rows = max_rows
+        self.max_workers = max_workers or (client.pool_size if client is not None else 10)
+
+        self._batches = collections.OrderedDict()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return(self)
+
+    def __exit__(self, *args):
+        self.close()
+
+    def submit(self, df=None, structure=None, keys=None, default=None,
+               shape='vertical', inits=1, sep=',', learn=None,
+               accu=0.75, form='full', token=None, email=None,
+               url=None, compact=False, typed=False):
+        """
+
+        Queues the fill call and returns a concurrent.futures.Future of its result. The arguments are the same
+        as in rejustify.fill().
+        """
+
+        # error handling
+        _check_fill_args(df=df, structure=structure, keys=keys, default=default, shape=shape, inits=inits,
+                         sep=sep, learn=learn, accu=accu, form=form, token=token, email=email, url=url)
+        if not isinstance(compact, bool):
+            raise ValueError("`compact` parameter must be True/False")
+        if not isinstance(typed, bool):
+            raise ValueError("`typed` parameter must be True/False")
+
+        args = {'structure': structure, 'keys': keys, 'default': default, 'shape': shape, 'inits': inits,
+                'sep': sep, 'learn': learn, 'accu': accu, 'form': form, 'token': token, 'email': email,
+                'url': url, 'compact': compact, 'typed': typed}
+        key = _batch_key(df, args)
+        future = concurrent.futures.Future()
+
+        with self._condition:
+            if self._closed:
+                raise ValueError("The batcher is closed")
+
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = _Batch(args, time.monotonic() + self.delay)
+                self._batches[key] = batch
+                self._condition.notify()
+            batch.dfs.append(df)
+            batch.futures.append(future)
+            batch.rows += len(df)
+
+            if batch.rows >= self.max_rows:
+                del self._batches[key]
+                self._send(batch)
+
+        return(future)
+
+    def fill(self, df=None, structure=None, keys=None, default=None,
+             shape='vertical', inits=1, sep=',', learn=None,
+             accu=0.75, form='full', token=None, email=None,
+             url=None, compact=False, typed=False):
+        """
+
+        Queues the fill call and waits for its result. See rejustify.fill() for details.
+        """
+
+        return(self.submit(df=df, structure=structure, keys=keys, default=default, shape=shape, inits=inits,
+                           sep=sep, learn=learn, accu=accu, form=form, token=token, email=email, url=url,
+                           compact=compact, typed=typed).result())
+
+    def flush(self):
+        """
+
+        Sends all queued calls without waiting for the delay.
+        """
+
+        with self._condition:
+            batches = list(self._batches.values())
+            self._batches.clear()
+            for batch in batches:
+                self._send(batch)
+
+    def close(self):
+        """
+
+        Sends the queued calls, waits for all results and stops the background threads.
+        """
+
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _run(self):
+        # the batches are sent when their delay expires, or all at once when the batcher is closed
+        with self._condition:
+            while True:
+                if self._closed:
+                    for batch in self._batches.values():
+                        self._send(batch)
+                    self._batches.clear()
+                    return
+
+                now = time.monotonic()
+                for key in [key for key, batch in self._batches.items() if batch.deadline <= now]:
+                    self._send(self._batches.pop(key))
+
+                if len(self._batches) > 0:
+                    self._condition.wait(min(batch.deadline for batch in self._batches.values()) - now)
+                else:
+                    self._condition.wait()
+
+    def _send(self, batch):
+        # futures cancelled while queued are dropped together with their rows
+        alive = [i for i, future in enumerate(batch.futures) if future.set_running_or_notify_cancel()]
+        if len(alive) > 0:
+            self._executor.submit(self._fill, batch.args, [batch.dfs[i] for i in alive],
+                                  [batch.futures[i] for i in alive])
+
+    def _fill(self, args, dfs, futures):
+        try:
+            client = self.client if self.client is not None else _default_client()
+            client._observe('batch_calls', len(dfs), 'fill')
+
+            df = pd.concat(dfs, ignore_index=True) if len(dfs) > 1 else dfs[0]
+            out = client.fill(df=df, **args)
+            outs = _split_fill_output(out, [len(elem) for elem in dfs], inits=args['inits'],
+                                      typed=args['typed'])
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for future, elem in zip(futures, outs):
+            future.set_result(elem)
+
+
+class _Batch(object):
+
+    def __init__(self, args, deadline):
+        self.args = args
+        self.deadline = deadline
+        self.dfs = []
+        self.futures = []
+        self.rows = 0
+
+
+def _batch_key(df, args):
+    # calls are merged only if they would send the same payload apart from the data rows
+    parts = _fill_parts(args['structure'], keys=args['keys'], default=args['default'])
+    key = {elem: value for elem, value in args.items() if elem not in {'structure', 'keys', 'default'}}
+    key.update(parts)
+    key['columns'] = [str(x) for x in df.columns]
+
+    return(fingerprint('fill', key))
+
+
+def _split_fill_output(out, rows, inits=1, typed=False):
+    # a request which failed the consistency checks fails all its calls
+    if not isinstance(out, Mapping):
+        return([out] * len(rows))
+
+    # typed data has the header as column names instead of the first rows
+    offset = 0 if typed else inits
+    data = out['data']
+    if data.shape[0] - offset != sum(rows):
+        raise ValueError("Couldn't split the filled values")
+
+    outs = []
+    start = offset
+    for elem in rows:
+        _out = {key: value if key == 'data' else copy.deepcopy(value) for key, value in out.items()}
+        if typed:
+            _out['data'] = data.iloc[start:start + elem].reset_index(drop=True)
+        else:
+            _out['data'] = pd.concat([data.iloc[:inits], data.iloc[start:start + elem]], ignore_index=True)
+        outs.append(_out)
+        start += elem
+
+    return(outs)
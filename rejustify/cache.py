@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+from rejustify import serialize
+
+
+class Cache(object):
+    """
+
+    Persistent cache of API responses stored in a local SQLite database. The responses are keyed by the
+    fingerprint of the request payload, which excludes the account details (token and email), such that
+    repeated analyze or fill calls with identical data and parameters are served from disk.
+
+    Entries older than ttl seconds are discarded on access. If the total size of the stored responses
+    exceeds max_size bytes, the least recently used entries are evicted.
+
+    Examples:
+        cache = rejustify.Cache(ttl = 24 * 3600, max_size = 500 * 1024 ** 2)
+        client = rejustify.Client(cache = cache)
+
+    Attributes:
+        path(str): Location of the SQLite database. The default is ~/.rejustify/cache.sqlite.
+        ttl(int or float): Time to live of the cached responses in seconds. By default responses do not expire.
+        max_size(int): Maximum total size of the cached responses in bytes (compressed). By default unlimited.
+    """
+
+    def __init__(self, path=None, ttl=None, max_size=None):
+
+        # error handling
+        if path is not None and not isinstance(path, str):
+            raise ValueError("`path` parameter must be a string")
+        if ttl is not None and not isinstance(ttl, (int, float)):
+            raise ValueError("`ttl` parameter must be a number")
+        if max_size is not None and not isinstance(max_size, int):
+            raise ValueError("`max_size` parameter must be an integer")
+
+        if path is None:
+            path = os.path.join(os.path.expanduser('~'), '.rejustify', 'cache.sqlite')
+        if os.path.dirname(path) != '' and not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value BLOB, "
+                             "size INTEGER, created REAL, accessed REAL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def get(self, key):
+        """
+
+        Returns the cached response for the given fingerprint, or None if it is missing or expired.
+        """
+
+        with self._lock, self._db:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return(None)
+            if self.ttl is not None and time.time() - row[1] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return(None)
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+
+        return(json.loads(zlib.decompress(row[0]).decode('utf-8')))
+
+    def set(self, key, value):
+        """
+
+        Stores the response under the given fingerprint and evicts the least recently used entries
+        above max_size.
+        """
+
+        blob = zlib.compress(json.dumps(value).encode('utf-8'))
+        now = time.time()
+
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                             (key, sqlite3.Binary(blob), len(blob), now, now))
+
+            if self.max_size is not None:
+                total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_size:
+                    evict = []
+                    for elem in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                        if total <= self.max_size:
+                            break
+                        evict.append((elem[0],))
+                        total -= elem[1]
+                    self._db.executemany("DELETE FROM responses WHERE key = ?", evict)
+
+    def clear(self):
+        """
+
+        Removes all cached responses.
+        """
+
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        """
+
+        Closes the database connection.
+        """
+
+        self._db.close()
+
+
+def fingerprint(url, payload=None, body=None):
+    # account details do not change the response; the payload can be given already serialized without
+    # them, which saves serializing it again before sending
+    if body is None:
+        body = serialize.dumps({key: value for key, value in payload.items() if key not in {'userToken', 'email'}})
+
+    return(hashlib.sha256(url.encode('utf-8') + body).hexdigest())
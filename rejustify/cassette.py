@@ -0,0 +1,126 @@
+import os
+import json
+import gzip
+import threading
+import pandas as pd
+
+from rejustify import serialize
+from rejustify.cache import fingerprint
+
+
+class Cassette(object):
+    """
+
+    Recording of API calls stored in a gzip-compressed file of JSON lines. In record mode every analyze and
+    fill request is sent to the API as usual, and the request (without token and email) is saved together
+    with its response. In replay mode the responses are served from the cassette and no request is sent;
+    a request which was not recorded raises an error.
+
+    The requests are matched by the fingerprint of the payload and the endpoint, such that a cassette recorded
+    against one API address can be replayed against any other.
+
+    Examples:
+        # record the calls of a batch
+        rejustify.setCassette("batch.jsonl.gz", mode = "record")
+        rdf = rejustify.fill(df, st)
+
+        # run the batch again offline
+        rejustify.setCassette("batch.jsonl.gz", mode = "replay")
+        rdf = rejustify.fill(df, st)
+
+    Attributes:
+        path(str): Location of the cassette file.
+        mode(str): Either record (append the calls to the cassette) or replay (serve the recorded responses).
+            The default is mode='replay'.
+    """
+
+    def __init__(self, path=None, mode="replay"):
+
+        # error handling
+        if not isinstance(path, str):
+            raise ValueError("`path` parameter must be a string")
+        if mode not in {"record", "replay"}:
+            raise ValueError("`mode` parameter must be record/replay")
+        if mode == "replay" and not os.path.isfile(path):
+            raise ValueError("Couldn't find the cassette " + path)
+
+        self.path = path
+        self.mode = mode
+        self.responses = {}
+
+        self._lock = threading.Lock()
+        self._file = None
+        if mode == "replay":
+            self._load()
+        else:
+            if os.path.dirname(path) != '' and not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            self._file = gzip.open(path, 'ab')
+
+    def key(self, url, payload):
+        """
+
+        Returns the fingerprint of the request, which does not depend on the API address.
+        """
+
+        return(fingerprint(url.rstrip('/').rsplit('/', 1)[-1], payload))
+
+    def get(self, key):
+        """
+
+        Returns the recorded response for the given fingerprint.
+        """
+
+        try:
+            return(self.responses[key])
+        except KeyError:
+            raise ValueError("Couldn't find the request in the cassette " + self.path)
+
+    def record(self, key, url, payload, response_json):
+        """
+
+        Appends the request and its response to the cassette.
+        """
+
+        request = {elem: value for elem, value in payload.items() if elem not in {'userToken', 'email'}}
+        line = b''.join([b'{"key":', serialize._dumps(key), b',"endpoint":',
+                         serialize._dumps(url.rstrip('/').rsplit('/', 1)[-1]), b',"request":',
+                         serialize.dumps(request), b',"response":', serialize._dumps(_records(response_json)),
+                         b'}\n'])
+
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        """
+
+        Closes the cassette file.
+        """
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _load(self):
+        # requests are not kept in memory, only the responses are served
+        with gzip.open(self.path, 'rb') as fp:
+            for line in fp:
+                if line.strip():
+                    elem = json.loads(line)
+                    self.responses[elem['key']] = elem['response']
+
+
+def _records(response_json):
+    # streamed responses keep the data as a DataFrame
+    try:
+        data = response_json['structure']['out']['data']
+    except (KeyError, TypeError):
+        return(response_json)
+    if not isinstance(data, pd.DataFrame):
+        return(response_json)
+
+    out = dict(response_json['structure']['out'])
+    out['data'] = data.astype(object).where(pd.notnull(data), None).values.tolist()
+
+    return({**response_json, 'structure': {**response_json['structure'], 'out': out}})
@@ -0,0 +1,153 @@
+import time
+import random
+import threading
+import collections
+import numpy as np
+import pandas as pd
+
+
+class Metrics(object):
+    """
+
+    Collects the timings and sizes of the API calls. Each analyze or fill call records the duration of its
+    phases: validate (argument checks), payload (building the payload), serialize (JSON encoding), network
+    (sending the request and receiving the response, including retries), parse (decoding the JSON response)
+    and output (building the DataFrames). It also records the sizes of the payload and the response in bytes,
+    the number of rows and columns sent, the hits and misses of the cache and of the memoized structures,
+    the retries, the requests coalesced with identical requests in flight, and the number of calls merged
+    into each request by rejustify.batch.Batcher.
+
+    Every observation is passed to the callbacks as callback(name, value, labels), which makes it easy to
+    forward the metrics to Prometheus, OpenTelemetry or logs. The summary keeps the count, total and maximum of
+    each name and endpoint, and the percentiles are computed from a uniform sample of at most reservoir values,
+    so that the memory does not grow with the number of calls.
+
+    Examples:
+        metrics = rejustify.Metrics()
+        rejustify.setMetrics(metrics)
+        rdf = rejustify.fill(df, st)
+        metrics.summary()
+
+        # forward to a Prometheus histogram
+        hist = prometheus_client.Histogram('rejustify_seconds', 'Phase duration', ['name', 'endpoint'])
+        metrics = rejustify.Metrics(callbacks=[lambda name, value, labels:
+                                               hist.labels(name, labels['endpoint']).observe(value)])
+
+    Attributes:
+        callbacks(list): Functions called with each observation as callback(name, value, labels).
+        reservoir(int): Maximum number of values kept for the percentiles of each name and endpoint.
+            The default is reservoir=1000.
+    """
+
+    def __init__(self, callbacks=None, reservoir=1000):
+
+        # error handling
+        if not isinstance(reservoir, int) or isinstance(reservoir, bool) or reservoir < 1:
+            raise ValueError("`reservoir` parameter must be a positive integer")
+
+        self.callbacks = list(callbacks or [])
+        self.reservoir = reservoir
+        self.values = collections.defaultdict(_Series)
+        self._lock = threading.Lock()
+        self._random = random.Random(0)
+
+    def observe(self, name, value, **labels):
+        """
+
+        Records the value of the observation, for instance the duration of a phase in seconds.
+        """
+
+        with self._lock:
+            self.values[(name, labels.get('endpoint'))].add(value, self.reservoir, self._random)
+        for callback in self.callbacks:
+            callback(name, value, labels)
+
+    def count(self, name, **labels):
+        """
+
+        Records a single event, such as a cache hit.
+        """
+
+        self.observe(name, 1, **labels)
+
+    def phase(self, name, **labels):
+        """
+
+        Context manager measuring the duration of a phase.
+        """
+
+        return(_Phase(self, name, labels))
+
+    def summary(self):
+        """
+
+        Summarizes the observations by name and endpoint: count, total, mean, median, 95th percentile and maximum.
+        The percentiles are estimated from the sampled values once there are more than reservoir observations.
+        """
+
+        rows = []
+        with self._lock:
+            for (name, endpoint), series in sorted(self.values.items(), key=lambda x: (x[0][0], str(x[0][1]))):
+                sample = np.asarray(series.sample, dtype=float)
+                rows.append({'name': name, 'endpoint': endpoint, 'count': series.count, 'total': series.total,
+                             'mean': series.total / series.count, 'p50': np.percentile(sample, 50),
+                             'p95': np.percentile(sample, 95), 'max': series.max})
+
+        return(pd.DataFrame(rows, columns=['name', 'endpoint', 'count', 'total', 'mean', 'p50', 'p95', 'max']))
+
+    def reset(self):
+        """
+
+        Removes all observations.
+        """
+
+        with self._lock:
+            self.values.clear()
+
+
+class _Series(object):
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = -np.inf
+        self.sample = []
+
+    def add(self, value, reservoir, random):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+        # reservoir sampling: each value is kept with probability reservoir / count
+        if len(self.sample) < reservoir:
+            self.sample.append(value)
+        else:
+            i = random.randrange(self.count)
+            if i < reservoir:
+                self.sample[i] = value
+
+
+class _Phase(object):
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return(self)
+
+    def __exit__(self, *args):
+        if self.metrics is not None:
+            self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+def phase(metrics, name, **labels):
+    # phases are timed only if metrics are collected
+    return(_Phase(metrics, name, labels))
+
+
+def observe(metrics, name, value, **labels):
+    if metrics is not None:
+        metrics.observe(name, value, **labels)
@@ -0,0 +1,79 @@
+import time
+import random
+import asyncio
+import threading
+import email.utils
+
+# transient responses which are sent again
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class TokenBucket(object):
+    """
+
+    Token bucket limiting the rate of API calls. Each call takes a token, and tokens are refilled at the
+    given rate up to the burst size. Calls which find the bucket empty reserve the next token and wait for
+    it, such that concurrent callers (threads or coroutines) are served in order at the allowed rate.
+
+    Attributes:
+        rate(float): Number of calls per second.
+        burst(int): Maximum number of calls sent at once. The default is burst=max(1, rate).
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+
+        Takes a token and returns the time in seconds to wait before the call can be sent.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            return(max(0.0, -self.tokens / self.rate))
+
+    def acquire(self):
+        time.sleep(self.reserve())
+
+    async def acquire_async(self):
+        await asyncio.sleep(self.reserve())
+
+
+def backoff(attempt, base=0.5, cap=60):
+    """
+
+    Exponential backoff with full jitter for the given attempt (starting from 0).
+    """
+
+    return(random.uniform(0, min(cap, base * 2 ** attempt)))
+
+
+def retry_after(headers, cap=60):
+    """
+
+    Returns the delay in seconds requested by the Retry-After header, or None if it is missing. The delay is
+    limited to cap seconds, as in backoff().
+    """
+
+    value = headers.get('Retry-After')
+    if value is None:
+        return(None)
+
+    try:
+        return(min(cap, max(0.0, float(value))))
+    except ValueError:
+        pass
+
+    try:
+        return(min(cap, max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())))
+    except (TypeError, ValueError):
+        return(None)
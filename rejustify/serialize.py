@@ -0,0 +1,221 @@
+import json
+import zlib
+import numpy as np
+import pandas as pd
+import urllib3
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# response encodings which can be decoded by urllib3
+ACCEPT_ENCODING = 'gzip, deflate' + (', zstd' if getattr(urllib3.response, 'HAS_ZSTD', False) else '')
+
+
+def dumps(payload, sort_keys=False):
+    """
+
+    Serializes the API payload to JSON bytes. If payload['data'] is a DataFrame, it is written directly
+    as the header row followed by the rows of the frame, without copying the frame, inserting the header
+    into it or converting it to a list of lists first. Missing values are written as null.
+
+    The orjson package is used if it is installed, otherwise the rows are encoded with vectorized numpy
+    operations column by column.
+
+    Attributes:
+        payload(dict): The payload of the API call.
+        sort_keys(bool): Sort the keys of the objects.
+    """
+
+    data = payload.get('data')
+    if not isinstance(data, pd.DataFrame):
+        return(_dumps(payload, sort_keys=sort_keys))
+
+    # the data are written first, which is also the sorted position of the key
+    rest = _dumps({key: value for key, value in payload.items() if key != 'data'}, sort_keys=sort_keys)
+
+    return(b'{"data":' + dumps_frame(data) + (b',' + rest[1:] if len(rest) > 2 else b'}'))
+
+
+def dumps_frame(df, block=65536):
+    """
+
+    Serializes the DataFrame to JSON bytes as an array of rows, starting with the header row. The rows
+    are encoded in blocks, so that only one block of intermediate Python objects is kept in memory.
+    """
+
+    parts = [b'[' + _dumps(list(df.columns))]
+    for start in range(0, df.shape[0] if df.shape[1] > 0 else 0, block):
+        _df = df.iloc[start:start + block]
+        if orjson is not None:
+            columns = [_column_values(_df.iloc[:, i]) for i in range(_df.shape[1])]
+            parts.append(b',' + orjson.dumps(list(zip(*columns)), default=_default,
+                                             option=orjson.OPT_SERIALIZE_NUMPY)[1:-1])
+        else:
+            tokens = [_column_tokens(_df.iloc[:, i]) for i in range(_df.shape[1])]
+            parts.append((',[' + '],['.join(map(','.join, zip(*tokens))) + ']').encode('utf-8'))
+    parts.append(b']')
+
+    return(b''.join(parts))
+
+
+def compress(body, encoding, chunk_size=1048576):
+    """
+
+    Compresses the body with gzip or zstd chunk by chunk. The compressed chunks are generated lazily,
+    such that they can be streamed to the API without keeping the whole compressed body in memory.
+
+    Attributes:
+        body(bytes): The serialized payload.
+        encoding(str): Either gzip or zstd.
+        chunk_size(int): Size of the uncompressed chunks in bytes.
+    """
+
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    view = memoryview(body)
+    for start in range(0, len(view), chunk_size):
+        chunk = compressor.compress(view[start:start + chunk_size])
+        if chunk:
+            yield chunk
+
+    yield compressor.flush()
+
+
+def parse_fill(fp):
+    """
+
+    Parses the response of the fill endpoint incrementally from a file-like object. The rows of the returned
+    data are collected column by column as they arrive, while the other sections (structure, keys, labels,
+    meta, message) are built as usual. The data are returned as a DataFrame under
+    response_json['structure']['out']['data'].
+
+    Attributes:
+        fp(file): The response body.
+    """
+
+    data = 'structure.out.data'
+    columns = []
+    rows = 0
+    row = None
+    builder = ijson.ObjectBuilder()
+
+    try:
+        for prefix, event, value in ijson.parse(fp, use_float=True):
+            if prefix == data + '.item.item':
+                row.append(value)
+            elif prefix == data + '.item':
+                if event == 'start_array':
+                    row = []
+                else:
+                    # each row is appended to the columns, shorter rows are filled with None
+                    for i in range(len(columns), len(row)):
+                        columns.append([None] * rows)
+                    for i in range(len(columns)):
+                        columns[i].append(row[i] if i < len(row) else None)
+                    rows += 1
+            else:
+                builder.event(event, value)
+    except ijson.JSONError:
+        raise ValueError("Invalid response from rejustify (JSON expected)")
+
+    response_json = builder.value
+    try:
+        # columns are released one by one when converted
+        frame = {}
+        for i in range(len(columns)):
+            frame[i] = pd.Series(columns[i])
+            columns[i] = None
+        response_json['structure']['out']['data'] = pd.DataFrame(frame)
+    except (KeyError, TypeError):
+        pass
+
+    return(response_json)
+
+
+def _dumps(obj, sort_keys=False):
+    if orjson is not None:
+        return(orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_SORT_KEYS if sort_keys else 0)))
+
+    return(json.dumps(obj, default=_default, sort_keys=sort_keys).encode('utf-8'))
+
+
+def _default(obj):
+    if isinstance(obj, np.generic):
+        return(obj.item())
+
+    return(str(obj))
+
+
+def _values(series):
+    # extension arrays, such as nullable integers, keep their values as objects
+    if pd.api.types.is_extension_array_dtype(series.dtype) and series.dtype.kind not in 'Mm':
+        return(series.astype(object).to_numpy())
+
+    # the values of the caller's frame are read through a read-only view
+    values = series.to_numpy().view()
+    values.flags.writeable = False
+
+    return(values)
+
+
+def _column_values(series):
+    # values of the column as a list, with None for missing values
+    values = _values(series)
+    if values.dtype.kind in 'biu':
+        return(values.tolist())
+
+    missing = pd.isnull(values)
+    if values.dtype.kind in 'Mm':
+        values = series.astype(str).to_numpy()
+    if not missing.any():
+        return(values.tolist())
+
+    values = values.astype(object)
+    values[missing] = None
+
+    return(values.tolist())
+
+
+def _column_tokens(series):
+    # JSON tokens of the values of the column
+    values = _values(series)
+    if values.dtype.kind == 'b':
+        return(np.where(values, 'true', 'false').tolist())
+    if values.dtype.kind in 'iu':
+        return(list(map(str, values.tolist())))
+    if values.dtype.kind == 'f':
+        tokens = np.array(list(map(repr, values.tolist())), dtype=object)
+        tokens[~np.isfinite(values)] = 'null'
+        return(tokens.tolist())
+    if values.dtype.kind in 'Mm':
+        values = np.where(pd.isnull(values), None, series.astype(str).to_numpy())
+
+    # repeated values are encoded once
+    try:
+        codes, uniques = pd.factorize(values)
+    except TypeError:
+        return([json.dumps(None if _isnull(x) else x, default=_default) for x in values])
+
+    tokens = np.array([json.dumps(x, default=_default) for x in uniques] + ['null'], dtype=object)
+
+    return(tokens[codes].tolist())
+
+
+def _isnull(x):
+    return(not isinstance(x, (list, dict)) and pd.isnull(x))
@@ -0,0 +1,306 @@
+import json
+import gzip
+import time
+import zlib
+import random
+import datetime
+import threading
+import collections
+import socketserver
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from rejustify import serialize
+
+
+class MockServer(object):
+    """
+
+    Local stand-in for the rejustify API, serving the analyze and fill endpoints from a background thread.
+    The responses have the same shape as the API responses: analyze returns the structure of the data set,
+    and fill returns the data with the empty columns filled, together with structure.x, structure.y (meta),
+    keys, default values (labels) and messages. The filled values are derived deterministically from the
+    matching columns, so that repeated calls return the same data. The matching columns are the id.x of the
+    keys given in the request, or else the first columns which are not empty.
+
+    The server accepts gzip and zstd compressed request bodies, such that the client can be tested and
+    benchmarked offline with the same settings as in production.
+
+    Examples:
+        with rejustify.testing.MockServer(latency = 0.05) as server:
+            client = rejustify.Client(main_url = server.url, token = "TOKEN", email = "EMAIL")
+            st = client.analyze(df)
+            rdf = client.fill(df, st)
+
+    Attributes:
+        host(str): Address of the server. The default is host='127.0.0.1'.
+        port(int): Port of the server. By default a free port is chosen.
+        latency(float): Delay of each response in seconds. The default is latency=0.
+        jitter(float): Maximum random delay added to the latency in seconds. The default is jitter=0.
+        dimensions(int): Number of dimensions of the server-side data sets, which determines the size of
+            structure.y, keys and default values for each filled column. The default is dimensions=3.
+        requests(Counter): Number of requests served by each endpoint.
+        failures(Counter): Number of transient failures served by each endpoint, see fail().
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, dimensions=3):
+
+        # error handling
+        if not isinstance(host, str):
+            raise ValueError("`host` parameter must be a string")
+        if not isinstance(port, int):
+            raise ValueError("`port` parameter must be an integer")
+        if not isinstance(latency, (int, float)) or latency < 0:
+            raise ValueError("`latency` parameter must be a non-negative number")
+        if not isinstance(jitter, (int, float)) or jitter < 0:
+            raise ValueError("`jitter` parameter must be a non-negative number")
+        if not isinstance(dimensions, int) or dimensions < 2:
+            raise ValueError("`dimensions` parameter must be an integer of at least 2")
+
+        self.latency = latency
+        self.jitter = jitter
+        self.dimensions = dimensions
+        self.requests = collections.Counter()
+        self.failures = collections.Counter()
+
+        self._lock = threading.Lock()
+        self._failures = collections.deque()
+        self._server = _HTTPServer((host, port), _Handler)
+        self._server.mock = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+
+        Main address of the server, to be used as main_url of the client.
+        """
+
+        return('http://%s:%d' % self._server.server_address[:2])
+
+    def __enter__(self):
+        return(self.start())
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """
+
+        Starts serving the requests in a background thread.
+        """
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+
+        return(self)
+
+    def stop(self):
+        """
+
+        Stops the server and closes its socket.
+        """
+
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def fail(self, status=503, times=1, retry_after=None):
+        """
+
+        Answers the next requests with the given status, for instance to test the retries of the client.
+        The Retry-After header is sent if retry_after is given.
+        """
+
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * times)
+
+        return(self)
+
+    def analyze(self, payload):
+        """
+
+        Builds the response of the analyze endpoint for the given payload.
+        """
+
+        data = payload['data']
+        inits = payload.get('inits') or 1
+        header = data[0] if len(data) > 0 else []
+
+        structure = []
+        for i in range(len(header)):
+            values = [row[i] for row in data[inits:inits + 100] if i < len(row) and row[i] not in ('', None)]
+            empty = len(values) == 0
+            klass, feature, fmt = ('general', None, None) if empty else _classify(values)
+            structure.append({'id': i + 1, 'column': i + 1, 'name': header[i], 'empty': empty,
+                              'class': klass, 'feature': feature, 'cleaner': None, 'format': fmt,
+                              'p_class': 0.95, 'provider': 'IMF' if empty else None,
+                              'table': 'WEO' if empty else None, 'p_data': 0.8 if empty else None})
+
+        return({'structure': structure})
+
+    def fill(self, payload):
+        """
+
+        Builds the response of the fill endpoint for the given payload.
+        """
+
+        data = payload['data']
+        inits = payload.get('inits') or 1
+        structure = payload['structure']
+        header = data[0] if len(data) > 0 else []
+
+        empty = [int(elem['column']) for elem in structure if elem['empty']]
+        matches = {column: [elem for elem in structure if not elem['empty']][:self.dimensions - 1]
+                   for column in empty}
+
+        # the keys given in the payload choose the matching columns (id.x) of each filled column
+        for record in payload.get('keys') or []:
+            ids = record['id.x'] if isinstance(record['id.x'], list) else [record['id.x']]
+            columns = record['column.id.x'] if isinstance(record['column.id.x'], list) else [record['column.id.x']]
+            for column in columns:
+                if int(column) in matches:
+                    matches[int(column)] = [elem for elem in structure if elem['id'] in ids]
+
+        # filled values depend only on the matching columns and the name of the filled column, not on its position
+        rows = []
+        for row in data[inits:]:
+            row = list(row)
+            for column in empty:
+                key = '|'.join(str(row[int(elem['column']) - 1]) for elem in matches[column]).encode('utf-8')
+                row[column - 1] = round(zlib.crc32(key + str(header[column - 1]).encode('utf-8')) / 2 ** 32 * 1000,
+                                        2)
+            rows.append(row)
+
+        meta, keys, labels = [], [], []
+        for column in empty:
+            matched = matches[column]
+            names = [str(elem['class']).capitalize() for elem in matched]
+            names += ['Units' if i == len(matched) else 'Dimension %d' % (i + 1)
+                      for i in range(len(matched), self.dimensions)]
+            meta.append({'id': list(range(1, self.dimensions + 1)), 'name': names,
+                         'class': [elem['class'] for elem in matched] +
+                                  ['general'] * (self.dimensions - len(matched)),
+                         'feature': [None] * self.dimensions, 'cleaner': [None] * self.dimensions,
+                         'format': [elem['format'] for elem in matched] + [None] * (self.dimensions - len(matched)),
+                         'provider': ['IMF'] * self.dimensions, 'table': ['WEO'] * self.dimensions})
+            keys.append({'id.x': [elem['id'] for elem in matched], 'name.x': [elem['name'] for elem in matched],
+                         'id.y': list(range(1, len(matched) + 1)), 'name.y': names[:len(matched)],
+                         'class': [elem['class'] for elem in matched],
+                         'method': ['time-matching' if elem['class'] == 'time' else 'synonym-proximity-matching'
+                                    for elem in matched],
+                         'column.id.x': [column], 'column.name.x': [header[column - 1]]})
+            labels.append({name: {'code_default': [name.upper()[:3]], 'label_default': [name]}
+                           for name in names[len(matched):]})
+
+        if payload.get('dataForm') == 'reduced':
+            columns = [column - 1 for column in empty]
+            header = [header[i] for i in columns]
+            rows = [[row[i] for i in columns] for row in rows]
+
+        return({'structure': {'out': {'column': [[column] for column in empty], 'meta': meta, 'keys': keys,
+                                      'labels': labels, 'data': [header] + rows, 'structure': structure},
+                              'message': [{'code': 'F001', 'message': 'Filled %d columns' % len(empty)}]}})
+
+    def _delay(self):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter > 0 else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        mock = self.server.mock
+        endpoint = self.path.rstrip('/').rsplit('/', 1)[-1]
+        if endpoint not in {'analyze', 'fill'}:
+            return(self._send(404, {'error': 'Unknown endpoint ' + self.path}))
+
+        body = self._body()
+        with mock._lock:
+            failure = mock._failures.popleft() if len(mock._failures) > 0 else None
+            if failure is not None:
+                mock.failures[endpoint] += 1
+        if failure is not None:
+            headers = {'Retry-After': str(failure[1])} if failure[1] is not None else {}
+            return(self._send(failure[0], {'error': 'Service unavailable'}, headers=headers))
+
+        try:
+            payload = json.loads(body)
+            out = mock.analyze(payload) if endpoint == 'analyze' else mock.fill(payload)
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            return(self._send(400, {'error': str(e)}))
+
+        with mock._lock:
+            mock.requests[endpoint] += 1
+        mock._delay()
+        self._send(200, out)
+
+    def _body(self):
+        # chunked bodies are sent by the client when compressing
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+                if size == 0:
+                    break
+            body = b''.join(chunks)
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        encoding = self.headers.get('Content-Encoding')
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'zstd':
+            body = serialize.zstandard.ZstdDecompressor().decompressobj().decompress(body)
+
+        return(body)
+
+    def _send(self, status, out, headers=None):
+        body = serialize._dumps(out)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _classify(values):
+    # class, feature and format proposed for a sample of values
+    try:
+        [float(x) for x in values]
+        return('number', None, None)
+    except (TypeError, ValueError):
+        pass
+
+    for fmt, feature in [('%Y-%m-%d', 'day'), ('%Y %m %d', 'day'), ('%Y-%m', 'month'), ('%Y', 'year')]:
+        try:
+            [datetime.datetime.strptime(str(x), fmt) for x in values]
+            return('time', feature, fmt)
+        except ValueError:
+            pass
+
+    if all(str(x).lower() in _COUNTRIES for x in values):
+        return('geography', 'country', None)
+
+    return('general', None, None)
+
+
+_COUNTRIES = {'austria', 'belgium', 'france', 'germany', 'italy', 'netherlands', 'poland', 'portugal',
+              'spain', 'sweden', 'united kingdom', 'united states', 'japan', 'china', 'canada'}
@@ -19,6 +19,12 @@ setuptools.setup(
         'requests >= 2.18.4',
         'pandas >= 0.21'
     ],
+    extras_require={
+        'aio': ['aiohttp >= 3.6'],
+        'fast': ['orjson >= 3.0'],
+        'zstd': ['zstandard >= 0.15'],
+        'stream': ['ijson >= 3.1']
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "Development Status :: 4 - Beta",
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import rejustify
+from rejustify import testing
+
+
+class Server(testing.MockServer):
+    # mock server keeping the last payloads, the content encodings, the connections and the requests in flight
+
+    def __init__(self):
+        testing.MockServer.__init__(self)
+        self.payloads = {}
+        self.encodings = []
+        self.connections = 0
+        self.active = 0
+        self.peak = 0
+        self._server.RequestHandlerClass = _Handler
+
+    def analyze(self, payload):
+        self.payloads['analyze'] = payload
+        return(testing.MockServer.analyze(self, payload))
+
+    def fill(self, payload):
+        self.payloads['fill'] = payload
+        return(testing.MockServer.fill(self, payload))
+
+    def _delay(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        testing.MockServer._delay(self)
+        with self._lock:
+            self.active -= 1
+
+
+class _Handler(testing._Handler):
+
+    def setup(self):
+        testing._Handler.setup(self)
+        with self.server.mock._lock:
+            self.server.mock.connections += 1
+
+    def _body(self):
+        self.server.mock.encodings.append(self.headers.get('Content-Encoding'))
+        return(testing._Handler._body(self))
+
+
+def frame(rows=100, extra=0):
+    df = pd.DataFrame()
+    df['country'] = (['Italy', 'France', 'Spain', 'Poland'] * rows)[:rows]
+    df['date'] = pd.date_range('2020-06-01', periods=rows).strftime('%Y-%m-%d')
+    for i in range(extra):
+        df['value %d' % i] = np.arange(rows) * (i + 1.5)
+    df['covid cases'] = ''
+    df['gdp'] = ''
+
+    return(df)
+
+
+def values(data):
+    # data compared as strings, missing and numeric values included
+    return(data.astype(str).values.tolist())
+
+
+@pytest.fixture
+def server():
+    with Server() as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', backoff=0.01) as client:
+        yield client
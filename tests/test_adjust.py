@@ -0,0 +1,79 @@
+import copy
+import pandas as pd
+import pytest
+
+import rejustify
+from conftest import frame
+
+
+@pytest.fixture
+def result(client):
+    df = frame(rows=20)
+    st = client.analyze(df)
+
+    return(st, client.fill(df, st))
+
+
+def test_structure_matches_adjust(result):
+    st, rdf = result
+    edits = [{'id': 1, 'feature': 'month'}, {'column': 3, 'provider': 'REJUSTIFY', 'table': 'COVID-19-ECDC'}]
+
+    expected = rejustify.adjust(st, id=1, items={'feature': 'month'})
+    expected = rejustify.adjust(expected, column=3, items={'provider': 'REJUSTIFY', 'table': 'COVID-19-ECDC'})
+    original = st.copy()
+
+    assert rejustify.adjust_many(st, edits).equals(expected)
+    assert rejustify.adjust_many(st, pd.DataFrame(edits)).equals(expected)
+    assert st.equals(original)
+
+
+def test_table_of_edits(result):
+    st, rdf = result
+    edits = pd.DataFrame({'column': [3, 4], 'provider': ['REJUSTIFY', 'OECD'], 'table': ['COVID-19-ECDC', 'MEI']})
+
+    out = rejustify.adjust_many(st, edits)
+    assert out['provider'].tolist()[2:] == ['REJUSTIFY', 'OECD']
+    assert out['table'].tolist()[2:] == ['COVID-19-ECDC', 'MEI']
+
+
+def test_default_matches_adjust(result):
+    st, rdf = result
+    edits = [{'column': 3, 'Units': 'USD'}, {'column': 4, 'Units': 'EUR'}]
+
+    expected = rejustify.adjust(rdf['default'], column=3, items={'Units': 'USD'})
+    expected = rejustify.adjust(expected, column=4, items={'Units': 'EUR'})
+    out = rejustify.adjust_many(rdf['default'], edits)
+
+    assert out['column.id.x'] == expected['column.id.x']
+    assert all(x.equals(y) for x, y in zip(out['default'], expected['default']))
+
+
+def test_keys_matches_adjust(result):
+    st, rdf = result
+    keys = copy.deepcopy(rdf['keys'])
+
+    expected = rejustify.adjust(copy.deepcopy(keys), column=3, items={'id.x': 1, 'id.y': None})
+    expected = rejustify.adjust(expected, column=4, items={'id.x': 2, 'id.y': 3, 'method': 'exact-matching'})
+    out = rejustify.adjust_many(keys, [{'column': 3, 'id.x': 1, 'id.y': None},
+                                       {'column': 4, 'id.x': 2, 'id.y': 3, 'method': 'exact-matching'}])
+
+    assert out == expected
+    assert out != keys
+    assert keys == rdf['keys']
+
+
+def test_keys_list_of_columns(result):
+    st, rdf = result
+    out = rejustify.adjust_many(rdf['keys'], [{'column': [3, 4], 'id.x': 1, 'id.y': None}])
+
+    assert all(1 not in elem['id.x'] for elem in out)
+    with pytest.raises(ValueError):
+        rejustify.adjust_many(rdf['keys'], [{'column': 9, 'id.x': 1, 'id.y': None}])
+
+
+def test_structure_mixed_table_of_edits(result):
+    st, rdf = result
+    out = rejustify.adjust_many(st, pd.DataFrame([{'id': 1, 'class': 'general'}, {'column': 2, 'feature': 'month'}]))
+
+    assert out.loc[0, 'class'] == 'general'
+    assert out.loc[1, 'feature'] == 'month'
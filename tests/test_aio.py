@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+
+from conftest import frame, values
+
+aio = pytest.importorskip('rejustify.aio')
+
+
+def test_matches_client(client, server):
+    df = frame(rows=20)
+    st = client.analyze(df)
+    rdf = client.fill(df, st)
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL') as client:
+            return(await client.analyze(df), await client.fill(df, st))
+
+    structure, out = asyncio.run(main())
+    assert structure.equals(st)
+    assert values(out['data']) == values(rdf['data'])
+
+
+def test_bounded_concurrency(server):
+    df = frame(rows=20)
+    server.latency = 0.05
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL', concurrency=3) as client:
+            return(await asyncio.gather(*[client.analyze(df.head(i + 1)) for i in range(12)]))
+
+    structures = asyncio.run(main())
+    assert [len(elem) for elem in structures] == [4] * 12
+    assert server.requests['analyze'] == 12
+    assert server.peak <= 3
+
+
+def test_async_fill_iter(client, server):
+    df = frame(rows=60)
+    st = client.analyze(df)
+    chunks = [df.iloc[i:i + 10] for i in range(0, 60, 10)]
+    expected = [client.fill(elem, st) for elem in chunks]
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL') as client:
+            return([elem async for elem in client.fill_iter(iter(chunks), st, prefetch=2)])
+
+    outs = asyncio.run(main())
+    assert all(values(x['data']) == values(y['data']) for x, y in zip(outs, expected))
+    assert len(outs) == len(chunks)
+
+
+def test_async_refresh(client, server):
+    df = frame(rows=30)
+    st = client.analyze(df)
+    rdf = client.fill(df.head(20), st)
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL') as client:
+            return(await client.refresh(rdf, df))
+
+    refreshed = asyncio.run(main())
+    assert len(server.payloads['fill']['data']) == 1 + 10
+    assert values(refreshed['data']) == values(client.fill(df, st)['data'])
+
+
+def test_async_fill_parallel(client, server):
+    df = frame(rows=60)
+    st = client.analyze(df)
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL') as client:
+            return(await client.fill_parallel(df, st, partitions=2, max_workers=2))
+
+    assert values(asyncio.run(main())['data']) == values(client.fill(df, st)['data'])
@@ -0,0 +1,60 @@
+import pytest
+
+from rejustify.batch import Batcher
+from conftest import frame, values
+
+
+def test_batcher_matches_fill(client, server):
+    df = frame(rows=200, extra=5)
+    st = client.analyze(df)
+    parts = [df.iloc[i:i + 7].reset_index(drop=True) for i in range(0, 70, 7)]
+    expected = [client.fill(elem, st) for elem in parts]
+
+    with Batcher(client, delay=0.05) as batcher:
+        futures = [batcher.submit(elem, st) for elem in parts]
+        outs = [elem.result() for elem in futures]
+
+    assert all(values(x['data']) == values(y['data']) for x, y in zip(outs, expected))
+    assert server.requests['fill'] == len(parts) + 1
+
+
+def test_max_rows_sends_at_once(client, server):
+    df = frame(rows=20)
+    st = client.analyze(df)
+
+    with Batcher(client, delay=10, max_rows=20) as batcher:
+        futures = [batcher.submit(df.iloc[i:i + 5], st) for i in range(0, 20, 5)]
+        outs = [elem.result(timeout=5) for elem in futures]
+
+    assert server.requests['fill'] == 1
+    assert [len(elem['data']) for elem in outs] == [6] * 4
+
+
+def test_calls_with_different_parameters(client, server):
+    df = frame(rows=20)
+    st = client.analyze(df)
+
+    with Batcher(client, delay=0.05) as batcher:
+        typed = batcher.submit(df.head(5), st, typed=True)
+        plain = [batcher.submit(df.iloc[i:i + 5], st) for i in range(5, 20, 5)]
+        assert len(typed.result()['data']) == 5
+        assert [len(elem.result()['data']) for elem in plain] == [6] * 3
+
+    assert server.requests['fill'] == 2
+
+
+def test_closed_batcher(client):
+    df = frame(rows=5)
+    batcher = Batcher(client)
+    batcher.close()
+
+    with pytest.raises(ValueError):
+        batcher.submit(df, client.analyze(df))
+
+
+def test_async_client_is_rejected(server):
+    aio = pytest.importorskip('rejustify.aio')
+    client = aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL')
+
+    with pytest.raises(ValueError, match='AsyncClient'):
+        Batcher(client)
@@ -0,0 +1,73 @@
+import time
+
+import rejustify
+from rejustify import serialize
+from conftest import frame
+
+
+def test_ttl(tmp_path):
+    cache = rejustify.Cache(str(tmp_path / 'cache.sqlite'), ttl=0.2)
+    cache.set('a', {'value': 1})
+
+    assert cache.get('a') == {'value': 1}
+    time.sleep(0.3)
+    assert cache.get('a') is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = rejustify.Cache(str(tmp_path / 'cache.sqlite'))
+    cache.set('a', {'value': 'a' * 100})
+
+    # room for three entries of the same size
+    cache.max_size = 3 * cache._db.execute("SELECT size FROM responses").fetchone()[0]
+
+    for key in ['b', 'c']:
+        time.sleep(0.01)
+        cache.set(key, {'value': key * 100})
+    time.sleep(0.01)
+    cache.get('a')
+    time.sleep(0.01)
+    cache.set('d', {'value': 'd' * 100})
+
+    # b is the least recently used
+    assert cache.get('b') is None
+    assert all(cache.get(key) is not None for key in ['a', 'c', 'd'])
+
+
+def test_client_cache_hit(server, tmp_path):
+    df = frame(rows=50)
+    cache = rejustify.Cache(str(tmp_path / 'cache.sqlite'))
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', cache=cache) as client:
+        st = client.analyze(df)
+        first = client.fill(df, st)
+        second = client.fill(df, st)
+
+    assert server.requests['fill'] == 1
+    assert first['data'].equals(second['data'])
+
+
+def test_cache_ignores_account(server, tmp_path):
+    df = frame(rows=50)
+    cache = rejustify.Cache(str(tmp_path / 'cache.sqlite'))
+    for token in ['TOKEN1', 'TOKEN2']:
+        with rejustify.Client(main_url=server.url, token=token, email='EMAIL', cache=cache) as client:
+            client.analyze(df)
+
+    assert server.requests['analyze'] == 1
+
+
+def test_cached_request_is_serialized_once(server, tmp_path, monkeypatch):
+    df = frame(rows=50)
+    cache = rejustify.Cache(str(tmp_path / 'cache.sqlite'))
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', cache=cache) as client:
+        st = client.analyze(df)
+
+        calls = []
+        dumps = serialize.dumps
+        monkeypatch.setattr(serialize, 'dumps', lambda *args, **kwargs: calls.append(1) or dumps(*args, **kwargs))
+        client.fill(df, st)
+
+    # the account details are still sent with the request
+    assert len(calls) == 1
+    assert server.payloads['fill']['userToken'] == 'TOKEN'
+    assert server.payloads['fill']['email'] == 'EMAIL'
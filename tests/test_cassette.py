@@ -0,0 +1,64 @@
+import pytest
+
+import rejustify
+from conftest import frame, values
+
+
+def test_record_replay(server, tmp_path):
+    df = frame(rows=50)
+    path = str(tmp_path / 'calls.jsonl.gz')
+
+    cassette = rejustify.Cassette(path, mode='record')
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', cache=False,
+                          cassette=cassette) as client:
+        st = client.analyze(df)
+        recorded = client.fill(df, st)
+    cassette.close()
+
+    # no server is needed to replay
+    with rejustify.Client(main_url='http://127.0.0.1:1', token='OTHER', email='OTHER', cache=False, retries=0,
+                          cassette=rejustify.Cassette(path, mode='replay')) as client:
+        assert client.analyze(df).equals(st)
+        assert values(client.fill(df, st)['data']) == values(recorded['data'])
+
+        with pytest.raises(ValueError):
+            client.fill(df.head(10), st)
+
+
+
+def test_module_cassette(server, tmp_path):
+    df = frame(rows=20)
+    path = str(tmp_path / 'calls.jsonl.gz')
+    main_url = rejustify.rejustify_main_url
+    rejustify.setCurl(main_url=server.url)
+    try:
+        rejustify.setCassette(path, mode='record')
+        st = rejustify.analyze(df)
+        rejustify.setCassette(path, mode='replay')
+        replayed = rejustify.analyze(df)
+    finally:
+        rejustify.setCassette(enable=False)
+        rejustify.setCurl(main_url=main_url)
+
+    assert replayed.equals(st)
+    assert server.requests['analyze'] == 1
+
+
+def test_record_cache_hits(server, tmp_path):
+    df = frame(rows=50)
+    path = str(tmp_path / 'calls.jsonl.gz')
+    cache = rejustify.Cache(str(tmp_path / 'cache.sqlite'))
+
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', cache=cache) as client:
+        client.fill(df, client.analyze(df))
+
+    cassette = rejustify.Cassette(path, mode='record')
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', cache=cache,
+                          cassette=cassette) as client:
+        st = client.analyze(df)
+        client.fill(df, st)
+    cassette.close()
+
+    with rejustify.Client(main_url='http://127.0.0.1:1', token='TOKEN', email='EMAIL', cache=False, retries=0,
+                          cassette=rejustify.Cassette(path, mode='replay')) as client:
+        client.fill(df, client.analyze(df))
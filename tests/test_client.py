@@ -0,0 +1,123 @@
+import asyncio
+import concurrent.futures
+import pytest
+
+import rejustify
+from conftest import frame, values
+
+
+def test_analyze_and_fill(client, server):
+    df = frame(rows=20)
+    st = client.analyze(df)
+    rdf = client.fill(df, st)
+
+    assert st['empty'].tolist() == [False, False, True, True]
+    assert rdf['data'].shape == (21, 4)
+    assert rdf['keys'][0]['column.id.x'] == 3
+    assert server.payloads['fill']['userToken'] == 'TOKEN'
+    assert server.payloads['fill']['email'] == 'EMAIL'
+
+
+def test_connections_are_reused(client, server):
+    df = frame(rows=20)
+    st = client.analyze(df)
+    for i in range(5):
+        client.fill(df, st)
+
+    assert server.requests['fill'] == 5
+    assert server.connections == 1
+
+
+def test_module_functions_follow_settings(client, server):
+    df = frame(rows=20)
+    main_url, token, email = rejustify.rejustify_main_url, rejustify.rejustify_token, rejustify.rejustify_email
+    rejustify.setCurl(main_url=server.url)
+    rejustify.register(token='OTHER', email='OTHER')
+    try:
+        st = rejustify.analyze(df)
+        rdf = rejustify.fill(df, st)
+    finally:
+        rejustify.setCurl(main_url=main_url)
+        rejustify.register(token=token or '', email=email or '')
+
+    assert server.payloads['fill']['userToken'] == 'OTHER'
+    assert values(rdf['data']) == values(client.fill(df, st)['data'])
+
+
+def test_coalesce(server):
+    df = frame(rows=50)
+    server.latency = 0.2
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', cache=False) as client:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            structures = list(executor.map(lambda i: client.analyze(df), range(8)))
+            outs = list(executor.map(lambda i: client.fill(df, structures[0]), range(8)))
+
+    assert server.requests['analyze'] == 1
+    assert server.requests['fill'] == 1
+    assert all(values(elem['data']) == values(outs[0]['data']) for elem in outs)
+
+    # the callers receive independent copies
+    structures[1].loc[0, 'class'] = 'changed'
+    assert structures[2].loc[0, 'class'] != 'changed'
+
+
+def test_coalesce_disabled(server):
+    df = frame(rows=50)
+    server.latency = 0.2
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', cache=False,
+                          coalesce=False) as client:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda i: client.analyze(df), range(4)))
+
+    assert server.requests['analyze'] == 4
+
+
+def test_coalesce_async(server):
+    aio = pytest.importorskip('rejustify.aio')
+    df = frame(rows=50)
+    server.latency = 0.2
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL', cache=False) as client:
+            return(await asyncio.gather(*[client.analyze(df) for i in range(8)]))
+
+    structures = asyncio.run(main())
+    assert server.requests['analyze'] == 1
+    assert all(elem.equals(structures[0]) for elem in structures)
+
+
+def test_coalesce_async_leader_cancelled(server):
+    aio = pytest.importorskip('rejustify.aio')
+    df = frame(rows=50)
+    server.latency = 0.3
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL', cache=False) as client:
+            leader = asyncio.ensure_future(client.analyze(df))
+            await asyncio.sleep(0.1)
+            follower = asyncio.ensure_future(client.analyze(df))
+            await asyncio.sleep(0.05)
+            leader.cancel()
+
+            # the request goes on for the coroutines still awaiting it
+            st = await follower
+            return(leader.cancelled(), st)
+
+    cancelled, st = asyncio.run(main())
+    assert cancelled
+    assert server.requests['analyze'] == 1
+    assert st.shape[0] == 4
+
+
+def test_proxy_takes_priority_over_environment(server, monkeypatch):
+    monkeypatch.setenv('HTTP_PROXY', 'http://127.0.0.1:1')
+    for name in ['NO_PROXY', 'no_proxy', 'http_proxy']:
+        monkeypatch.delenv(name, raising=False)
+    host, port = server.url.rsplit(':', 1)
+
+    # the mock server receives the requests as the proxy
+    with rejustify.Client(main_url='http://api.rejustify.invalid', proxy_url=host, proxy_port=int(port),
+                          token='TOKEN', email='EMAIL', retries=0) as client:
+        client.analyze(frame(rows=10))
+
+    assert server.requests['analyze'] == 1
@@ -0,0 +1,84 @@
+import pytest
+
+import rejustify
+from conftest import frame, values
+
+
+@pytest.fixture
+def result(client):
+    df = frame(rows=20)
+    st = client.analyze(df)
+
+    return(df, st, client.fill(df, st), client.fill(df, st, compact=True))
+
+
+def test_compact_blocks(result):
+    df, st, rdf, compact = result
+
+    assert compact['keys'].columns.tolist() == ['column.id.x', 'column.name.x', 'id.x', 'name.x', 'id.y', 'name.y',
+                                                'class', 'method']
+    assert compact['keys']['column.id.x'].tolist() == [3, 3, 4, 4]
+    assert compact['keys']['id.x'].tolist() == rdf['keys'][0]['id.x'] + rdf['keys'][1]['id.x']
+    assert compact['default']['column.id.x'].tolist() == [3, 4]
+    assert compact['default']['code_default'].tolist() == [x.iloc[0]['code_default'] for x in rdf['default']['default']]
+    assert values(compact['data']) == values(rdf['data'])
+
+
+def test_compact_blocks_are_sent_as_lists(client, server, result):
+    df, st, rdf, compact = result
+    client.fill(df, st, keys=compact['keys'], default=compact['default'])
+    sent = server.payloads['fill']
+
+    assert [elem['id.x'] for elem in sent['keys']] == [elem['id.x'] for elem in rdf['keys']]
+    assert [elem['column.id.x'] for elem in sent['keys']] == [3, 4]
+    assert sent['meta']['column.id.x'] == [3, 4]
+    assert sent['meta']['default'] == [elem.to_dict('records') for elem in rdf['default']['default']]
+
+
+def test_adjust_compact_keys(result):
+    df, st, rdf, compact = result
+    keys = rejustify.adjust(compact['keys'], column=3, items={'id.x': 1, 'id.y': None})
+
+    assert keys.loc[keys['column.id.x'] == 3, 'id.x'].tolist() == [2]
+    assert keys.loc[keys['column.id.x'] == 4, 'id.x'].tolist() == [1, 2]
+    assert compact['keys'].loc[compact['keys']['column.id.x'] == 3, 'id.x'].tolist() == [1, 2]
+
+
+def test_adjust_compact_default(result):
+    df, st, rdf, compact = result
+    default = rejustify.adjust(compact['default'], column=4, items={'Units': 'USD'})
+
+    assert default.loc[default['column.id.x'] == 4, 'code_default'].tolist() == ['USD']
+    assert default.loc[default['column.id.x'] == 3, 'code_default'].tolist() == ['UNI']
+
+
+def test_lazy_compact(client, result):
+    df, st, rdf, compact = result
+    lazy = client.fill(df, st, lazy=True, compact=True)
+
+    assert lazy['keys'].equals(compact['keys'])
+    assert lazy['default'].equals(compact['default'])
+
+
+def test_compact_keys_keep_columns_without_links(client, server, result):
+    df, st, rdf, compact = result
+    keys = rejustify.adjust(compact['keys'], column=3, items={'id.x': [1, 2], 'id.y': [None, None]})
+
+    assert keys['column.id.x'].tolist() == [3, 4, 4]
+    assert keys['id.x'].isnull().tolist() == [True, False, False]
+
+    # the column without links is sent with empty lists, and comes back as a placeholder row
+    out = client.fill(df, st, keys=keys, compact=True)
+    sent = server.payloads['fill']['keys']
+    assert [elem['column.id.x'] for elem in sent] == [3, 4]
+    assert sent[0]['id.x'] == [] and sent[0]['column.name.x'] == 'covid cases'
+    assert out['keys']['column.id.x'].tolist() == [3, 4, 4]
+    assert out['keys']['id.x'].tolist()[1:] == [1, 2]
+
+    client.fill(df, st, keys=out['keys'])
+    assert server.payloads['fill']['keys'] == sent
+
+    # a new link replaces the placeholder
+    keys = rejustify.adjust(out['keys'], column=3, items={'id.x': 1, 'id.y': 1})
+    assert keys['column.id.x'].tolist() == [4, 4, 3]
+    assert keys['id.x'].tolist() == [1, 2, 1]
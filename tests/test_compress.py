@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+
+import rejustify
+from rejustify import serialize
+from conftest import frame, values
+
+
+@pytest.fixture(params=['gzip', 'zstd'])
+def compress(request):
+    if request.param == 'zstd' and serialize.zstandard is None:
+        pytest.skip('zstandard is not installed')
+
+    return(request.param)
+
+
+def test_compressed_requests(client, server, compress):
+    df = frame(rows=300, extra=2)
+    st = client.analyze(df)
+    rdf = client.fill(df, st)
+
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', compress=compress) as _client:
+        assert _client.analyze(df).equals(st)
+        assert values(_client.fill(df, st)['data']) == values(rdf['data'])
+    assert server.encodings == [None, None, compress, compress]
+
+
+def test_compressed_async_requests(client, server, compress):
+    aio = pytest.importorskip('rejustify.aio')
+    df = frame(rows=300, extra=2)
+    st = client.analyze(df)
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL', compress=compress) as client:
+            return(await client.analyze(df))
+
+    assert asyncio.run(main()).equals(st)
+    assert server.encodings == [None, compress]
+
+
+def test_compress_chunks():
+    body = serialize.dumps({'data': frame(rows=1000)})
+    chunks = list(serialize.compress(body, 'gzip', chunk_size=1024))
+
+    assert len(chunks) > 1
+    assert serialize.zlib.decompress(b''.join(chunks), 31) == body
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        rejustify.Client(compress='gz')
+
+
+def test_unknown_compression_from_environment(monkeypatch):
+    monkeypatch.setattr(rejustify, 'rejustify_compress', 'gz')
+
+    with pytest.raises(ValueError):
+        rejustify.Client()
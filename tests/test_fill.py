@@ -0,0 +1,124 @@
+import pandas as pd
+import pytest
+
+import rejustify
+from conftest import frame, values
+
+
+@pytest.fixture
+def df():
+    return(frame(rows=200, extra=5))
+
+
+def test_chunk_rows_matches_fill(client, server, df):
+    st = client.analyze(df)
+    out = client.fill(df, st)
+    chunked = client.fill(df, st, chunk_rows=30, max_workers=4)
+
+    assert values(chunked['data']) == values(out['data'])
+    assert chunked['structure.x'].equals(out['structure.x'])
+    assert server.requests['fill'] == 1 + 7
+
+
+def test_dedupe_matches_fill(client, server, df):
+    df = pd.concat([df.head(20)] * 5, ignore_index=True)
+    st = client.analyze(df)
+    out = client.fill(df, st)
+    deduped = client.fill(df, st, dedupe=True, keys=out['keys'])
+
+    assert values(deduped['data']) == values(out['data'])
+    assert server.requests['fill'] == 2
+    assert len(server.payloads['fill']['data']) == 1 + 20
+
+
+def test_prune_matches_fill(client, df):
+    st = client.analyze(df)
+    out = client.fill(df, st)
+    pruned = client.fill(df, st, keys=out['keys'], default=out['default'], prune=True)
+
+    assert values(pruned['data']) == values(out['data'])
+    assert values(pruned['structure.x']) == values(out['structure.x'])
+    assert str(pruned['keys']) == str(out['keys'])
+    assert pruned['default']['column.id.x'] == out['default']['column.id.x']
+
+
+def test_prune_sends_fewer_columns(client, server, df):
+    st = client.analyze(df)
+    out = client.fill(df, st)
+    client.fill(df, st, keys=out['keys'], prune=True)
+
+    assert server.payloads['fill']['data'][0] == ['country', 'date', 'covid cases', 'gdp']
+
+
+def test_prune_keeps_matching_columns_after_others(client, server, df):
+    # the matching columns are not the first columns of the data set
+    df = df[['value 0', 'value 1', 'country', 'date', 'covid cases', 'gdp']]
+    st = client.analyze(df)
+    keys = client.fill(df, st)['keys']
+    for elem in keys:
+        elem.update({'id.x': [3, 4], 'name.x': ['country', 'date'], 'class': ['general', 'time']})
+
+    out = client.fill(df, st, keys=keys)
+    pruned = client.fill(df, st, keys=keys, prune=True)
+
+    assert server.payloads['fill']['data'][0] == ['country', 'date', 'covid cases', 'gdp']
+    assert values(pruned['data']) == values(out['data'])
+
+    # the filled values follow the matching columns of the keys
+    columns = ['country', 'date', 'covid cases', 'gdp']
+    expected = client.fill(df[columns], client.analyze(df[columns]))['data']
+    assert values(out['data'][[4, 5]]) == values(expected[[2, 3]])
+
+
+
+def test_fill_parallel_matches_fill(client, df):
+    st = client.analyze(df)
+    out = client.fill(df, st)
+    parallel = client.fill_parallel(df, st, partitions=3, max_workers=2)
+
+    assert values(parallel['data']) == values(out['data'])
+    assert parallel['structure.x'].equals(out['structure.x'])
+
+
+def test_fill_parallel_typed(client, df):
+    st = client.analyze(df)
+    typed = client.fill(df, st, typed=True)
+    parallel = client.fill_parallel(df, st, partitions=4, max_workers=2, typed=True)
+
+    assert parallel['data'].astype(str).equals(typed['data'].astype(str))
+    assert parallel['data'].dtypes.tolist() == typed['data'].dtypes.tolist()
+
+
+def test_fill_parallel_dask(client, df):
+    pytest.importorskip('dask')
+    st = client.analyze(df)
+    parallel = client.fill_parallel(df, st, partitions=3, max_workers=2, backend='dask')
+
+    assert values(parallel['data']) == values(client.fill(df, st)['data'])
+
+
+def test_partition_in_calling_process_closes_its_client(client, df):
+    st = client.analyze(df)
+    args = {'structure': st, 'keys': None, 'default': None, 'shape': 'vertical', 'inits': 1, 'sep': ',',
+            'learn': None, 'accu': 0.75, 'form': 'full', 'token': None, 'email': None, 'url': None}
+    part = rejustify._fill_partition({'main_url': client.main_url, 'token': 'TOKEN', 'email': 'EMAIL'}, df, args)
+
+    assert len(rejustify._partition_clients) == 0
+    assert sorted(part['columns']) == [7, 8]
+
+
+def test_dedupe_with_missing_values(client, df):
+    df.loc[::3, 'country'] = None
+    st = client.analyze(df)
+
+    assert values(client.fill(df, st, dedupe=True)['data']) == values(client.fill(df, st)['data'])
+
+
+def test_dedupe_keeps_distinct_keys(client, server):
+    df = frame(rows=8)
+    df['country'] = pd.Series(['1', 1, None, 'None', '', 'nan', 'a', 'b'], dtype=object)
+    df['date'] = '2020-06-01'
+    df = pd.concat([df] * 3, ignore_index=True)
+    st = client.analyze(df)
+
+    assert values(client.fill(df, st, dedupe=True)['data']) == values(client.fill(df, st)['data'])
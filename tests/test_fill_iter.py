@@ -0,0 +1,37 @@
+import pytest
+
+import rejustify
+from conftest import frame, values
+
+
+def test_fill_iter_matches_fill(client):
+    df = frame(rows=100)
+    st = client.analyze(df)
+    chunks = [df.iloc[i:i + 15] for i in range(0, 100, 15)]
+    outs = list(client.fill_iter(iter(chunks), st, prefetch=3))
+
+    assert len(outs) == len(chunks)
+    assert all(values(x['data']) == values(client.fill(y, st)['data']) for x, y in zip(outs, chunks))
+
+
+def test_prefetch_is_bounded(client):
+    df = frame(rows=100)
+    st = client.analyze(df)
+    read = []
+
+    def chunks():
+        for i in range(0, 100, 10):
+            read.append(i)
+            yield df.iloc[i:i + 10]
+
+    outs = client.fill_iter(chunks(), st, prefetch=2)
+    next(outs)
+    assert len(read) <= 3
+    assert len(list(outs)) == 9
+
+
+def test_fill_iter_arguments(client):
+    with pytest.raises(ValueError):
+        client.fill_iter(frame(rows=10), None)
+    with pytest.raises(ValueError):
+        client.fill_iter([frame(rows=10)], client.analyze(frame(rows=10)), prefetch=0)
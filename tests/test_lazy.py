@@ -0,0 +1,35 @@
+import rejustify
+from conftest import frame, values
+
+
+def test_lazy_matches_fill(client):
+    df = frame(rows=50)
+    st = client.analyze(df)
+    out = client.fill(df, st)
+    lazy = client.fill(df, st, lazy=True)
+
+    assert isinstance(lazy, rejustify.FillResult)
+    assert list(lazy) == list(out)
+    assert values(lazy['data']) == values(out['data'])
+    assert lazy['keys'] == out['keys']
+    assert all(x.equals(y) for x, y in zip(lazy['default']['default'], out['default']['default']))
+    assert values(dict(lazy)['message']) == values(out['message'])
+
+
+def test_blocks_are_built_once(client):
+    df = frame(rows=50)
+    lazy = client.fill(df, client.analyze(df), lazy=True)
+
+    assert lazy._values == {}
+    data = lazy['data']
+    assert list(lazy._values) == ['data']
+    assert lazy['data'] is data
+
+
+def test_refresh_of_lazy_result(client, server):
+    df = frame(rows=30)
+    st = client.analyze(df)
+    refreshed = client.refresh(client.fill(df.head(20), st, lazy=True), df)
+
+    assert len(server.payloads['fill']['data']) == 1 + 10
+    assert values(refreshed['data']) == values(client.fill(df, st)['data'])
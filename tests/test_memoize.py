@@ -0,0 +1,38 @@
+import rejustify
+from conftest import frame
+
+
+def test_same_signature_is_analyzed_once(client, server):
+    st = client.analyze(frame(rows=20), memoize=True)
+    other = client.analyze(frame(rows=40).tail(20), memoize=True)
+
+    assert server.requests['analyze'] == 1
+    assert other.equals(st)
+
+
+def test_different_signature(client, server):
+    client.analyze(frame(rows=20), memoize=True)
+    client.analyze(frame(rows=20, extra=1), memoize=True)
+    client.analyze(frame(rows=20))
+
+    assert server.requests['analyze'] == 3
+
+
+def test_saved_structure(client, server):
+    df = frame(rows=20)
+    st = rejustify.adjust(client.analyze(df, memoize=True), id=1, items={'feature': 'month'})
+    client.saveStructure(df, st)
+
+    assert client.analyze(df, memoize=True).equals(st)
+    assert server.requests['analyze'] == 1
+
+
+def test_structures_in_persistent_cache(server, tmp_path):
+    df = frame(rows=20)
+    cache = rejustify.Cache(str(tmp_path / 'cache.sqlite'))
+    for i in range(2):
+        with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', cache=cache) as client:
+            st = client.analyze(df.sample(frac=1, random_state=i), memoize=True)
+
+    assert server.requests['analyze'] == 1
+    assert st['name'].tolist() == df.columns.tolist()
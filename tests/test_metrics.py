@@ -0,0 +1,60 @@
+import rejustify
+from conftest import frame
+
+
+def test_phases_and_sizes(server):
+    df = frame(rows=50)
+    observed = []
+    metrics = rejustify.Metrics(callbacks=[lambda name, value, labels: observed.append((name, labels['endpoint']))])
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', metrics=metrics) as client:
+        client.fill(df, client.analyze(df))
+
+    summary = metrics.summary().set_index(['name', 'endpoint'])
+    for endpoint in ['analyze', 'fill']:
+        for name in ['validate', 'payload', 'serialize', 'network', 'parse', 'output', 'payload_bytes',
+                     'response_bytes']:
+            assert summary.loc[(name, endpoint), 'count'] == 1
+        assert summary.loc[('rows', endpoint), 'total'] == 50
+        assert summary.loc[('columns', endpoint), 'total'] == 4
+    assert len(observed) == summary['count'].sum()
+    assert set(observed) == set(summary.index)
+
+
+def test_retries_are_counted(server):
+    metrics = rejustify.Metrics()
+    server.fail(status=503, times=2, retry_after=0)
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', metrics=metrics) as client:
+        client.analyze(frame(rows=10))
+
+    summary = metrics.summary().set_index(['name', 'endpoint'])
+    assert summary.loc[('retry', 'analyze'), 'count'] == 2
+
+
+def test_module_metrics(server):
+    df = frame(rows=10)
+    metrics = rejustify.Metrics()
+    main_url = rejustify.rejustify_main_url
+    rejustify.setCurl(main_url=server.url)
+    rejustify.setMetrics(metrics)
+    try:
+        rejustify.analyze(df)
+    finally:
+        rejustify.setMetrics(enable=False)
+        rejustify.setCurl(main_url=main_url)
+
+    assert 'network' in metrics.summary()['name'].tolist()
+    metrics.reset()
+    assert len(metrics.summary()) == 0
+
+
+def test_summary_memory_is_bounded():
+    metrics = rejustify.Metrics(reservoir=100)
+    for i in range(10000):
+        metrics.observe('network', float(i % 1000), endpoint='fill')
+
+    summary = metrics.summary().set_index(['name', 'endpoint'])
+    assert len(metrics.values[('network', 'fill')].sample) == 100
+    assert summary.loc[('network', 'fill'), 'count'] == 10000
+    assert summary.loc[('network', 'fill'), 'total'] == 10 * 999 * 1000 / 2
+    assert summary.loc[('network', 'fill'), 'max'] == 999
+    assert 300 < summary.loc[('network', 'fill'), 'p50'] < 700
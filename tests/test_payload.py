@@ -0,0 +1,37 @@
+import copy
+import json
+
+import rejustify
+from rejustify import serialize
+from conftest import frame
+
+
+def test_inputs_are_not_changed(client):
+    df = frame(rows=30, extra=2)
+    st = client.analyze(df)
+    rdf = client.fill(df, st)
+    inputs = (df.copy(), st.copy(), copy.deepcopy(rdf['keys']), copy.deepcopy(rdf['default']))
+
+    out = client.fill(df, st, keys=rdf['keys'], default=rdf['default'])
+
+    assert df.equals(inputs[0])
+    assert st.equals(inputs[1])
+    assert rdf['keys'] == inputs[2]
+    assert all(x.equals(y) for x, y in zip(rdf['default']['default'], inputs[3]['default']))
+    assert out['data'].equals(rdf['data'])
+
+
+def test_payload_references_inputs(client):
+    df = frame(rows=30)
+    st = client.analyze(df)
+    rdf = client.fill(df, st)
+
+    payload = rejustify._fill_payload(df, st, keys=rdf['keys'], default=rdf['default'])
+    assert payload['data'] is df
+    assert payload['keys'] is rdf['keys']
+
+    # the serialized data are the same as with the header row inserted into a copy of the frame
+    _df = df.copy()
+    _df.loc[-1] = _df.columns
+    _df.index = _df.index + 1
+    assert json.loads(serialize.dumps(payload))['data'] == _df.sort_index().values.tolist()
@@ -0,0 +1,20 @@
+from conftest import frame, values
+
+
+def test_refresh_fills_new_periods(client, server):
+    df = frame(rows=30)
+    st = client.analyze(df)
+    rdf = client.fill(df.head(20), st)
+    refreshed = client.refresh(rdf, df)
+
+    assert len(server.payloads['fill']['data']) == 1 + 10
+    assert values(refreshed['data']) == values(client.fill(df, st)['data'])
+
+
+def test_refresh_without_new_periods(client, server):
+    df = frame(rows=30)
+    rdf = client.fill(df, client.analyze(df))
+    refreshed = client.refresh(rdf, df.head(25))
+
+    assert server.requests['fill'] == 1
+    assert refreshed['data'].equals(rdf['data'])
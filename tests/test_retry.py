@@ -0,0 +1,101 @@
+import time
+import asyncio
+import email.utils
+import pytest
+
+import rejustify
+from rejustify import retry
+from conftest import frame
+
+
+def test_retry_after(client, server):
+    server.fail(status=503, times=1, retry_after=1)
+
+    start = time.perf_counter()
+    client.analyze(frame(rows=10))
+
+    assert time.perf_counter() - start >= 1
+    assert server.failures['analyze'] == 1
+    assert server.requests['analyze'] == 1
+
+
+def test_retry_with_backoff(client, server):
+    server.fail(status=429, times=2)
+    client.analyze(frame(rows=10))
+
+    assert server.failures['analyze'] == 2
+    assert server.requests['analyze'] == 1
+
+
+def test_retry_gives_up(client, server):
+    client.setRetry(retries=2)
+    server.fail(status=503, times=3, retry_after=0)
+
+    with pytest.raises(ValueError):
+        client.analyze(frame(rows=10))
+    assert server.failures['analyze'] == 3
+
+
+def test_client_errors_are_not_retried(client, server):
+    server.fail(status=400, times=1)
+
+    with pytest.raises(ValueError):
+        client.analyze(frame(rows=10))
+    assert server.failures['analyze'] == 1
+
+
+def test_async_retry(server):
+    aio = pytest.importorskip('rejustify.aio')
+    server.fail(status=503, times=2, retry_after=0)
+
+    async def main():
+        async with aio.AsyncClient(main_url=server.url, token='TOKEN', email='EMAIL', backoff=0.01) as client:
+            return(await client.analyze(frame(rows=10)))
+
+    assert len(asyncio.run(main())) == 4
+    assert server.failures['analyze'] == 2
+
+
+def test_rate_limit(server):
+    df = frame(rows=10)
+    with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL', rate=5, burst=1) as client:
+        start = time.perf_counter()
+        for i in range(6):
+            client.analyze(df)
+
+        assert time.perf_counter() - start >= 0.9
+
+
+def test_retry_after_date():
+    date = email.utils.formatdate(time.time() + 30, usegmt=True)
+
+    assert 25 < retry.retry_after({'Retry-After': date}) <= 30
+    assert retry.retry_after({'Retry-After': 'soon'}) is None
+
+
+def test_rate_limit_of_module_functions(server):
+    aio = pytest.importorskip('rejustify.aio')
+    df = frame(rows=10)
+    main_url, token, email = rejustify.rejustify_main_url, rejustify.rejustify_token, rejustify.rejustify_email
+    rejustify.setCurl(main_url=server.url)
+    rejustify.register(token='TOKEN', email='EMAIL')
+    rejustify.setRetry(rate=4, burst=1)
+    try:
+        async def main():
+            start = time.perf_counter()
+            await asyncio.gather(*[aio.analyze(df.head(i + 1)) for i in range(5)])
+            await aio.close()
+            return(time.perf_counter() - start)
+
+        assert asyncio.run(main()) >= 0.9
+    finally:
+        rejustify.setRetry(rate=False)
+        rejustify.setCurl(main_url=main_url)
+        rejustify.register(token=token or '', email=email or '')
+
+
+def test_retry_after_is_capped():
+    assert retry.retry_after({'Retry-After': '7200'}) == 60
+    assert retry.retry_after({'Retry-After': '2'}) == 2
+    assert retry.retry_after({'Retry-After': '7200'}, cap=10) == 10
+    assert retry.retry_after({}) is None
@@ -0,0 +1,42 @@
+import pytest
+
+from conftest import frame
+
+
+@pytest.mark.parametrize('sampling', ['random', 'stratified', 'distinct'])
+def test_sample_is_uploaded(client, server, sampling):
+    df = frame(rows=500)
+    st = client.analyze(df, sample=50, sampling=sampling)
+
+    assert len(server.payloads['analyze']['data']) <= 1 + 50 + df.shape[1]
+    assert st.equals(client.analyze(df))
+
+
+def test_sample_fraction(client, server):
+    client.analyze(frame(rows=500), sample=0.1, sampling='stratified')
+
+    assert len(server.payloads['analyze']['data']) == 1 + 50
+
+
+def test_sample_keeps_values_of_each_column(client, server):
+    df = frame(rows=500)
+    df.loc[321, 'gdp'] = '1.5'
+    st = client.analyze(df, sample=10)
+
+    assert not st.loc[st['name'] == 'gdp', 'empty'].iloc[0]
+    assert [row[3] for row in server.payloads['analyze']['data'][1:]].count('1.5') == 1
+
+
+def test_distinct_sample_covers_values(client, server):
+    client.analyze(frame(rows=500), sample=20, sampling='distinct')
+    countries = set(row[0] for row in server.payloads['analyze']['data'][1:])
+
+    assert countries == {'Italy', 'France', 'Spain', 'Poland'}
+
+
+@pytest.mark.parametrize('sample', [3, 20])
+def test_distinct_sample_size(client, server, sample):
+    # more columns than sample rows
+    client.analyze(frame(rows=500, extra=8), sample=sample, sampling='distinct')
+
+    assert len(server.payloads['analyze']['data']) == 1 + sample
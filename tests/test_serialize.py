@@ -0,0 +1,52 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from rejustify import serialize
+
+
+@pytest.fixture
+def df():
+    df = pd.DataFrame()
+    df['country'] = ['Italy', 'Côte d\'Ivoire', 'say "hi"\n', None, '']
+    df['int'] = np.arange(5, dtype=np.int64) * 10 ** 12
+    df['float'] = [0.1, -2.5, np.nan, 1e-300, 3.0]
+    df['bool'] = [True, False, True, False, True]
+    df['mixed'] = pd.Series([1, 'a', 2.5, None, np.int32(7)], dtype=object)
+    df['small'] = np.arange(5, dtype=np.int8)
+
+    return(df)
+
+
+def expected(df):
+    rows = df.astype(object).where(pd.notnull(df), None).values.tolist()
+    return([list(df.columns)] + [[x.item() if isinstance(x, np.generic) else x for x in row] for row in rows])
+
+
+def test_orjson_and_numpy_parity(df, monkeypatch):
+    if serialize.orjson is None:
+        pytest.skip('orjson is not installed')
+    payload = {'data': df, 'inits': 1, 'structure': [{'id': 1, 'name': 'country'}]}
+
+    fast = json.loads(serialize.dumps(payload))
+    monkeypatch.setattr(serialize, 'orjson', None)
+    slow = json.loads(serialize.dumps(payload))
+
+    assert fast == slow
+    assert fast['data'] == expected(df)
+
+
+def test_numpy_blocks(df, monkeypatch):
+    monkeypatch.setattr(serialize, 'orjson', None)
+    df = pd.concat([df] * 7, ignore_index=True)
+
+    assert json.loads(serialize.dumps_frame(df, block=3)) == expected(df)
+
+
+def test_list_data(monkeypatch):
+    payload = {'data': [['a', 'b'], [1, None]], 'learn': True}
+
+    assert json.loads(serialize.dumps(payload)) == payload
+    monkeypatch.setattr(serialize, 'orjson', None)
+    assert json.loads(serialize.dumps(payload)) == payload
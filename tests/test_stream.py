@@ -0,0 +1,35 @@
+import io
+import json
+import pytest
+
+from rejustify import serialize
+from conftest import frame, values
+
+pytest.importorskip('ijson')
+
+
+def test_stream_matches_fill(client):
+    df = frame(rows=300, extra=3)
+    st = client.analyze(df)
+    out = client.fill(df, st)
+    streamed = client.fill(df, st, stream=True)
+
+    assert values(streamed['data']) == values(out['data'])
+    assert streamed['structure.x'].equals(out['structure.x'])
+    assert streamed['keys'] == out['keys']
+    assert streamed['message'].equals(out['message'])
+
+
+def test_parse_fill_ragged_rows():
+    body = {'structure': {'out': {'data': [['a', 'b', 'c'], [1, 2.5], [None, 'x', True]], 'keys': None},
+                          'message': []}}
+    out = serialize.parse_fill(io.BytesIO(json.dumps(body).encode('utf-8')))
+    data = out['structure']['out']['data']
+
+    assert data.values.tolist() == [['a', 'b', 'c'], [1, 2.5, None], [None, 'x', True]]
+    assert out['structure']['out']['keys'] is None
+
+
+def test_parse_fill_invalid_json():
+    with pytest.raises(ValueError):
+        serialize.parse_fill(io.BytesIO(b'{"structure": {"out": [1, 2'))
@@ -0,0 +1,73 @@
+import time
+import pytest
+import requests
+
+import rejustify
+from rejustify.testing import MockServer
+from conftest import frame
+
+
+def test_analyze_classes(client):
+    df = frame(rows=20, extra=1)
+    st = client.analyze(df)
+
+    assert st['class'].tolist() == ['geography', 'time', 'number', 'general', 'general']
+    assert st['format'].iloc[1] == '%Y-%m-%d'
+    assert st['empty'].tolist() == [False, False, False, True, True]
+
+
+def test_fill_is_deterministic(client):
+    df = frame(rows=20)
+    st = client.analyze(df)
+    first = client.fill(df, st)
+    second = client.fill(df.iloc[::-1].reset_index(drop=True), st)
+
+    assert first['data'].iloc[1:].notnull().all().all()
+    assert sorted(map(str, first['data'].values.tolist())) == sorted(map(str, second['data'].values.tolist()))
+
+
+@pytest.mark.parametrize('dimensions', [2, 4])
+def test_dimensions(dimensions):
+    df = frame(rows=20)
+    with MockServer(dimensions=dimensions) as server:
+        with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL') as client:
+            rdf = client.fill(df, client.analyze(df))
+
+    assert [len(elem) for elem in rdf['structure.y']['structure.y']] == [dimensions] * 2
+    assert len(rdf['default']['default'][0]) == dimensions - min(2, dimensions - 1)
+
+
+def test_reduced_form(server):
+    data = [frame(rows=20).columns.tolist()] + frame(rows=20).values.tolist()
+    structure = server.analyze({'data': data})['structure']
+    out = server.fill({'data': data, 'structure': structure, 'dataForm': 'reduced'})['structure']['out']
+
+    assert out['data'][0] == ['covid cases', 'gdp']
+    assert all(len(row) == 2 for row in out['data'])
+
+
+def test_latency():
+    with MockServer(latency=0.2) as server:
+        with rejustify.Client(main_url=server.url, token='TOKEN', email='EMAIL') as client:
+            start = time.perf_counter()
+            client.analyze(frame(rows=10))
+
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_errors(server):
+    assert requests.post(server.url + '/unknown', data=b'{}').status_code == 404
+    assert requests.post(server.url + '/fill', data=b'{"data": []}').status_code == 400
+
+    server.fail(status=429, retry_after=3)
+    response = requests.post(server.url + '/analyze', data=b'{"data": [["a"], [1]]}')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3'
+    assert server.failures['analyze'] == 1
+
+
+def test_arguments():
+    with pytest.raises(ValueError):
+        MockServer(latency=-1)
+    with pytest.raises(ValueError):
+        MockServer(dimensions=1)
@@ -0,0 +1,57 @@
+import pandas as pd
+
+import rejustify
+from conftest import frame, values
+
+
+def test_typed_columns(client):
+    df = frame(rows=30, extra=1)
+    st = client.analyze(df)
+    out = client.fill(df, st)
+    typed = client.fill(df, st, typed=True)
+    data = typed['data']
+
+    assert data.columns.tolist() == df.columns.tolist()
+    assert isinstance(data['country'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(data['date'])
+    assert pd.api.types.is_float_dtype(data['value 0'])
+    assert pd.api.types.is_float_dtype(data['covid cases'])
+    assert data['covid cases'].tolist() == out['data'].iloc[1:, 3].astype(float).tolist()
+    assert data.memory_usage(deep=True).sum() < out['data'].memory_usage(deep=True).sum()
+
+
+def test_typed_chunks_and_refresh(client):
+    df = frame(rows=30)
+    st = client.analyze(df)
+    typed = client.fill(df, st, typed=True)
+
+    assert client.fill(df, st, typed=True, chunk_rows=7)['data'].astype(str).equals(typed['data'].astype(str))
+    refreshed = client.refresh(client.fill(df.head(20), st, typed=True), df, typed=True)
+    assert values(refreshed['data']) == values(typed['data'])
+
+
+def test_lazy_typed(client):
+    df = frame(rows=30)
+    st = client.analyze(df)
+
+    assert client.fill(df, st, typed=True, lazy=True)['data'].equals(client.fill(df, st, typed=True)['data'])
+
+
+def test_typed_columns_with_many_dimensions(client):
+    df = frame(rows=30)
+    st = client.analyze(df)
+
+    # the date column is described by two rows, the first of them gives its class
+    extra = st.loc[st['name'] == 'date'].assign(id=st['id'].max() + 1, **{'class': 'general'})
+    st = pd.concat([st, extra], ignore_index=True)
+    data = client.fill(df, st, typed=True)['data']
+
+    assert data.columns.tolist() == df.columns.tolist()
+    assert pd.api.types.is_datetime64_any_dtype(data['date'])
+    assert pd.api.types.is_float_dtype(data['gdp'])
+
+    # in the reduced form the data has only the filled columns
+    reduced = pd.DataFrame([['covid cases', 'gdp'], ['1.5', '']])
+    typed = rejustify._typed_data(reduced, st)
+    assert typed.columns.tolist() == ['covid cases', 'gdp']
+    assert typed.iloc[0].tolist()[0] == 1.5 and pd.isnull(typed.iloc[0, 1])